@@ -0,0 +1,4 @@
+"""Performance benchmarks for the ETL, connector, monitoring and CloudOps paths.
+
+Run ``python -m benchmarks.run --scale small``; see :mod:`benchmarks.run`.
+"""
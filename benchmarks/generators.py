@@ -0,0 +1,97 @@
+"""Deterministic synthetic datasets for the benchmarks."""
+
+from __future__ import annotations
+
+import csv
+import random
+from pathlib import Path
+from typing import Dict, List
+
+from cloudops.connectors.base import CloudResource
+
+
+PRODUCTS = ("Widget", "Gadget", "Doohickey", "Sprocket", "Gizmo")
+PROVIDERS = ("aws", "azure", "gcp")
+RESOURCE_TYPES = ("vm", "database", "bucket", "function", "cluster")
+ENVIRONMENTS = ("prod", "staging", "dev")
+
+
+def write_sales_csv(
+    path: str | Path,
+    rows: int,
+    *,
+    duplicate_ratio: float = 0.05,
+    missing_ratio: float = 0.01,
+    outlier_ratio: float = 0.001,
+    seed: int = 0,
+) -> Path:
+    """Write an ``id,product,amount`` file shaped like ``etl/sample_sales.csv``.
+
+    A ``duplicate_ratio`` share of rows repeats the previous row, some amounts
+    are blank and a few are extreme, so dedup and anomaly detection have work
+    to do. Rows are streamed to disk, so any size can be generated.
+    """
+
+    rng = random.Random(seed)
+    path = Path(path)
+    with path.open("w", newline="") as handle:
+        writer = csv.writer(handle)
+        writer.writerow(["id", "product", "amount"])
+        previous: List[object] = []
+        for i in range(rows):
+            if previous and rng.random() < duplicate_ratio:
+                writer.writerow(previous)
+                continue
+            draw = rng.random()
+            if draw < missing_ratio:
+                amount: object = ""
+            elif draw < missing_ratio + outlier_ratio:
+                amount = round(rng.uniform(10_000, 50_000), 2)
+            else:
+                amount = round(rng.gauss(120, 25), 2)
+            previous = [i, PRODUCTS[i % len(PRODUCTS)], amount]
+            writer.writerow(previous)
+    return path
+
+
+def make_resources(count: int, *, seed: int = 0) -> Dict[str, List[CloudResource]]:
+    """Return ``count`` resources spread across providers, keyed by provider."""
+
+    rng = random.Random(seed)
+    by_provider: Dict[str, List[CloudResource]] = {provider: [] for provider in PROVIDERS}
+    for i in range(count):
+        provider = PROVIDERS[i % len(PROVIDERS)]
+        by_provider[provider].append(
+            CloudResource(
+                provider=provider,
+                name=f"{provider}-res-{i:07d}",
+                resource_type=rng.choice(RESOURCE_TYPES),
+                cost_per_hour=round(rng.uniform(0.01, 8.0), 4),
+                utilization=round(rng.random(), 3),
+                tags={"env": rng.choice(ENVIRONMENTS), "team": f"team-{rng.randrange(40)}"},
+            )
+        )
+    return by_provider
+
+
+class SyntheticConnector:
+    """In-memory connector serving a generated inventory."""
+
+    def __init__(self, provider: str, resources: List[CloudResource]) -> None:
+        self.provider = provider
+        self._resources = resources
+
+    def discover_resources(self) -> List[CloudResource]:
+        return self._resources
+
+    def collect_operational_metrics(self) -> Dict[str, float]:
+        return {
+            "error_rate": 0.004 if self.provider == "aws" else 0.001,
+            "spend_month_to_date": sum(r.cost_per_month() for r in self._resources),
+        }
+
+    def describe_security_findings(self) -> List[str]:
+        return [f"{self.provider}: {len(self._resources)} resources scanned"]
+
+
+__all__ = ["SyntheticConnector", "make_resources", "write_sales_csv"]
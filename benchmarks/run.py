@@ -0,0 +1,322 @@
+"""Run the benchmark suite, append the results to a history file and flag regressions.
+
+Usage::
+
+    python -m benchmarks.run --scale small
+    python -m benchmarks.run --scale medium --only etl. --update-baseline
+
+Each benchmark is timed ``--repeat`` times (the fastest run is kept) and then
+run once more under ``tracemalloc`` to measure peak Python allocations. A run is
+appended to ``--history`` and compared against the entry for the same scale in
+``--baseline``. The process exits with status 1 when throughput drops, or peak
+memory grows, by more than ``--tolerance``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from contextlib import nullcontext
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, ContextManager, Dict, List, Mapping, Sequence, Tuple
+
+from .generators import SyntheticConnector, make_resources, write_sales_csv
+
+
+BENCHMARK_DIR = Path(__file__).resolve().parent
+DEFAULT_HISTORY = BENCHMARK_DIR / "history.json"
+DEFAULT_BASELINE = BENCHMARK_DIR / "baseline.json"
+DEFAULT_TOLERANCE = 0.2
+
+SCALES: Dict[str, Dict[str, int]] = {
+    "smoke": {"rows": 1_000, "resources": 100},
+    "small": {"rows": 10_000, "resources": 1_000},
+    "medium": {"rows": 1_000_000, "resources": 50_000},
+    "large": {"rows": 10_000_000, "resources": 500_000},
+}
+
+# A case prepares its inputs in ``workdir`` and returns the callable to time
+# plus the number of items (rows or resources) one call processes. A case whose
+# callable consumes its input returns a third, untimed ``setup`` callable; its
+# result is passed to every timed call so each call sees the same workload.
+Case = Callable[[Mapping[str, int], Path], Tuple[Callable[..., object], ...]]
+
+
+@dataclass
+class BenchmarkResult:
+    name: str
+    items: int
+    seconds: float
+    throughput: float
+    peak_bytes: int
+
+
+def _sales(scale: Mapping[str, int], workdir: Path) -> Path:
+    path = workdir / f"sales-{scale['rows']}.csv"
+    if not path.exists():
+        write_sales_csv(path, scale["rows"])
+    return path
+
+
+def _platform(scale: Mapping[str, int]):
+    from cloudops.platform import CloudOpsPlatform
+
+    inventory = make_resources(scale["resources"])
+    return CloudOpsPlatform([SyntheticConnector(provider, items) for provider, items in inventory.items()])
+
+
+def _etl_extract(scale, workdir):
+    from etl.etl_job import extract
+
+    path = _sales(scale, workdir)
+    return lambda: extract(path), scale["rows"]
+
+
+def _etl_transform(scale, workdir):
+    from etl.etl_job import extract, transform
+
+    records = extract(_sales(scale, workdir))
+    # transform() fills amounts in place, so time it on fresh copies.
+    return transform, len(records), lambda: [dict(row) for row in records]
+
+
+def _etl_load(scale, workdir):
+    from etl.etl_job import extract, load, transform
+
+    records = transform(extract(_sales(scale, workdir)))
+    return lambda: load(records), len(records)
+
+
+def _etl_streaming(scale, workdir):
+    from etl.etl_job import etl_pipeline
+
+    path = _sales(scale, workdir)
+    return lambda: etl_pipeline("streaming", source=path), scale["rows"]
+
+
+def _write_records(scale, workdir):
+    from etl.etl_job import extract
+    from snowflake.connector import FakeCursor
+
+    records = extract(_sales(scale, workdir))
+    cursor = FakeCursor(output_path=workdir / "write_records.csv", stage_dir=workdir / "stage")
+    return lambda: cursor.write_records(records, "BENCH"), len(records)
+
+
+def _detect_anomalies(scale, workdir):
+    from monitoring.anomaly_detector import detect_anomalies
+
+    path = _sales(scale, workdir)
+    return lambda: detect_anomalies(path, "amount"), scale["rows"]
+
+
+def _detect_column_anomalies(scale, workdir):
+    from monitoring.anomaly_detector import detect_column_anomalies
+
+    path = _sales(scale, workdir)
+    return lambda: detect_column_anomalies(path, ["id", "amount"], method="mad"), scale["rows"]
+
+
+def _collect_snapshot(scale, workdir):
+    platform_ = _platform(scale)
+    return platform_.collect_posture_snapshot, scale["resources"]
+
+
+def _summarize_costs(scale, workdir):
+    platform_ = _platform(scale)
+    snapshot = platform_.collect_posture_snapshot()
+    return lambda: platform_.summarize_costs(snapshot), scale["resources"]
+
+
+def _advisor_recommend(scale, workdir):
+    from cloudops.llm_advisor import LLMAdvisor
+
+    snapshot = _platform(scale).collect_posture_snapshot()
+    advisor = LLMAdvisor()
+    return lambda: advisor.recommend(snapshot.resources, snapshot.metrics), scale["resources"]
+
+
+CASES: Dict[str, Case] = {
+    "etl.extract": _etl_extract,
+    "etl.transform": _etl_transform,
+    "etl.load": _etl_load,
+    "etl.pipeline_streaming": _etl_streaming,
+    "snowflake.write_records": _write_records,
+    "monitoring.detect_anomalies": _detect_anomalies,
+    "monitoring.detect_column_anomalies": _detect_column_anomalies,
+    "cloudops.collect_posture_snapshot": _collect_snapshot,
+    "cloudops.summarize_costs": _summarize_costs,
+    "cloudops.advisor_recommend": _advisor_recommend,
+}
+
+
+def measure(
+    name: str,
+    fn: Callable[..., object],
+    items: int,
+    repeat: int = 3,
+    memory: bool = True,
+    setup: Callable[[], object] | None = None,
+) -> BenchmarkResult:
+    """Time ``fn`` (best of ``repeat``) and optionally its peak traced allocation.
+
+    With ``setup``, each call is ``fn(setup())`` and only ``fn`` is measured.
+    """
+
+    def _args() -> tuple:
+        return () if setup is None else (setup(),)
+
+    best = float("inf")
+    for _ in range(max(1, repeat)):
+        args = _args()
+        start = time.perf_counter()
+        fn(*args)
+        best = min(best, time.perf_counter() - start)
+    peak = 0
+    if memory:
+        args = _args()
+        tracemalloc.start()
+        try:
+            fn(*args)
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    return BenchmarkResult(name, items, best, items / best if best else float("inf"), peak)
+
+
+def run_benchmarks(
+    scale: Mapping[str, int],
+    names: Sequence[str] | None = None,
+    *,
+    repeat: int = 3,
+    memory: bool = True,
+    workdir: str | Path | None = None,
+) -> List[BenchmarkResult]:
+    """Run the selected cases (all by default) inside ``workdir`` (a temp dir by default)."""
+
+    selected = list(CASES) if names is None else list(names)
+    unknown = [name for name in selected if name not in CASES]
+    if unknown:
+        raise ValueError(f"Unknown benchmark(s): {', '.join(unknown)}.")
+
+    if workdir is None:
+        scratch: ContextManager[str | Path] = tempfile.TemporaryDirectory(prefix="benchmarks-")
+    else:
+        scratch = nullcontext(workdir)
+    with scratch as directory:
+        root = Path(directory)
+        root.mkdir(parents=True, exist_ok=True)
+        previous = Path.cwd()
+        # The demo sinks write relative to the working directory.
+        os.chdir(root)
+        try:
+            results = []
+            for name in selected:
+                fn, items, *setup = CASES[name](scale, root)
+                results.append(measure(name, fn, items, repeat, memory, *setup))
+            return results
+        finally:
+            os.chdir(previous)
+
+
+def find_regressions(
+    results: Sequence[BenchmarkResult],
+    baseline: Mapping[str, Mapping[str, float]],
+    tolerance: float = DEFAULT_TOLERANCE,
+) -> List[str]:
+    """Describe every result that is slower or larger than ``baseline`` beyond ``tolerance``."""
+
+    regressions: List[str] = []
+    for result in results:
+        reference = baseline.get(result.name)
+        if reference is None:
+            continue
+        if result.throughput < reference["throughput"] * (1 - tolerance):
+            regressions.append(
+                f"{result.name}: throughput {result.throughput:,.0f}/s is below baseline "
+                f"{reference['throughput']:,.0f}/s"
+            )
+        if reference.get("peak_bytes") and result.peak_bytes > reference["peak_bytes"] * (1 + tolerance):
+            regressions.append(
+                f"{result.name}: peak memory {result.peak_bytes:,} B exceeds baseline {reference['peak_bytes']:,} B"
+            )
+    return regressions
+
+
+def _read_json(path: Path, default: object) -> object:
+    return json.loads(path.read_text()) if path.exists() else default
+
+
+def _write_json(path: Path, payload: object) -> None:
+    tmp_path = path.with_suffix(".tmp")
+    tmp_path.write_text(json.dumps(payload, indent=2) + "\n")
+    os.replace(tmp_path, path)
+
+
+def record_run(
+    results: Sequence[BenchmarkResult],
+    scale_name: str,
+    history_path: Path = DEFAULT_HISTORY,
+) -> Dict[str, object]:
+    """Append one run to the JSON history and return it."""
+
+    run = {
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "scale": scale_name,
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "results": {result.name: asdict(result) for result in results},
+    }
+    history = _read_json(history_path, {"runs": []})
+    history["runs"].append(run)  # type: ignore[index]
+    _write_json(history_path, history)
+    return run
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scale", choices=sorted(SCALES), default="small")
+    parser.add_argument("--only", action="append", default=[], help="run benchmarks whose name starts with this")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--no-memory", action="store_true", help="skip the tracemalloc pass")
+    parser.add_argument("--history", type=Path, default=DEFAULT_HISTORY)
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    parser.add_argument("--update-baseline", action="store_true")
+    args = parser.parse_args(argv)
+
+    names = [name for name in CASES if not args.only or any(name.startswith(p) for p in args.only)]
+    results = run_benchmarks(SCALES[args.scale], names, repeat=args.repeat, memory=not args.no_memory)
+    record_run(results, args.scale, args.history)
+
+    for result in results:
+        print(
+            f"{result.name:<36} {result.seconds:>9.4f}s {result.throughput:>14,.0f} items/s "
+            f"{result.peak_bytes / 1e6:>9.1f} MB peak"
+        )
+
+    baseline = _read_json(args.baseline, {})
+    regressions = find_regressions(results, baseline.get(args.scale, {}), args.tolerance)  # type: ignore[union-attr]
+    if args.update_baseline:
+        baseline[args.scale] = {  # type: ignore[index]
+            **baseline.get(args.scale, {}),  # type: ignore[union-attr]
+            **{result.name: asdict(result) for result in results},
+        }
+        _write_json(args.baseline, baseline)
+        print(f"Baseline for '{args.scale}' updated in {args.baseline}.")
+        return 0
+    for message in regressions:
+        print(f"REGRESSION {message}", file=sys.stderr)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
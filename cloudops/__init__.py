@@ -1,6 +1,23 @@
 """Lightweight simulation of the AI CloudOps platform components."""
 
-from .platform import CloudOpsPlatform
-from .llm_advisor import LLMAdvisor
+from __future__ import annotations
+
+import importlib
+
+
+# Resolved on first access so ``import cloudops`` stays cheap for CLI entry points.
+_LAZY_ATTRIBUTES = {
+    "CloudOpsPlatform": ".platform",
+    "LLMAdvisor": ".llm_advisor",
+}
+
+
+def __getattr__(name: str) -> object:
+    try:
+        module = importlib.import_module(_LAZY_ATTRIBUTES[name], __name__)
+    except KeyError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from None
+    return getattr(module, name)
+
 
 __all__ = ["CloudOpsPlatform", "LLMAdvisor"]
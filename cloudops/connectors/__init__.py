@@ -1,7 +1,42 @@
-"""Connector implementations used by the CloudOps demo."""
+"""Connector implementations used by the CloudOps demo.
 
-from .aws import AWSConnector
-from .azure import AzureConnector
-from .gcp import GCPConnector
+Provider connectors are imported lazily on attribute access, so importing
+this package does not pull in every provider (or its SDK).
+"""
 
-__all__ = ["AWSConnector", "AzureConnector", "GCPConnector"]
+from __future__ import annotations
+
+import importlib
+from typing import Any
+
+from .registry import available_connectors, create_connectors, load_connector, register_connector
+
+
+_LAZY_ATTRIBUTES = {
+    "AWSConnector": ".aws",
+    "AzureConnector": ".azure",
+    "GCPConnector": ".gcp",
+    "CachingConnector": ".cache",
+    "ConnectorCache": ".cache",
+}
+
+
+def __getattr__(name: str) -> Any:
+    try:
+        module = importlib.import_module(_LAZY_ATTRIBUTES[name], __name__)
+    except KeyError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from None
+    return getattr(module, name)
+
+
+__all__ = [
+    "AWSConnector",
+    "AzureConnector",
+    "CachingConnector",
+    "ConnectorCache",
+    "GCPConnector",
+    "available_connectors",
+    "create_connectors",
+    "load_connector",
+    "register_connector",
+]
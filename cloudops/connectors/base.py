@@ -3,7 +3,7 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Dict, Iterable, List, Protocol
+from typing import Dict, Iterable, List, Protocol, Tuple
 
 
 @dataclass(frozen=True)
@@ -37,3 +37,18 @@ class CloudConnector(Protocol):
     def describe_security_findings(self) -> List[str]:
         """Surface notable security or compliance issues."""
 
+
+@dataclass(frozen=True)
+class ResourcePage:
+    """One page of discovered resources and the token to resume after it."""
+
+    resources: Tuple[CloudResource, ...]
+    next_token: str | None = None
+
+
+class PaginatedCloudConnector(CloudConnector, Protocol):
+    """Connector that can serve discovery one page at a time."""
+
+    def list_resources_page(self, page_token: str | None = None, page_size: int = 100) -> ResourcePage:
+        """Return the page starting at ``page_token`` (``None`` for the first page)."""
+
@@ -0,0 +1,221 @@
+"""TTL + LRU caching for connector discovery, metrics and findings."""
+
+from __future__ import annotations
+
+import atexit
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import asdict
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Mapping, Tuple
+
+from .base import CloudConnector, CloudResource, ResourcePage
+
+
+DEFAULT_TTLS: Dict[str, float] = {
+    "discover_resources": 900.0,
+    "list_resources_page": 900.0,
+    "collect_operational_metrics": 60.0,
+    "describe_security_findings": 300.0,
+}
+
+CacheKey = Tuple[str, str, str]
+
+
+def _base(method: str) -> str:
+    """Strip the ``:page_size:token`` suffix that keys individual pages."""
+
+    return method.partition(":")[0]
+
+
+def _encode(method: str, value: object) -> object:
+    method = _base(method)
+    if method == "discover_resources":
+        return [asdict(resource) for resource in value]  # type: ignore[union-attr]
+    if method == "list_resources_page":
+        return {"resources": _encode("discover_resources", value.resources), "next_token": value.next_token}  # type: ignore[union-attr]
+    return value
+
+
+def _decode(method: str, value: object) -> object:
+    method = _base(method)
+    if method == "discover_resources":
+        return tuple(CloudResource(**item) for item in value)  # type: ignore[union-attr]
+    if method == "list_resources_page":
+        return ResourcePage(_decode("discover_resources", value["resources"]), value["next_token"])  # type: ignore[index]
+    return value
+
+
+class ConnectorCache:
+    """Shared store of connector results keyed by ``(provider, namespace, method)``.
+
+    The namespace separates connectors of the same provider (e.g. two AWS
+    accounts) so one is never served the other's results. Entries expire
+    after the per-method TTL in ``ttls`` and the least recently used entry is
+    evicted once ``max_entries`` is exceeded. When ``persist_path`` is set the
+    cache is loaded from that JSON file and written back at most once every
+    ``persist_interval`` seconds, on :meth:`flush` and at interpreter exit,
+    so warm results survive process restarts.
+    """
+
+    def __init__(
+        self,
+        ttls: Mapping[str, float] | None = None,
+        max_entries: int = 1024,
+        persist_path: str | Path | None = None,
+        clock: Callable[[], float] = time.time,
+        persist_interval: float = 30.0,
+    ) -> None:
+        if max_entries < 1:
+            raise ValueError("max_entries must be at least 1.")
+        self.ttls = {**DEFAULT_TTLS, **(ttls or {})}
+        self.max_entries = max_entries
+        self.persist_path = Path(persist_path) if persist_path is not None else None
+        self.persist_interval = persist_interval
+        self._clock = clock
+        self._entries: "OrderedDict[CacheKey, Tuple[float, object]]" = OrderedDict()
+        self._lock = threading.RLock()
+        self._dirty = False
+        self._saved_at = clock()
+        self.hits = 0
+        self.misses = 0
+        if self.persist_path is not None:
+            if self.persist_path.exists():
+                self._load()
+            atexit.register(self.flush)
+
+    def get_or_call(self, provider: str, method: str, fn: Callable[[], object], namespace: str = "") -> object:
+        """Return the cached result for ``(provider, namespace, method)`` or compute and store it."""
+
+        key = (provider, namespace, method)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self._clock() < entry[0]:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+
+        value = fn()
+        if method == "discover_resources":
+            value = tuple(value)  # type: ignore[arg-type]
+        with self._lock:
+            self._entries[key] = (self._clock() + self.ttls.get(_base(method), 0.0), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            self._mark_dirty()
+        return value
+
+    def invalidate(
+        self, provider: str | None = None, method: str | None = None, namespace: str | None = None
+    ) -> int:
+        """Drop matching entries (all of them by default) and return how many were removed.
+
+        ``method="list_resources_page"`` drops every cached page.
+        """
+
+        with self._lock:
+            doomed = [
+                key
+                for key in self._entries
+                if (provider is None or key[0] == provider)
+                and (namespace is None or key[1] == namespace)
+                and (method is None or key[2] == method or _base(key[2]) == method)
+            ]
+            for key in doomed:
+                del self._entries[key]
+            if doomed:
+                self._mark_dirty()
+            return len(doomed)
+
+    def flush(self) -> None:
+        """Write pending changes to ``persist_path`` now."""
+
+        with self._lock:
+            if self.persist_path is not None and self._dirty:
+                self._save()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _mark_dirty(self) -> None:
+        self._dirty = True
+        if self.persist_path is not None and self._clock() - self._saved_at >= self.persist_interval:
+            self._save()
+
+    def _load(self) -> None:
+        payload = json.loads(self.persist_path.read_text())  # type: ignore[union-attr]
+        now = self._clock()
+        for entry in payload.get("entries", []):
+            # Files written before namespaces existed hold four fields.
+            provider, namespace, method, expires, value = entry if len(entry) == 5 else (entry[0], "", *entry[1:])
+            if expires > now:
+                self._entries[(provider, namespace, method)] = (expires, _decode(method, value))
+
+    def _save(self) -> None:
+        entries = [
+            [provider, namespace, method, expires, _encode(method, value)]
+            for (provider, namespace, method), (expires, value) in self._entries.items()
+        ]
+        tmp_path = self.persist_path.with_suffix(".tmp")  # type: ignore[union-attr]
+        tmp_path.write_text(json.dumps({"entries": entries}))
+        os.replace(tmp_path, self.persist_path)  # type: ignore[arg-type]
+        self._dirty = False
+        self._saved_at = self._clock()
+
+
+class CachingConnector:
+    """Wrap a :class:`CloudConnector` so its calls are served from a :class:`ConnectorCache`.
+
+    Entries are stored under ``namespace``, which defaults to the connector's
+    ``connector_id`` or, failing that, its provider. Give each connector its
+    own namespace when wrapping several connectors of the same provider.
+    Native pages are cached per ``(page_size, page_token)`` under the
+    ``list_resources_page`` TTL, so repeated paged discovery is served from
+    the cache too.
+    """
+
+    def __init__(
+        self,
+        connector: CloudConnector,
+        cache: ConnectorCache | None = None,
+        namespace: str | None = None,
+    ) -> None:
+        self._connector = connector
+        self.provider = connector.provider
+        self.cache = cache if cache is not None else ConnectorCache()
+        if getattr(connector, "connector_id", None) is not None:
+            self.connector_id = connector.connector_id  # type: ignore[attr-defined]
+        self.namespace = namespace or getattr(connector, "connector_id", None) or connector.provider
+        if hasattr(connector, "list_resources_page"):
+            self.list_resources_page = self._list_resources_page
+
+    def _cached(self, method: str) -> object:
+        return self.cache.get_or_call(self.provider, method, getattr(self._connector, method), self.namespace)
+
+    def _list_resources_page(self, page_token: str | None = None, page_size: int = 100) -> ResourcePage:
+        return self.cache.get_or_call(  # type: ignore[return-value]
+            self.provider,
+            f"list_resources_page:{page_size}:{page_token or ''}",
+            lambda: self._connector.list_resources_page(page_token=page_token, page_size=page_size),  # type: ignore[attr-defined]
+            self.namespace,
+        )
+
+    def discover_resources(self) -> Iterable[CloudResource]:
+        return self._cached("discover_resources")  # type: ignore[return-value]
+
+    def collect_operational_metrics(self) -> Dict[str, float]:
+        return dict(self._cached("collect_operational_metrics"))  # type: ignore[call-overload]
+
+    def describe_security_findings(self) -> List[str]:
+        return list(self._cached("describe_security_findings"))  # type: ignore[call-overload]
+
+    def invalidate(self, method: str | None = None) -> int:
+        return self.cache.invalidate(self.provider, method, self.namespace)
+
+
+__all__ = ["CachingConnector", "ConnectorCache", "DEFAULT_TTLS"]
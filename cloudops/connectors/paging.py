@@ -0,0 +1,140 @@
+"""Page-at-a-time resource discovery with resumable tokens and backpressure.
+
+Connectors that implement ``list_resources_page`` are paged natively. Any
+other connector is paged over its ``discover_resources`` iterable, with the
+row offset as the page token, so every connector can be streamed and resumed
+the same way.
+"""
+
+from __future__ import annotations
+
+import queue
+import threading
+from itertools import islice
+from typing import AsyncIterator, Iterator, TypeVar
+
+from .base import CloudConnector, ResourcePage
+
+
+DEFAULT_PAGE_SIZE = 100
+
+T = TypeVar("T")
+
+_DONE = object()
+
+
+class _Failure:
+    __slots__ = ("error",)
+
+    def __init__(self, error: BaseException) -> None:
+        self.error = error
+
+
+def _offset_pages(connector: CloudConnector, page_size: int, page_token: str | None) -> Iterator[ResourcePage]:
+    offset = int(page_token or 0)
+    resources = islice(iter(connector.discover_resources()), offset, None)
+    while True:
+        batch = tuple(islice(resources, page_size))
+        if not batch:
+            return
+        offset += len(batch)
+        # A short page means the source is exhausted, so no token is needed.
+        next_token = str(offset) if len(batch) == page_size else None
+        yield ResourcePage(batch, next_token)
+        if next_token is None:
+            return
+
+
+def list_resource_pages(
+    connector: CloudConnector,
+    page_size: int = DEFAULT_PAGE_SIZE,
+    page_token: str | None = None,
+) -> Iterator[ResourcePage]:
+    """Yield discovery pages lazily, starting at ``page_token``.
+
+    Each page's ``next_token`` can be stored and passed back later to resume
+    discovery after that page.
+    """
+
+    if page_size < 1:
+        raise ValueError("page_size must be at least 1.")
+    list_page = getattr(connector, "list_resources_page", None)
+    if list_page is None:
+        yield from _offset_pages(connector, page_size, page_token)
+        return
+    while True:
+        page = list_page(page_token=page_token, page_size=page_size)
+        yield page
+        if page.next_token is None:
+            return
+        page_token = page.next_token
+
+
+def prefetch(items: Iterator[T], max_pending: int = 2) -> Iterator[T]:
+    """Produce ``items`` on a background thread, at most ``max_pending`` ahead of the consumer.
+
+    The bounded queue provides backpressure: a slow consumer stalls the
+    producer instead of letting fetched pages pile up in memory. Closing the
+    returned generator stops the producer after its current item.
+    """
+
+    if max_pending < 1:
+        raise ValueError("max_pending must be at least 1.")
+    buffer: "queue.Queue[object]" = queue.Queue(maxsize=max_pending)
+    stop = threading.Event()
+
+    def _put(item: object) -> bool:
+        while not stop.is_set():
+            try:
+                buffer.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _produce() -> None:
+        try:
+            for item in items:
+                if not _put(item):
+                    return
+        except BaseException as exc:
+            _put(_Failure(exc))
+            return
+        _put(_DONE)
+
+    thread = threading.Thread(target=_produce, name="resource-page-prefetch", daemon=True)
+    thread.start()
+    try:
+        while True:
+            item = buffer.get()
+            if item is _DONE:
+                return
+            if isinstance(item, _Failure):
+                raise item.error
+            yield item  # type: ignore[misc]
+    finally:
+        stop.set()
+
+
+async def alist_resource_pages(
+    connector: CloudConnector,
+    page_size: int = DEFAULT_PAGE_SIZE,
+    page_token: str | None = None,
+) -> AsyncIterator[ResourcePage]:
+    """Async variant of :func:`list_resource_pages`; each page is fetched on a worker thread.
+
+    A page is only requested once the consumer asks for it, so an ``async
+    for`` loop never has more than one page in flight.
+    """
+
+    import asyncio
+
+    pages = list_resource_pages(connector, page_size, page_token)
+    while True:
+        page = await asyncio.to_thread(next, pages, None)
+        if page is None:
+            return
+        yield page
+
+
+__all__ = ["DEFAULT_PAGE_SIZE", "alist_resource_pages", "list_resource_pages", "prefetch"]
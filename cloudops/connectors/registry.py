@@ -0,0 +1,102 @@
+"""Registry that resolves connector names to classes, importing them on demand.
+
+Connectors are registered as ``"module:attribute"`` strings, so listing or
+selecting providers never imports the modules (and cloud SDKs) of connectors
+that are not used. Besides the built-in demo connectors, installed packages
+can contribute connectors through the ``cloudops.connectors`` entry-point
+group::
+
+    [project.entry-points."cloudops.connectors"]
+    oci = "cloudops_oci.connector:OCIConnector"
+"""
+
+from __future__ import annotations
+
+import importlib
+from threading import Lock
+from typing import Callable, Dict, Iterable, List
+
+from .base import CloudConnector
+
+
+ENTRY_POINT_GROUP = "cloudops.connectors"
+
+BUILTIN_CONNECTORS: Dict[str, str] = {
+    "aws": "cloudops.connectors.aws:AWSConnector",
+    "azure": "cloudops.connectors.azure:AzureConnector",
+    "gcp": "cloudops.connectors.gcp:GCPConnector",
+}
+
+ConnectorFactory = Callable[[], CloudConnector]
+
+_targets: Dict[str, str | ConnectorFactory] = dict(BUILTIN_CONNECTORS)
+_loaded: Dict[str, ConnectorFactory] = {}
+_entry_points_scanned = False
+_lock = Lock()
+
+
+def _scan_entry_points() -> None:
+    global _entry_points_scanned
+    if _entry_points_scanned:
+        return
+    from importlib.metadata import entry_points
+
+    for entry_point in entry_points(group=ENTRY_POINT_GROUP):
+        # Explicit registrations and built-ins win over installed plugins.
+        _targets.setdefault(entry_point.name, entry_point.value)
+    _entry_points_scanned = True
+
+
+def register_connector(name: str, target: str | ConnectorFactory) -> None:
+    """Register ``target`` (a ``"module:attribute"`` path or a factory) under ``name``."""
+
+    with _lock:
+        _targets[name] = target
+        _loaded.pop(name, None)
+
+
+def available_connectors() -> List[str]:
+    """Return every registered connector name without importing any of them."""
+
+    with _lock:
+        _scan_entry_points()
+        return sorted(_targets)
+
+
+def load_connector(name: str) -> ConnectorFactory:
+    """Return the connector class registered as ``name``, importing it on first use."""
+
+    with _lock:
+        if name in _loaded:
+            return _loaded[name]
+        if name not in _targets:
+            _scan_entry_points()
+        try:
+            target = _targets[name]
+        except KeyError:
+            known = ", ".join(sorted(_targets))
+            raise ValueError(f"Unknown connector '{name}'. Available connectors: {known}.") from None
+        if isinstance(target, str):
+            module_name, _, attribute = target.partition(":")
+            factory = getattr(importlib.import_module(module_name), attribute)
+        else:
+            factory = target
+        _loaded[name] = factory
+        return factory
+
+
+def create_connectors(names: Iterable[str] | None = None) -> List[CloudConnector]:
+    """Instantiate the named connectors (every built-in one by default)."""
+
+    selected = list(BUILTIN_CONNECTORS) if names is None else list(names)
+    return [load_connector(name)() for name in selected]
+
+
+__all__ = [
+    "BUILTIN_CONNECTORS",
+    "ENTRY_POINT_GROUP",
+    "available_connectors",
+    "create_connectors",
+    "load_connector",
+    "register_connector",
+]
@@ -0,0 +1,83 @@
+"""Multi-dimensional cost aggregation over resource tables."""
+
+from __future__ import annotations
+
+import heapq
+import math
+from collections import defaultdict
+from typing import Dict, List, Mapping, Sequence, Tuple
+
+from .inventory import ResourceTable
+
+
+Cell = Tuple[str | None, ...]
+
+
+class CostCube:
+    """Monthly cost summed into cells, one per combination of dimension labels.
+
+    The cube is built in a single pass over the table and keeps unrounded
+    sums. ``rollup``, ``top`` and ``total`` round only their final results, so
+    regrouping never accumulates per-item rounding error. Slicing and rolling
+    up only touch the cells, which are far fewer than the rows.
+    """
+
+    def __init__(self, dimensions: Sequence[str], cells: Mapping[Cell, float]) -> None:
+        self.dimensions = tuple(dimensions)
+        self.cells: Dict[Cell, float] = dict(cells)
+
+    @classmethod
+    def build(cls, table: ResourceTable, dimensions: Sequence[str], hours: int = 730) -> "CostCube":
+        resolved = [table.dimension(dimension) for dimension in dimensions]
+        by_codes: Dict[Tuple[int, ...], float] = defaultdict(float)
+        code_columns = [codes for codes, _labels in resolved]
+        for key, cost in zip(zip(*code_columns), table.cost_per_hour):
+            by_codes[key] += cost
+        cells: Dict[Cell, float] = defaultdict(float)
+        for key, cost in by_codes.items():
+            label = tuple(labels[code] for code, (_codes, labels) in zip(key, resolved))
+            cells[label] += cost * hours
+        return cls(dimensions, cells)
+
+    def _positions(self, dimensions: Sequence[str]) -> List[int]:
+        unknown = [dimension for dimension in dimensions if dimension not in self.dimensions]
+        if unknown:
+            raise KeyError(f"Dimensions {unknown} are not part of this cube {self.dimensions}.")
+        return [self.dimensions.index(dimension) for dimension in dimensions]
+
+    def slice(self, where: Mapping[str, str | None]) -> "CostCube":
+        """Keep only the cells whose labels match every ``dimension: label`` pair."""
+
+        checks = list(zip(self._positions(list(where)), where.values()))
+        cells = {
+            cell: cost for cell, cost in self.cells.items() if all(cell[i] == label for i, label in checks)
+        }
+        return CostCube(self.dimensions, cells)
+
+    def _grouped(self, dimensions: Sequence[str]) -> Dict[Cell, float]:
+        positions = self._positions(dimensions)
+        groups: Dict[Cell, List[float]] = defaultdict(list)
+        for cell, cost in self.cells.items():
+            groups[tuple(cell[i] for i in positions)].append(cost)
+        return {key: math.fsum(costs) for key, costs in groups.items()}
+
+    def rollup(self, *dimensions: str) -> Dict[object, float]:
+        """Total cost per label of ``dimensions`` (a tuple key when more than one)."""
+
+        grouped = self._grouped(dimensions)
+        if len(dimensions) == 1:
+            return {key[0]: round(cost, 2) for key, cost in grouped.items()}
+        return {key: round(cost, 2) for key, cost in grouped.items()}
+
+    def top(self, n: int, *dimensions: str) -> List[Tuple[object, float]]:
+        """Return the ``n`` most expensive groups of ``dimensions``, highest first."""
+
+        grouped = self._grouped(dimensions)
+        largest = heapq.nlargest(n, grouped.items(), key=lambda item: item[1])
+        return [(key[0] if len(dimensions) == 1 else key, round(cost, 2)) for key, cost in largest]
+
+    def total(self) -> float:
+        return round(math.fsum(self.cells.values()), 2)
+
+
+__all__ = ["CostCube"]
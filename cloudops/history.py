@@ -0,0 +1,174 @@
+"""Append-only, compressed on-disk history of posture snapshots.
+
+Each snapshot becomes one gzip-compressed columnar segment file. An
+append-only ``index.jsonl`` holds one line per segment with its timestamp and
+per-provider rollups (resource count and monthly cost). Trend queries such as
+cost per provider per day are therefore answered from the index alone, and
+segments are only opened when a caller asks for the full snapshot.
+"""
+
+from __future__ import annotations
+
+import gzip
+import json
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass
+from datetime import date, datetime, timezone
+from pathlib import Path
+from typing import Dict, Iterator, List, Tuple
+
+from .connectors.base import CloudResource
+from .costs import CostCube
+from .snapshot import PostureSnapshot
+
+
+@dataclass(frozen=True)
+class SegmentInfo:
+    """Index entry describing one stored snapshot."""
+
+    timestamp: float
+    segment: str
+    providers: Dict[str, Dict[str, float]]
+
+    @property
+    def at(self) -> datetime:
+        return datetime.fromtimestamp(self.timestamp, tz=timezone.utc)
+
+
+def _intern(values: List[str]) -> Tuple[List[str], List[int]]:
+    labels: Dict[str, int] = {}
+    codes = [labels.setdefault(value, len(labels)) for value in values]
+    return list(labels), codes
+
+
+def _encode_segment(snapshot: PostureSnapshot, timestamp: float) -> bytes:
+    resources = snapshot.resources
+    providers, provider_codes = _intern([r.provider for r in resources])
+    types, type_codes = _intern([r.resource_type for r in resources])
+    tagsets, tag_codes = _intern([json.dumps(r.tags, sort_keys=True) for r in resources])
+    payload = {
+        "timestamp": timestamp,
+        "columns": {
+            "name": [r.name for r in resources],
+            "provider": {"labels": providers, "codes": provider_codes},
+            "resource_type": {"labels": types, "codes": type_codes},
+            "tags": {"labels": tagsets, "codes": tag_codes},
+            "cost_per_hour": [r.cost_per_hour for r in resources],
+            "utilization": [r.utilization for r in resources],
+        },
+        "metrics": snapshot.metrics,
+        "security_findings": snapshot.security_findings,
+        "advisor_recommendations": snapshot.advisor_recommendations,
+        "collection_errors": snapshot.collection_errors,
+    }
+    return gzip.compress(json.dumps(payload, separators=(",", ":")).encode())
+
+
+def _decode_segment(data: bytes) -> PostureSnapshot:
+    payload = json.loads(gzip.decompress(data))
+    columns = payload["columns"]
+
+    def _expand(column: Dict[str, list]) -> List[str]:
+        labels = column["labels"]
+        return [labels[code] for code in column["codes"]]
+
+    tags = [json.loads(value) for value in _expand(columns["tags"])]
+    resources = [
+        CloudResource(
+            provider=provider,
+            name=name,
+            resource_type=resource_type,
+            cost_per_hour=cost,
+            utilization=utilization,
+            tags=tag_map,
+        )
+        for provider, name, resource_type, cost, utilization, tag_map in zip(
+            _expand(columns["provider"]),
+            columns["name"],
+            _expand(columns["resource_type"]),
+            columns["cost_per_hour"],
+            columns["utilization"],
+            tags,
+        )
+    ]
+    return PostureSnapshot(
+        resources=resources,
+        metrics=payload["metrics"],
+        security_findings=payload["security_findings"],
+        advisor_recommendations=payload["advisor_recommendations"],
+        collection_errors=payload.get("collection_errors", {}),
+    )
+
+
+class SnapshotStore:
+    """Directory of snapshot segments plus a timestamp-ordered index."""
+
+    def __init__(self, root: str | Path) -> None:
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._index_path = self.root / "index.jsonl"
+        self._entries: List[SegmentInfo] = []
+        if self._index_path.exists():
+            with self._index_path.open() as handle:
+                self._entries = [SegmentInfo(**json.loads(line)) for line in handle if line.strip()]
+            self._entries.sort(key=lambda entry: entry.timestamp)
+        self._timestamps = [entry.timestamp for entry in self._entries]
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def append(self, snapshot: PostureSnapshot, at: datetime | None = None) -> SegmentInfo:
+        """Persist ``snapshot`` as a new segment taken at ``at`` (defaults to now)."""
+
+        at = at or datetime.now(timezone.utc)
+        timestamp = at.timestamp()
+        segment = f"{int(timestamp * 1000):015d}-{len(self._entries):06d}.json.gz"
+        (self.root / segment).write_bytes(_encode_segment(snapshot, timestamp))
+
+        # Same rollup as CloudOpsPlatform.summarize_costs, so stored trends match live summaries.
+        providers: Dict[str, Dict[str, float]] = {}
+        for provider, cost in CostCube.build(snapshot.table(), ("provider",)).rollup("provider").items():
+            providers[str(provider)] = {"monthly_cost": cost, "resources": 0}
+        for resource in snapshot.resources:
+            providers[resource.provider]["resources"] += 1
+        entry = SegmentInfo(timestamp=timestamp, segment=segment, providers=providers)
+        with self._index_path.open("a") as handle:
+            handle.write(json.dumps(entry.__dict__) + "\n")
+
+        position = bisect_right(self._timestamps, timestamp)
+        self._timestamps.insert(position, timestamp)
+        self._entries.insert(position, entry)
+        return entry
+
+    def scan(self, start: datetime | None = None, end: datetime | None = None) -> List[SegmentInfo]:
+        """Return index entries with ``start <= at < end`` in time order."""
+
+        lo = 0 if start is None else bisect_left(self._timestamps, start.timestamp())
+        hi = len(self._entries) if end is None else bisect_left(self._timestamps, end.timestamp())
+        return self._entries[lo:hi]
+
+    def load(self, entry: SegmentInfo) -> PostureSnapshot:
+        return _decode_segment((self.root / entry.segment).read_bytes())
+
+    def iter_snapshots(
+        self, start: datetime | None = None, end: datetime | None = None
+    ) -> Iterator[Tuple[SegmentInfo, PostureSnapshot]]:
+        """Decode matching segments one at a time so memory holds a single snapshot."""
+
+        for entry in self.scan(start, end):
+            yield entry, self.load(entry)
+
+    def daily_cost_by_provider(
+        self, start: datetime | None = None, end: datetime | None = None
+    ) -> Dict[date, Dict[str, float]]:
+        """Monthly cost run-rate per provider, from the last snapshot of each UTC day."""
+
+        daily: Dict[date, Dict[str, float]] = {}
+        for entry in self.scan(start, end):
+            daily[entry.at.date()] = {
+                provider: values["monthly_cost"] for provider, values in entry.providers.items()
+            }
+        return daily
+
+
+__all__ = ["SegmentInfo", "SnapshotStore"]
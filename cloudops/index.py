@@ -0,0 +1,94 @@
+"""Inverted and range indexes for filtering posture snapshots."""
+
+from __future__ import annotations
+
+from array import array
+from bisect import bisect_left
+from collections import defaultdict
+from typing import Dict, FrozenSet, List, Mapping, Set, Tuple
+
+from .inventory import ResourceTable
+
+
+Range = Tuple[float | None, float | None]
+
+
+class _RangeIndex:
+    """Row ids ordered by a numeric column, answering half-open range lookups."""
+
+    def __init__(self, column: array) -> None:
+        order = sorted(range(len(column)), key=column.__getitem__)
+        self.values = array("d", (column[row] for row in order))
+        self.rows = array("I", order)
+
+    def select(self, bounds: Range) -> Set[int]:
+        low, high = bounds
+        start = 0 if low is None else bisect_left(self.values, low)
+        stop = len(self.values) if high is None else bisect_left(self.values, high)
+        return set(self.rows[start:stop])
+
+
+def _in_range(value: float, bounds: Range) -> bool:
+    low, high = bounds
+    return (low is None or value >= low) and (high is None or value < high)
+
+
+class ResourceIndex:
+    """Equality indexes on provider, resource type and tags, plus range indexes on numbers.
+
+    Queries intersect the posting sets of the equality filters, smallest
+    first. Range filters use the sorted range indexes when nothing narrower
+    is available and otherwise check the column values of the surviving rows.
+    """
+
+    def __init__(self, table: ResourceTable) -> None:
+        self.table = table
+        self._postings: Dict[Tuple[str, str], Set[int]] = defaultdict(set)
+        for row, provider in enumerate(table.providers()):
+            self._postings[("provider", provider)].add(row)
+        for row, resource_type in enumerate(table.resource_types()):
+            self._postings[("resource_type", resource_type)].add(row)
+        for row in range(len(table)):
+            for key, value in table.tags_at(row):
+                self._postings[(f"tag:{key}", value)].add(row)
+        self._ranges = {
+            "utilization": _RangeIndex(table.utilization),
+            "cost_per_hour": _RangeIndex(table.cost_per_hour),
+        }
+
+    def select(
+        self,
+        provider: str | None = None,
+        resource_type: str | None = None,
+        tags: Mapping[str, str] | None = None,
+        utilization: Range | None = None,
+        cost_per_hour: Range | None = None,
+    ) -> List[int]:
+        """Return matching row ids in table order."""
+
+        terms = [("provider", provider), ("resource_type", resource_type)]
+        terms += [(f"tag:{key}", value) for key, value in (tags or {}).items()]
+        postings = [self._postings.get(term, frozenset()) for term in terms if term[1] is not None]
+        ranges = {
+            name: bounds
+            for name, bounds in (("utilization", utilization), ("cost_per_hour", cost_per_hour))
+            if bounds is not None
+        }
+
+        candidates: Set[int] | FrozenSet[int] | None = None
+        for posting in sorted(postings, key=len):
+            candidates = set(posting) if candidates is None else candidates & posting
+            if not candidates:
+                return []
+        if candidates is None:
+            if not ranges:
+                return list(range(len(self.table)))
+            name = next(iter(ranges))
+            candidates = self._ranges[name].select(ranges.pop(name))
+        for name, bounds in ranges.items():
+            column = getattr(self.table, name)
+            candidates = {row for row in candidates if _in_range(column[row], bounds)}
+        return sorted(candidates)
+
+
+__all__ = ["ResourceIndex"]
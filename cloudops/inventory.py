@@ -0,0 +1,163 @@
+"""Compact, array-backed storage for large resource inventories."""
+
+from __future__ import annotations
+
+from array import array
+from collections import defaultdict
+from typing import Dict, Generic, Hashable, Iterable, Iterator, List, Tuple, TypeVar
+
+from .connectors.base import CloudResource
+
+
+T = TypeVar("T", bound=Hashable)
+TagSet = Tuple[Tuple[str, str], ...]
+
+
+class _Interner(Generic[T]):
+    """Map repeated values to small integer codes and back."""
+
+    __slots__ = ("values", "_codes")
+
+    def __init__(self) -> None:
+        self.values: List[T] = []
+        self._codes: Dict[T, int] = {}
+
+    def code(self, value: T) -> int:
+        code = self._codes.get(value)
+        if code is None:
+            code = self._codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+
+class ResourceTable:
+    """Column-oriented equivalent of a ``List[CloudResource]``.
+
+    Numeric attributes live in ``array('d')`` columns. Provider, resource
+    type and whole tag sets are interned and stored as ``array('I')`` codes,
+    so a fleet of similar resources costs a few dozen bytes per row plus its
+    name. Conversion to and from :class:`CloudResource` is lossless and keeps
+    row order.
+    """
+
+    __slots__ = (
+        "names",
+        "cost_per_hour",
+        "utilization",
+        "_provider_codes",
+        "_type_codes",
+        "_tag_codes",
+        "_providers",
+        "_types",
+        "_tagsets",
+    )
+
+    def __init__(self) -> None:
+        self.names: List[str] = []
+        self.cost_per_hour = array("d")
+        self.utilization = array("d")
+        self._provider_codes = array("I")
+        self._type_codes = array("I")
+        self._tag_codes = array("I")
+        self._providers: _Interner[str] = _Interner()
+        self._types: _Interner[str] = _Interner()
+        self._tagsets: _Interner[TagSet] = _Interner()
+
+    @classmethod
+    def from_resources(cls, resources: Iterable[CloudResource]) -> "ResourceTable":
+        table = cls()
+        table.extend(resources)
+        return table
+
+    def append(self, resource: CloudResource) -> None:
+        self.names.append(resource.name)
+        self.cost_per_hour.append(resource.cost_per_hour)
+        self.utilization.append(resource.utilization)
+        self._provider_codes.append(self._providers.code(resource.provider))
+        self._type_codes.append(self._types.code(resource.resource_type))
+        self._tag_codes.append(self._tagsets.code(tuple(resource.tags.items())))
+
+    def extend(self, resources: Iterable[CloudResource]) -> None:
+        for resource in resources:
+            self.append(resource)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def __getitem__(self, index: int) -> CloudResource:
+        return CloudResource(
+            provider=self._providers.values[self._provider_codes[index]],
+            name=self.names[index],
+            resource_type=self._types.values[self._type_codes[index]],
+            cost_per_hour=self.cost_per_hour[index],
+            utilization=self.utilization[index],
+            tags=dict(self._tagsets.values[self._tag_codes[index]]),
+        )
+
+    def __iter__(self) -> Iterator[CloudResource]:
+        for index in range(len(self)):
+            yield self[index]
+
+    def to_resources(self) -> List[CloudResource]:
+        return list(self)
+
+    def providers(self) -> List[str]:
+        """Return the provider of every row, resolving codes once per distinct value."""
+
+        values = self._providers.values
+        return [values[code] for code in self._provider_codes]
+
+    def resource_types(self) -> List[str]:
+        values = self._types.values
+        return [values[code] for code in self._type_codes]
+
+    def tags_at(self, index: int) -> TagSet:
+        """Return the interned ``(key, value)`` pairs of row ``index``."""
+
+        return self._tagsets.values[self._tag_codes[index]]
+
+    def tag_values(self, key: str) -> List[str | None]:
+        """Return the value of tag ``key`` for every row (``None`` when absent)."""
+
+        resolved = [dict(tagset).get(key) for tagset in self._tagsets.values]
+        return [resolved[code] for code in self._tag_codes]
+
+    def cost_per_month(self, hours: int = 730) -> array:
+        """Return ``CloudResource.cost_per_month`` for every row in one pass."""
+
+        return array("d", [round(cost * hours, 2) for cost in self.cost_per_hour])
+
+    def dimension(self, by: str) -> Tuple[array, List[str | None]]:
+        """Return per-row codes and the code-to-label list for ``by``.
+
+        ``by`` is ``provider``, ``resource_type`` or ``tag:<key>``; rows
+        without the tag get the label ``None``.
+        """
+
+        if by == "provider":
+            return self._provider_codes, list(self._providers.values)
+        if by == "resource_type":
+            return self._type_codes, list(self._types.values)
+        if by.startswith("tag:"):
+            key = by[len("tag:") :]
+            return self._tag_codes, [dict(tagset).get(key) for tagset in self._tagsets.values]
+        raise ValueError(f"Cannot group by '{by}'. Use provider, resource_type or tag:<key>.")
+
+    def group_sum(self, by: str, hours: int = 730) -> Dict[str | None, float]:
+        """Sum monthly cost per ``provider``, ``resource_type`` or ``tag:<key>``.
+
+        Rows are bucketed by their interned code first, so the per-row work
+        is an integer lookup and the labels are resolved once per group.
+        """
+
+        codes, labels = self.dimension(by)
+        by_code: Dict[int, float] = defaultdict(float)
+        for code, cost in zip(codes, self.cost_per_month(hours)):
+            by_code[code] += cost
+        totals: Dict[str | None, float] = defaultdict(float)
+        for code, cost in by_code.items():
+            totals[labels[code]] += cost
+        return {label: round(cost, 2) for label, cost in totals.items()}
+
+
+__all__ = ["ResourceTable"]
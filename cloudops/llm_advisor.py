@@ -2,35 +2,40 @@
 
 from __future__ import annotations
 
-from typing import Dict, Iterable, List
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Mapping, Sequence
 
 from .connectors.base import CloudResource
+from .inventory import ResourceTable
+from .rules import RuleEngine, RuleStats, load_rules
 
 
 class LLMAdvisor:
-    """Generate narrative recommendations based on telemetry snapshots."""
-
-    def recommend(self, resources: Iterable[CloudResource], metrics: Dict[str, Dict[str, float]]) -> List[str]:
-        recommendations: List[str] = []
-        underutilized = [r for r in resources if r.utilization < 0.35]
-        if underutilized:
-            names = ", ".join(sorted(r.name for r in underutilized))
-            recommendations.append(
-                f"Rightsize or schedule downtime for low-utilization services: {names}."
-            )
-
-        for provider, provider_metrics in metrics.items():
-            spend = provider_metrics.get("spend_month_to_date", 0.0)
-            if spend > 4000:
-                recommendations.append(
-                    f"Review committed-use discounts for {provider.upper()} — projected monthly spend is ${spend:,.0f}."
-                )
-            error_rate = provider_metrics.get("error_rate", 0.0)
-            if error_rate > 0.003:
-                recommendations.append(
-                    f"Investigate elevated error rate ({error_rate:.2%}) detected in {provider.upper()} workloads."
-                )
+    """Generate narrative recommendations based on telemetry snapshots.
+
+    Recommendations come from a declarative rule set (see :mod:`cloudops.rules`)
+    that defaults to the built-in heuristics and is compiled once per advisor.
+    """
+
+    def __init__(self, rules: Sequence[Mapping[str, Any]] | None = None) -> None:
+        self._engine = RuleEngine(rules)
+
+    @classmethod
+    def from_file(cls, path: str | Path) -> "LLMAdvisor":
+        """Build an advisor from a JSON or YAML rule file."""
+
+        return cls(load_rules(path))
+
+    @property
+    def rule_stats(self) -> Dict[str, RuleStats]:
+        return self._engine.stats
+
+    def recommend(
+        self,
+        resources: ResourceTable | Iterable[CloudResource],
+        metrics: Dict[str, Dict[str, float]],
+    ) -> List[str]:
+        recommendations = self._engine.evaluate(resources, metrics)
         if not recommendations:
             recommendations.append("No notable optimizations detected during this snapshot.")
         return recommendations
-
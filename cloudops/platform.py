@@ -2,57 +2,227 @@
 
 from __future__ import annotations
 
+import time
 from collections import defaultdict
-from dataclasses import dataclass
-from typing import Dict, Iterable, List
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Dict, Iterable, Iterator, List, Mapping, Sequence, Tuple
 
-from .connectors.base import CloudConnector, CloudResource
+from .connectors.base import CloudConnector, CloudResource, ResourcePage
+from .connectors.cache import CachingConnector, ConnectorCache
+from .connectors.paging import DEFAULT_PAGE_SIZE, list_resource_pages, prefetch
+from .costs import CostCube
 from .llm_advisor import LLMAdvisor
+from .snapshot import PostureSnapshot, SnapshotDelta, diff_snapshot
 
 
-@dataclass
-class PostureSnapshot:
-    resources: List[CloudResource]
-    metrics: Dict[str, Dict[str, float]]
-    security_findings: Dict[str, List[str]]
-    advisor_recommendations: List[str]
+_CONNECTOR_CALLS = ("discover_resources", "collect_operational_metrics", "describe_security_findings")
+
+_Collected = Tuple[
+    List[CloudResource], Dict[str, Dict[str, float]], Dict[str, List[str]], Dict[str, List[str]]
+]
+
+
+def _connector_ids(connectors: Sequence[CloudConnector]) -> List[str]:
+    """Name each connector by its ``connector_id`` or provider, suffixing repeats (``aws``, ``aws#2``)."""
+
+    ids: List[str] = []
+    seen: Dict[str, int] = defaultdict(int)
+    for connector in connectors:
+        base = getattr(connector, "connector_id", None) or connector.provider
+        seen[base] += 1
+        ids.append(base if seen[base] == 1 else f"{base}#{seen[base]}")
+    return ids
 
 
 class CloudOpsPlatform:
     """Minimal orchestration layer to make the blueprint tangible."""
 
-    def __init__(self, connectors: Iterable[CloudConnector], advisor: LLMAdvisor | None = None) -> None:
+    def __init__(
+        self,
+        connectors: Iterable[CloudConnector],
+        advisor: LLMAdvisor | None = None,
+        cache: ConnectorCache | None = None,
+    ) -> None:
         self._connectors = list(connectors)
         if not self._connectors:
             raise ValueError("At least one connector is required to build the platform.")
+        self.connector_ids = _connector_ids(self._connectors)
+        if cache is not None:
+            self._connectors = [
+                CachingConnector(connector, cache, namespace=connector_id)
+                for connector_id, connector in zip(self.connector_ids, self._connectors)
+            ]
         self._advisor = advisor or LLMAdvisor()
+        self.cache = cache
 
-    def collect_posture_snapshot(self) -> PostureSnapshot:
-        resources: List[CloudResource] = []
-        metrics: Dict[str, Dict[str, float]] = {}
-        security: Dict[str, List[str]] = defaultdict(list)
+    def collect_posture_snapshot(
+        self,
+        *,
+        concurrent: bool = False,
+        timeout: float | Mapping[str, float] | None = None,
+    ) -> PostureSnapshot:
+        """Query every connector and assemble a snapshot.
 
-        for connector in self._connectors:
-            provider_resources = list(connector.discover_resources())
-            resources.extend(provider_resources)
-            metrics[connector.provider] = dict(connector.collect_operational_metrics())
-            security[connector.provider].extend(connector.describe_security_findings())
+        With ``concurrent=True`` every connector call runs on its own thread,
+        so latency tracks the slowest call instead of the sum of all calls.
+        ``timeout`` (seconds, optionally per connector id or provider) bounds
+        each connector. Calls that fail or time out are reported in
+        ``collection_errors`` and the snapshot is built from the results that
+        did arrive. Metrics, findings and errors are keyed by the ids in
+        :attr:`connector_ids`, which are the providers unless several
+        connectors share one.
+        """
 
+        resources, metrics, security, errors = self._collect(concurrent, timeout)
         recommendations = self._advisor.recommend(resources, metrics)
         return PostureSnapshot(
             resources=sorted(resources, key=lambda r: (r.provider, r.name)),
             metrics=metrics,
-            security_findings=dict(security),
+            security_findings=security,
             advisor_recommendations=recommendations,
+            collection_errors=errors,
         )
 
+    def refresh_snapshot(
+        self,
+        previous: PostureSnapshot,
+        *,
+        concurrent: bool = False,
+        timeout: float | Mapping[str, float] | None = None,
+    ) -> SnapshotDelta:
+        """Collect again and return only what changed since ``previous``.
+
+        The refreshed snapshot is available as ``delta.snapshot``. Advisor
+        recommendations are only recomputed when resources or metrics changed.
+        """
+
+        resources, metrics, security, errors = self._collect(concurrent, timeout)
+        delta = diff_snapshot(previous, resources, metrics, security)
+        delta.snapshot.collection_errors = errors
+        if delta.added or delta.removed or delta.changed or delta.metrics_changed:
+            delta.snapshot.advisor_recommendations = self._advisor.recommend(
+                delta.snapshot.resources, metrics
+            )
+        return delta
+
+    def iter_resource_pages(
+        self,
+        *,
+        page_size: int = DEFAULT_PAGE_SIZE,
+        max_pending: int = 2,
+        resume_tokens: Mapping[str, str | None] | None = None,
+    ) -> Iterator[Tuple[str, ResourcePage]]:
+        """Stream ``(connector_id, page)`` pairs from every connector as pages arrive.
+
+        Pages are fetched on a background thread at most ``max_pending`` ahead
+        of the consumer, so memory is bounded by the page size rather than the
+        inventory. Persist each ``page.next_token`` and pass the latest ones
+        as ``resume_tokens``, keyed by the ids in :attr:`connector_ids`, to
+        continue an interrupted discovery; connectors mapped to ``None`` there
+        are treated as finished and skipped.
+        """
+
+        resume_tokens = resume_tokens or {}
+        pages = self._indexed_pages(page_size, resume_tokens)
+        return ((self.connector_ids[index], page) for index, page in prefetch(pages, max_pending))
+
+    def _indexed_pages(
+        self, page_size: int, resume_tokens: Mapping[str, str | None]
+    ) -> Iterator[Tuple[int, ResourcePage]]:
+        for index, (connector_id, connector) in enumerate(zip(self.connector_ids, self._connectors)):
+            if connector_id in resume_tokens and resume_tokens[connector_id] is None:
+                continue
+            for page in list_resource_pages(connector, page_size, resume_tokens.get(connector_id)):
+                yield index, page
+
+    def _collect(self, concurrent: bool, timeout: float | Mapping[str, float] | None) -> _Collected:
+        resources: List[CloudResource] = []
+        metrics: Dict[str, Dict[str, float]] = {}
+        security: Dict[str, List[str]] = defaultdict(list)
+        errors: Dict[str, List[str]] = {}
+
+        # Results are kept per connector position, since several connectors
+        # (e.g. two AWS accounts) may report the same provider.
+        if concurrent:
+            results = self._collect_concurrently(timeout, errors)
+        else:
+            results = [
+                {call: getattr(connector, call)() for call in _CONNECTOR_CALLS if call != "discover_resources"}
+                for connector in self._connectors
+            ]
+            for outcome in results:
+                outcome["discover_resources"] = []
+            # Without concurrency there is nothing to overlap, so page inline.
+            for index, page in self._indexed_pages(DEFAULT_PAGE_SIZE, {}):
+                results[index]["discover_resources"].extend(page.resources)  # type: ignore[attr-defined]
+
+        for connector_id, outcome in zip(self.connector_ids, results):
+            if "discover_resources" in outcome:
+                resources.extend(outcome["discover_resources"])  # type: ignore[arg-type]
+            if "collect_operational_metrics" in outcome:
+                metrics[connector_id] = dict(outcome["collect_operational_metrics"])  # type: ignore[arg-type]
+            if "describe_security_findings" in outcome:
+                security[connector_id].extend(outcome["describe_security_findings"])  # type: ignore[arg-type]
+        return resources, metrics, dict(security), errors
+
+    def _collect_concurrently(
+        self,
+        timeout: float | Mapping[str, float] | None,
+        errors: Dict[str, List[str]],
+    ) -> List[Dict[str, object]]:
+        executor = ThreadPoolExecutor(max_workers=len(self._connectors) * len(_CONNECTOR_CALLS))
+        started = time.monotonic()
+
+        def _call(connector: CloudConnector, call: str) -> object:
+            if call == "discover_resources":
+                # Page through discovery on the worker thread, not the caller's.
+                return [resource for page in list_resource_pages(connector) for resource in page.resources]
+            return getattr(connector, call)()
+
+        pending = [
+            {call: executor.submit(_call, connector, call) for call in _CONNECTOR_CALLS}
+            for connector in self._connectors
+        ]
+
+        results: List[Dict[str, object]] = []
+        try:
+            for connector_id, connector, futures in zip(self.connector_ids, self._connectors, pending):
+                if isinstance(timeout, Mapping):
+                    limit = timeout.get(connector_id, timeout.get(connector.provider))
+                else:
+                    limit = timeout
+                outcome: Dict[str, object] = {}
+                for call, future in futures.items():
+                    remaining = None if limit is None else max(0.0, started + limit - time.monotonic())
+                    try:
+                        outcome[call] = future.result(timeout=remaining)
+                    except FutureTimeoutError:
+                        errors.setdefault(connector_id, []).append(f"{call} timed out after {limit}s")
+                    except Exception as exc:
+                        errors.setdefault(connector_id, []).append(f"{call} failed: {exc}")
+                results.append(outcome)
+        finally:
+            # Do not block on calls that overran their timeout.
+            executor.shutdown(wait=False, cancel_futures=True)
+        return results
+
     def summarize_costs(self, snapshot: PostureSnapshot | None = None) -> Dict[str, float]:
         snapshot = snapshot or self.collect_posture_snapshot()
-        totals: Dict[str, float] = defaultdict(float)
-        for resource in snapshot.resources:
-            totals[resource.provider] += resource.cost_per_month()
-        totals["total"] = sum(totals.values())
-        return {provider: round(cost, 2) for provider, cost in totals.items()}
+        cube = self.cost_cube(snapshot, ("provider",))
+        totals: Dict[str, float] = dict(cube.rollup("provider"))  # type: ignore[arg-type]
+        totals["total"] = cube.total()
+        return totals
+
+    def cost_cube(
+        self,
+        snapshot: PostureSnapshot | None = None,
+        dimensions: Sequence[str] = ("provider", "resource_type"),
+    ) -> CostCube:
+        """Aggregate monthly cost by ``dimensions`` (``provider``, ``resource_type``, ``tag:<key>``)."""
+
+        snapshot = snapshot or self.collect_posture_snapshot()
+        return CostCube.build(snapshot.table(), dimensions)
 
 
-__all__ = ["CloudOpsPlatform", "PostureSnapshot"]
+__all__ = ["CloudOpsPlatform", "PostureSnapshot", "SnapshotDelta"]
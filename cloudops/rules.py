@@ -0,0 +1,327 @@
+"""Declarative recommendation rules compiled into batched predicates.
+
+A rule is a mapping such as::
+
+    {
+        "name": "underutilized",
+        "scope": "resource",
+        "when": [{"field": "utilization", "op": "<", "value": 0.35}],
+        "message": "Rightsize or schedule downtime for low-utilization services: {names}.",
+    }
+
+``resource`` rules test resource fields (``provider``, ``name``,
+``resource_type``, ``cost_per_hour``, ``cost_per_month``, ``utilization`` or
+``tags.<key>``) and emit one message listing every matching resource.
+``provider`` rules test operational metrics (with an optional ``default`` for
+missing ones) and emit one message per matching provider. The message is
+formatted with ``provider``, ``PROVIDER`` and that provider's metrics.
+"""
+
+from __future__ import annotations
+
+import json
+import operator
+import time
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Sequence, Set, Tuple
+
+from .connectors.base import CloudResource
+from .inventory import ResourceTable
+
+
+_OPERATORS: Dict[str, Callable[[Any, Any], bool]] = {
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge,
+    "==": operator.eq,
+    "!=": operator.ne,
+    "in": lambda left, right: left in right,
+    "not in": lambda left, right: left not in right,
+}
+_NUMERIC_FIELDS = ("cost_per_hour", "cost_per_month", "utilization")
+_LABEL_FIELDS = ("provider", "resource_type")
+# Below this many uses per evaluation, scanning a column beats sorting it.
+_SORT_MIN_USES = 4
+
+DEFAULT_RULES: List[Dict[str, Any]] = [
+    {
+        "name": "underutilized",
+        "scope": "resource",
+        "when": [{"field": "utilization", "op": "<", "value": 0.35}],
+        "message": "Rightsize or schedule downtime for low-utilization services: {names}.",
+    },
+    {
+        "name": "committed_use",
+        "scope": "provider",
+        "when": [{"field": "spend_month_to_date", "op": ">", "value": 4000, "default": 0.0}],
+        "message": (
+            "Review committed-use discounts for {PROVIDER} — projected monthly spend is "
+            "${spend_month_to_date:,.0f}."
+        ),
+    },
+    {
+        "name": "error_rate",
+        "scope": "provider",
+        "when": [{"field": "error_rate", "op": ">", "value": 0.003, "default": 0.0}],
+        "message": "Investigate elevated error rate ({error_rate:.2%}) detected in {PROVIDER} workloads.",
+    },
+]
+
+
+@dataclass
+class RuleStats:
+    """Cumulative evaluation counters for one rule."""
+
+    evaluations: int = 0
+    matches: int = 0
+    seconds: float = 0.0
+
+
+@dataclass
+class _Condition:
+    field: str
+    test: Callable[[Any], bool]
+    default: Any = None
+    op: str = ""
+    value: Any = None
+
+    @property
+    def key(self) -> Tuple[str, str, str]:
+        return self.field, self.op, repr(self.value)
+
+
+@dataclass
+class CompiledRule:
+    name: str
+    scope: str
+    conditions: List[_Condition]
+    message: str
+    stats: RuleStats
+
+
+def _compile_condition(spec: Mapping[str, Any]) -> _Condition:
+    try:
+        compare = _OPERATORS[spec["op"]]
+    except KeyError:
+        raise ValueError(f"Unsupported operator {spec.get('op')!r} in condition {dict(spec)}.") from None
+    threshold = spec["value"]
+    if spec["op"] in ("in", "not in"):
+        threshold = set(threshold)
+    return _Condition(
+        field=spec["field"],
+        test=lambda value: value is not None and compare(value, threshold),
+        default=spec.get("default"),
+        op=spec["op"],
+        value=threshold,
+    )
+
+
+def _is_resource_field(field: str) -> bool:
+    return field in _NUMERIC_FIELDS or field in _LABEL_FIELDS or field == "name" or (
+        field.startswith("tags.") and len(field) > len("tags.")
+    )
+
+
+def compile_rules(specs: Iterable[Mapping[str, Any]]) -> List[CompiledRule]:
+    """Validate rule mappings and turn their conditions into predicates."""
+
+    compiled: List[CompiledRule] = []
+    for spec in specs:
+        scope = spec.get("scope", "resource")
+        if scope not in ("resource", "provider"):
+            raise ValueError(f"Rule {spec.get('name')!r} has unknown scope {scope!r}.")
+        when = spec.get("when", [])
+        conditions = [_compile_condition(item) for item in ([when] if isinstance(when, Mapping) else when)]
+        if not conditions:
+            raise ValueError(f"Rule {spec.get('name')!r} needs at least one condition.")
+        if scope == "resource":
+            for condition in conditions:
+                if not _is_resource_field(condition.field):
+                    raise ValueError(
+                        f"Rule {spec.get('name')!r} references unknown resource field {condition.field!r}."
+                    )
+        compiled.append(CompiledRule(spec["name"], scope, conditions, spec["message"], RuleStats()))
+    return compiled
+
+
+def load_rules(path: str | Path) -> List[Dict[str, Any]]:
+    """Read rule mappings from a JSON or YAML file (YAML requires PyYAML)."""
+
+    path = Path(path)
+    text = path.read_text()
+    if path.suffix in (".yaml", ".yml"):
+        try:
+            import yaml
+        except ImportError as exc:
+            raise ImportError("Loading YAML rule files requires the optional 'PyYAML' package.") from exc
+        payload = yaml.safe_load(text)
+    else:
+        payload = json.loads(text)
+    return list(payload["rules"] if isinstance(payload, Mapping) else payload)
+
+
+class _Columns:
+    """Indexes over one table, built at most once per field for a single evaluation.
+
+    Numeric columns tested by several conditions are sorted once so ordering
+    and equality thresholds are answered by bisection (a single test is
+    cheaper as a scan); other fields are grouped by distinct value so each
+    predicate runs once per value. Candidate rows are shared by identical
+    conditions across rules.
+    """
+
+    def __init__(self, table: ResourceTable, rules: Sequence[CompiledRule]) -> None:
+        self._table = table
+        self._rules = len(rules)
+        self._uses: Dict[str, int] = {}
+        for rule in rules:
+            for condition in rule.conditions:
+                self._uses[condition.field] = self._uses.get(condition.field, 0) + 1
+        self._values: Dict[str, Sequence[Any]] = {}
+        self._sorted: Dict[str, Tuple[List[float], List[int]]] = {}
+        self._groups: Dict[str, Dict[Any, List[int]]] = {}
+        self._candidates: Dict[Tuple[str, str, str], List[int]] = {}
+
+    def values(self, field: str) -> Sequence[Any]:
+        """Return the per-row values of ``field``."""
+
+        if field not in self._values:
+            if field == "cost_per_month":
+                column: Sequence[Any] = self._table.cost_per_month()
+            elif field in _NUMERIC_FIELDS:
+                column = getattr(self._table, field)
+            elif field == "name":
+                column = self._table.names
+            else:
+                by = field if field in _LABEL_FIELDS else f"tag:{field[len('tags.') :]}"
+                codes, labels = self._table.dimension(by)
+                column = [labels[code] for code in codes]
+            self._values[field] = column
+        return self._values[field]
+
+    def _sorted_column(self, field: str) -> Tuple[List[float], List[int]]:
+        if field not in self._sorted:
+            column = self.values(field)
+            order = sorted(range(len(column)), key=column.__getitem__)
+            self._sorted[field] = ([column[row] for row in order], order)
+        return self._sorted[field]
+
+    def _grouped(self, field: str) -> Dict[Any, List[int]]:
+        if field not in self._groups:
+            groups: Dict[Any, List[int]] = {}
+            for row, value in enumerate(self.values(field)):
+                groups.setdefault(value, []).append(row)
+            self._groups[field] = groups
+        return self._groups[field]
+
+    def sorted_names(self, rows: Set[int]) -> List[str]:
+        """Return the names of ``rows`` in sorted order."""
+
+        names = self._table.names
+        if self._rules < _SORT_MIN_USES or len(rows) * 16 < len(names):
+            return sorted(names[row] for row in rows)
+        # Large matches: walk the name order once instead of re-sorting strings per rule.
+        order = self._sorted_column("name")[1]
+        return [names[row] for row in order if row in rows]
+
+    def candidates(self, condition: _Condition) -> List[int]:
+        """Return the rows satisfying ``condition``, in no particular order."""
+
+        key = condition.key
+        if key not in self._candidates:
+            self._candidates[key] = self._match(condition)
+        return self._candidates[key]
+
+    def _match(self, condition: _Condition) -> List[int]:
+        field, op = condition.field, condition.op
+        if field in _NUMERIC_FIELDS and self._uses.get(field, 0) < _SORT_MIN_USES:
+            test = condition.test
+            return [row for row, value in enumerate(self.values(field)) if test(value)]
+        if field in _NUMERIC_FIELDS and op in ("<", "<=", ">", ">=", "==", "!="):
+            values, order = self._sorted_column(field)
+            low, high = bisect_left(values, condition.value), bisect_right(values, condition.value)
+            if op == "<":
+                return order[:low]
+            if op == "<=":
+                return order[:high]
+            if op == ">":
+                return order[high:]
+            if op == ">=":
+                return order[low:]
+            if op == "==":
+                return order[low:high]
+            return order[:low] + order[high:]
+        rows: List[int] = []
+        for value, group in self._grouped(field).items():
+            if condition.test(value):
+                rows.extend(group)
+        return rows
+
+
+class RuleEngine:
+    """Evaluate compiled rules against a resource table and provider metrics."""
+
+    def __init__(self, rules: Sequence[Mapping[str, Any]] | None = None) -> None:
+        self.rules = compile_rules(DEFAULT_RULES if rules is None else rules)
+
+    @property
+    def stats(self) -> Dict[str, RuleStats]:
+        return {rule.name: rule.stats for rule in self.rules}
+
+    def _resource_matches(self, rule: CompiledRule, columns: _Columns) -> Set[int]:
+        candidates: List[List[int]] = []
+        for condition in rule.conditions:
+            rows = columns.candidates(condition)
+            if not rows:
+                return set()
+            candidates.append(rows)
+        # Intersect starting from the most selective condition.
+        candidates.sort(key=len)
+        matches = set(candidates[0])
+        for rows in candidates[1:]:
+            if not matches:
+                break
+            matches = matches.intersection(rows)
+        return matches
+
+    def evaluate(
+        self,
+        resources: ResourceTable | Iterable[CloudResource],
+        metrics: Mapping[str, Mapping[str, float]],
+    ) -> List[str]:
+        """Return the messages of every rule that fired, resource rules first."""
+
+        table = resources if isinstance(resources, ResourceTable) else ResourceTable.from_resources(resources)
+        columns = _Columns(table, [rule for rule in self.rules if rule.scope == "resource"])
+        messages: List[str] = []
+        for rule in self.rules:
+            if rule.scope != "resource":
+                continue
+            start = time.perf_counter()
+            rows = self._resource_matches(rule, columns)
+            rule.stats.evaluations += len(table)
+            rule.stats.matches += len(rows)
+            if rows:
+                names = ", ".join(columns.sorted_names(rows))
+                messages.append(rule.message.format(names=names, count=len(rows)))
+            rule.stats.seconds += time.perf_counter() - start
+
+        provider_rules = [rule for rule in self.rules if rule.scope == "provider"]
+        for provider, provider_metrics in metrics.items():
+            for rule in provider_rules:
+                start = time.perf_counter()
+                values = dict(provider_metrics)
+                for condition in rule.conditions:
+                    values.setdefault(condition.field, condition.default)
+                rule.stats.evaluations += 1
+                if all(condition.test(values[condition.field]) for condition in rule.conditions):
+                    rule.stats.matches += 1
+                    messages.append(rule.message.format(provider=provider, PROVIDER=provider.upper(), **values))
+                rule.stats.seconds += time.perf_counter() - start
+        return messages
+
+
+__all__ = ["DEFAULT_RULES", "RuleEngine", "RuleStats", "compile_rules", "load_rules"]
@@ -2,20 +2,21 @@
 
 from __future__ import annotations
 
+import os
 from pprint import pprint
+from typing import Sequence
 
-from .connectors.aws import AWSConnector
-from .connectors.azure import AzureConnector
-from .connectors.gcp import GCPConnector
+from .connectors.registry import create_connectors
+from .history import SnapshotStore
 from .platform import CloudOpsPlatform
 
 
-def main() -> None:
-    platform = CloudOpsPlatform(
-        connectors=[AWSConnector(), AzureConnector(), GCPConnector()]
-    )
+def main(history_dir: str | None = None, providers: Sequence[str] | None = None) -> None:
+    platform = CloudOpsPlatform(connectors=create_connectors(providers))
     snapshot = platform.collect_posture_snapshot()
     costs = platform.summarize_costs(snapshot)
+    if history_dir:
+        SnapshotStore(history_dir).append(snapshot)
 
     print("=== Resources ===")
     for resource in snapshot.resources:
@@ -44,4 +45,8 @@ def main() -> None:
 
 
 if __name__ == "__main__":
-    main()
+    selected = os.environ.get("CLOUDOPS_PROVIDERS")
+    main(
+        history_dir=os.environ.get("CLOUDOPS_HISTORY_DIR"),
+        providers=selected.split(",") if selected else None,
+    )
@@ -0,0 +1,256 @@
+"""Posture snapshots and incremental (delta) refreshes between them."""
+
+from __future__ import annotations
+
+from bisect import bisect_right
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Mapping, Set, Tuple
+
+from .connectors.base import CloudResource
+from .index import Range, ResourceIndex
+from .inventory import ResourceTable
+
+
+ResourceKey = Tuple[str, str]
+
+
+def resource_key(resource: CloudResource) -> ResourceKey:
+    return (resource.provider, resource.name)
+
+
+def resource_version(resource: CloudResource) -> int:
+    """Fingerprint every mutable attribute of ``resource``."""
+
+    return hash(
+        (
+            resource.resource_type,
+            resource.cost_per_hour,
+            resource.utilization,
+            tuple(sorted(resource.tags.items())),
+        )
+    )
+
+
+def _group(resources: Iterable[CloudResource]) -> Dict[ResourceKey, List[CloudResource]]:
+    grouped: Dict[ResourceKey, List[CloudResource]] = defaultdict(list)
+    for resource in resources:
+        grouped[resource_key(resource)].append(resource)
+    return grouped
+
+
+@dataclass
+class PostureSnapshot:
+    """Collected resources, metrics and findings.
+
+    The table, index and versions derived from ``resources`` are cached.
+    Assigning a new ``resources`` list drops them; after changing the list
+    or a resource's ``tags`` in place, call :meth:`invalidate`.
+    """
+
+    resources: List[CloudResource]
+    metrics: Dict[str, Dict[str, float]]
+    security_findings: Dict[str, List[str]]
+    advisor_recommendations: List[str]
+    collection_errors: Dict[str, List[str]] = field(default_factory=dict)
+    resource_versions: Dict[ResourceKey, Tuple[int, ...]] = field(default_factory=dict, repr=False, compare=False)
+    resource_table: ResourceTable | None = field(default=None, repr=False, compare=False)
+    resource_index: ResourceIndex | None = field(default=None, repr=False, compare=False)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        super().__setattr__(name, value)
+        # Fields after ``resources`` are unset while ``__init__`` runs.
+        if name == "resources" and hasattr(self, "resource_index"):
+            self.invalidate()
+
+    def invalidate(self) -> None:
+        """Drop the cached table, index and versions so they are rebuilt on next use."""
+
+        self.resource_table = None
+        self.resource_index = None
+        self.resource_versions = {}
+
+    def table(self) -> ResourceTable:
+        """Return the resources as a :class:`ResourceTable`, built on first use."""
+
+        if self.resource_table is None:
+            self.resource_table = ResourceTable.from_resources(self.resources)
+            self.resource_index = None
+        return self.resource_table
+
+    def index(self) -> ResourceIndex:
+        table = self.table()
+        if self.resource_index is None or self.resource_index.table is not table:
+            self.resource_index = ResourceIndex(table)
+        return self.resource_index
+
+    def query(
+        self,
+        provider: str | None = None,
+        resource_type: str | None = None,
+        tags: Mapping[str, str] | None = None,
+        utilization: Range | None = None,
+        cost_per_hour: Range | None = None,
+    ) -> List[CloudResource]:
+        """Return the resources matching every given filter, in snapshot order.
+
+        Ranges are half-open ``(low, high)`` tuples where either bound may be
+        ``None``, e.g. ``query(tags={"env": "prod", "tier": "web"},
+        utilization=(None, 0.35))``. The index is built on first use.
+        """
+
+        rows = self.index().select(provider, resource_type, tags, utilization, cost_per_hour)
+        return [self.resources[row] for row in rows]
+
+    def versions(self) -> Dict[ResourceKey, Tuple[int, ...]]:
+        """Return fingerprints per resource key, computed on first use.
+
+        Same-provider connectors may report resources with the same name, so
+        each key maps to the fingerprints of all of them in snapshot order.
+        """
+
+        if not self.resource_versions and self.resources:
+            self.resource_versions = {
+                key: tuple(resource_version(resource) for resource in group)
+                for key, group in _group(self.resources).items()
+            }
+        return self.resource_versions
+
+
+@dataclass
+class SnapshotDelta:
+    """Changes between two snapshots plus the refreshed snapshot itself."""
+
+    added: List[CloudResource]
+    removed: List[CloudResource]
+    changed: List[Tuple[CloudResource, CloudResource]]
+    findings_added: Dict[str, List[str]]
+    findings_removed: Dict[str, List[str]]
+    metrics_changed: Dict[str, Dict[str, float]]
+    cost_delta: Dict[str, float]
+    snapshot: PostureSnapshot
+
+    @property
+    def is_empty(self) -> bool:
+        return not (
+            self.added
+            or self.removed
+            or self.changed
+            or self.findings_added
+            or self.findings_removed
+            or self.metrics_changed
+        )
+
+
+def _diff_findings(
+    before: Dict[str, List[str]], after: Dict[str, List[str]]
+) -> Tuple[Dict[str, List[str]], Dict[str, List[str]]]:
+    added: Dict[str, List[str]] = {}
+    removed: Dict[str, List[str]] = {}
+    for provider in before.keys() | after.keys():
+        old, new = before.get(provider, []), after.get(provider, [])
+        old_set, new_set = set(old), set(new)
+        if appeared := [finding for finding in new if finding not in old_set]:
+            added[provider] = appeared
+        if vanished := [finding for finding in old if finding not in new_set]:
+            removed[provider] = vanished
+    return added, removed
+
+
+def diff_snapshot(
+    previous: PostureSnapshot,
+    resources: Iterable[CloudResource],
+    metrics: Dict[str, Dict[str, float]],
+    security_findings: Dict[str, List[str]],
+) -> SnapshotDelta:
+    """Compare freshly collected data with ``previous`` without re-sorting everything.
+
+    Resources are compared as a multiset per key, so two connectors for the
+    same provider may both report a resource of the same name. Unchanged
+    resources are recognised by their version fingerprint; changed ones are
+    replaced in place and added ones bisected into the previous (already
+    sorted) list. ``advisor_recommendations`` is carried over and must be
+    refreshed by the caller when the delta is not empty.
+    """
+
+    old_versions = previous.versions()
+    old_by_key = _group(previous.resources)
+    new_by_key = _group(resources)
+    new_versions: Dict[ResourceKey, Tuple[int, ...]] = {}
+    added: List[CloudResource] = []
+    removed: List[CloudResource] = []
+    changed: List[Tuple[CloudResource, CloudResource]] = []
+    touched: Set[ResourceKey] = set()
+    for key in sorted(old_by_key.keys() | new_by_key.keys()):
+        news = new_by_key.get(key, [])
+        versions = tuple(resource_version(resource) for resource in news)
+        if versions:
+            new_versions[key] = versions
+        if versions == old_versions.get(key, ()):
+            continue
+        touched.add(key)
+        pending = list(zip(old_by_key.get(key, []), old_versions.get(key, ())))
+        fresh = []
+        for resource, version in zip(news, versions):
+            match = next((i for i, (_, old) in enumerate(pending) if old == version), None)
+            if match is None:
+                fresh.append(resource)
+            else:
+                del pending[match]
+        stale = [resource for resource, _ in pending]
+        changed.extend(zip(stale, fresh))
+        added.extend(fresh[len(stale):])
+        removed.extend(stale[len(fresh):])
+
+    cost_delta: Dict[str, float] = defaultdict(float)
+    for resource in added:
+        cost_delta[resource.provider] += resource.cost_per_month()
+    for resource in removed:
+        cost_delta[resource.provider] -= resource.cost_per_month()
+    for before, after in changed:
+        cost_delta[after.provider] += after.cost_per_month() - before.cost_per_month()
+
+    if added or removed or changed:
+        replaced = {id(before): after for before, after in changed}
+        dropped = {id(resource) for resource in removed}
+        refreshed = [
+            replaced.get(id(resource), resource)
+            for resource in previous.resources
+            if id(resource) not in dropped
+        ]
+        for resource in added:
+            refreshed.insert(bisect_right(refreshed, resource_key(resource), key=resource_key), resource)
+        # Keep the fingerprints of touched keys in the refreshed list's order.
+        regrouped = _group(resource for resource in refreshed if resource_key(resource) in touched)
+        new_versions.update(
+            (key, tuple(resource_version(resource) for resource in group)) for key, group in regrouped.items()
+        )
+    else:
+        refreshed = list(previous.resources)
+
+    metrics_changed = {
+        provider: values for provider, values in metrics.items() if previous.metrics.get(provider) != values
+    }
+    findings_added, findings_removed = _diff_findings(previous.security_findings, security_findings)
+
+    snapshot = PostureSnapshot(
+        resources=refreshed,
+        metrics=metrics,
+        security_findings=security_findings,
+        advisor_recommendations=previous.advisor_recommendations,
+        resource_versions=new_versions,
+    )
+    cost_delta["total"] = sum(cost_delta.values())
+    return SnapshotDelta(
+        added=added,
+        removed=removed,
+        changed=changed,
+        findings_added=findings_added,
+        findings_removed=findings_removed,
+        metrics_changed=metrics_changed,
+        cost_delta={provider: round(cost, 2) for provider, cost in cost_delta.items()},
+        snapshot=snapshot,
+    )
+
+
+__all__ = ["PostureSnapshot", "SnapshotDelta", "diff_snapshot", "resource_key", "resource_version"]
@@ -13,10 +13,11 @@ from airflow.operators.python import PythonOperator
 from airflow.providers.databricks.operators.databricks import DatabricksRunNowOperator
 
 from etl.etl_job import etl_pipeline
-from monitoring.anomaly_detector import detect_anomalies
+from monitoring.anomaly_detector import detect_column_anomalies
 
 
 DEFAULT_ARGS = {"owner": "dataops", "retries": 1}
+VALIDATION_COLUMNS = ["amount"]
 
 
 with DAG(
@@ -45,7 +46,8 @@ with DAG(
 
     validate = PythonOperator(
         task_id="validate_data",
-        python_callable=lambda: detect_anomalies("etl/sample_sales.csv", "amount"),
+        # One parse of the file scores every validated column.
+        python_callable=lambda: detect_column_anomalies("etl/sample_sales.csv", VALIDATION_COLUMNS),
     )
 
     ingest_csv >> run_databricks >> validate
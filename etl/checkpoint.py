@@ -0,0 +1,211 @@
+"""Stage-level checkpoints so a failed pipeline run resumes instead of restarting.
+
+Each extracted and each transformed chunk is spilled to a gzip-compressed
+columnar stage file (see :mod:`snowflake.connector.staging`) under a
+directory named after the input fingerprint (path, size, mtime and chunk
+size). A JSON manifest records which chunks are complete. A retry of the same
+input skips every completed chunk: a failed load reloads from the transform
+spill without re-extracting, and an interrupted extract or transform resumes
+at the first missing chunk. The checkpoint is deleted once the load succeeds.
+"""
+
+from __future__ import annotations
+
+import csv
+import json
+import os
+import shutil
+from dataclasses import asdict, dataclass, field
+from hashlib import blake2b
+from itertools import chain
+from pathlib import Path
+from typing import Iterator, List, Tuple
+
+from etl.dedup import RowDeduplicator
+from etl.etl_job import DATA_PATH, DEFAULT_CHUNK_ROWS, Record, _checked_record, load, transform
+from monitoring.tracing import span
+from snowflake.connector.staging import read_stage_file, suffix_for, write_stage_file
+
+
+DEFAULT_CHECKPOINT_DIR = Path(".etl_checkpoints")
+SPILL_FORMAT = "columnar"
+
+
+def input_fingerprint(source: str | Path, chunk_rows: int) -> str:
+    """Identify an input by path, size, modification time and chunking."""
+
+    path = Path(source).resolve()
+    stat = path.stat()
+    key = f"{path}\x1f{stat.st_size}\x1f{stat.st_mtime_ns}\x1f{chunk_rows}"
+    return blake2b(key.encode(), digest_size=16).hexdigest()
+
+
+@dataclass
+class StageProgress:
+    """Spill files written so far for one stage (``None`` marks an empty chunk).
+
+    For the extract stage, ``offset`` is the source byte offset just past the
+    last spilled chunk and ``fieldnames`` is the source header.
+    """
+
+    chunks: List[str | None] = field(default_factory=list)
+    complete: bool = False
+    offset: int = 0
+    fieldnames: List[str] | None = None
+
+
+class Checkpoint:
+    """Manifest and spill files for one input fingerprint."""
+
+    def __init__(self, root: str | Path, fingerprint: str, source: str | Path | None = None) -> None:
+        self.root = Path(root)
+        self.path = self.root / fingerprint
+        self.source = str(Path(source).resolve()) if source is not None else None
+        self._manifest = self.path / "manifest.json"
+        self.stages = {"extract": StageProgress(), "transform": StageProgress()}
+        if self._manifest.exists():
+            payload = json.loads(self._manifest.read_text())
+            self.stages = {name: StageProgress(**value) for name, value in payload["stages"].items()}
+
+    def save(self) -> None:
+        """Persist the manifest atomically so a crash never leaves it half-written."""
+
+        self.path.mkdir(parents=True, exist_ok=True)
+        payload = {
+            "source": self.source,
+            "stages": {name: asdict(progress) for name, progress in self.stages.items()},
+        }
+        tmp_path = self._manifest.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(payload, indent=2))
+        os.replace(tmp_path, self._manifest)
+
+    def spill(
+        self, stage: str, rows: List[Record], offset: int | None = None, fieldnames: List[str] | None = None
+    ) -> None:
+        """Write one chunk of ``stage`` output and record it, with the source position, as complete."""
+
+        progress = self.stages[stage]
+        name: str | None = None
+        if rows:
+            name = f"{stage}-{len(progress.chunks):05d}{suffix_for(SPILL_FORMAT)}"
+            self.path.mkdir(parents=True, exist_ok=True)
+            write_stage_file(self.path / name, rows, list(rows[0]), SPILL_FORMAT)
+        progress.chunks.append(name)
+        if offset is not None:
+            progress.offset = offset
+        if fieldnames is not None:
+            progress.fieldnames = fieldnames
+        self.save()
+
+    def complete(self, stage: str) -> None:
+        self.stages[stage].complete = True
+        self.save()
+
+    def read(self, stage: str, start: int = 0, stop: int | None = None) -> Iterator[List[Record]]:
+        """Yield the spilled chunks of ``stage`` from ``start`` to ``stop``."""
+
+        for name in self.stages[stage].chunks[start:stop]:
+            yield [] if name is None else list(read_stage_file(self.path / name))
+
+    def remove(self) -> None:
+        shutil.rmtree(self.path, ignore_errors=True)
+
+    def prune_stale(self) -> int:
+        """Delete checkpoints left by earlier versions of this source; return how many."""
+
+        if self.source is None or not self.root.is_dir():
+            return 0
+        pruned = 0
+        for manifest in self.root.glob("*/manifest.json"):
+            if manifest.parent == self.path:
+                continue
+            try:
+                source = json.loads(manifest.read_text()).get("source")
+            except (OSError, ValueError):
+                continue
+            if source == self.source:
+                shutil.rmtree(manifest.parent, ignore_errors=True)
+                pruned += 1
+        return pruned
+
+
+def _iter_chunks(
+    source: Path, chunk_rows: int, offset: int, fieldnames: List[str] | None
+) -> Iterator[Tuple[List[Record], int, List[str]]]:
+    """Yield ``(chunk, end_offset, fieldnames)`` reading ``source`` from byte ``offset``.
+
+    ``end_offset`` falls just past the chunk's last record, so a later call can
+    seek there directly.
+    """
+
+    position = offset
+    with source.open("rb") as handle:
+        handle.seek(offset)
+
+        def _lines() -> Iterator[str]:
+            nonlocal position
+            for raw in handle:
+                position += len(raw)
+                yield raw.decode()
+
+        reader = csv.DictReader(_lines(), fieldnames=fieldnames)
+        chunk: List[Record] = []
+        for row in reader:
+            chunk.append(_checked_record(row, reader.fieldnames))
+            if len(chunk) >= chunk_rows:
+                yield chunk, position, list(reader.fieldnames)
+                chunk = []
+        if chunk:
+            yield chunk, position, list(reader.fieldnames)
+
+
+def _extract(checkpoint: Checkpoint, source: Path, chunk_rows: int) -> None:
+    progress = checkpoint.stages["extract"]
+    if progress.chunks and progress.fieldnames is None:
+        # Written before offsets were recorded; there is nowhere to seek to.
+        progress.chunks = []
+    done = len(progress.chunks)
+    with span("etl.checkpoint.extract", resumed_chunks=done):
+        chunks = _iter_chunks(source, chunk_rows, progress.offset, progress.fieldnames)
+        for chunk, offset, fieldnames in chunks:
+            checkpoint.spill("extract", chunk, offset, fieldnames)
+    checkpoint.complete("extract")
+
+
+def _transform(checkpoint: Checkpoint, dedup: RowDeduplicator) -> None:
+    done = len(checkpoint.stages["transform"].chunks)
+    with span("etl.checkpoint.transform", resumed_chunks=done):
+        # Rebuild the cross-chunk dedup state from the already transformed chunks.
+        for chunk in checkpoint.read("extract", 0, done):
+            for row in chunk:
+                dedup.is_duplicate(row)
+        for chunk in checkpoint.read("extract", done):
+            checkpoint.spill("transform", transform(chunk, dedup))
+    checkpoint.complete("transform")
+
+
+def run_checkpointed_pipeline(
+    source: str | Path = DATA_PATH,
+    checkpoint_dir: str | Path = DEFAULT_CHECKPOINT_DIR,
+    chunk_rows: int = DEFAULT_CHUNK_ROWS,
+    stage_format: str | None = None,
+    dedup: RowDeduplicator | None = None,
+) -> int:
+    """Run extract, transform and load, resuming from any checkpoint left by a failed run.
+
+    ``dedup`` should start empty: its state is rebuilt from the spilled chunks.
+    """
+
+    source = Path(source)
+    checkpoint = Checkpoint(checkpoint_dir, input_fingerprint(source, chunk_rows), source)
+    if not checkpoint.stages["extract"].complete:
+        _extract(checkpoint, source, chunk_rows)
+    if not checkpoint.stages["transform"].complete:
+        _transform(checkpoint, dedup or RowDeduplicator())
+    nrows = load(chain.from_iterable(checkpoint.read("transform")), stage_format=stage_format)
+    checkpoint.remove()
+    checkpoint.prune_stale()
+    return nrows
+
+
+__all__ = ["Checkpoint", "DEFAULT_CHECKPOINT_DIR", "input_fingerprint", "run_checkpointed_pipeline"]
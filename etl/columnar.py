@@ -0,0 +1,124 @@
+"""Columnar execution engine for the ETL demo.
+
+Batches hold one sequence per column instead of one dict per row. Extraction
+transposes ``csv.reader`` tuples with ``zip``, coercion runs as a single
+``map`` into a typed ``array('d')`` and dedup produces a keep mask that is
+applied to every column with ``itertools.compress``. Records are only built
+again at the load boundary, and they match the row-wise path exactly. Like
+that path, short rows are padded with ``None`` and rows with more fields than
+the header raise ``ValueError``.
+"""
+
+from __future__ import annotations
+
+import csv
+from array import array
+from dataclasses import dataclass
+from itertools import compress
+from pathlib import Path
+from typing import Iterable, Iterator, Sequence
+
+from etl.dedup import RowDeduplicator
+
+
+Record = dict[str, object]
+
+
+@dataclass
+class ColumnBatch:
+    """A chunk of the dataset stored column by column."""
+
+    names: list[str]
+    columns: dict[str, Sequence[object]]
+
+    def __len__(self) -> int:
+        return len(self.columns[self.names[0]]) if self.names else 0
+
+    def iter_records(self) -> Iterator[Record]:
+        """Rebuild row dicts in column order for row-oriented sinks."""
+
+        names = self.names
+        for values in zip(*(self.columns[name] for name in names)):
+            yield dict(zip(names, values))
+
+
+def _transpose(names: list[str], rows: list[list[str]]) -> ColumnBatch:
+    width = len(names)
+    for row in rows:
+        if len(row) < width:
+            row.extend([None] * (width - len(row)))
+        elif len(row) > width:
+            raise ValueError(f"Row has {len(row)} fields but the header defines {width}.")
+    columns = dict(zip(names, (list(series) for series in zip(*rows))))
+    return ColumnBatch(names=list(names), columns=columns)
+
+
+def iter_extract_columns(
+    path: str | Path, batch_rows: int, batch_bytes: int | None = None
+) -> Iterator[ColumnBatch]:
+    """Read ``path`` into column batches bounded by row count and, optionally, byte size.
+
+    As in :func:`etl.etl_job.iter_extract`, a row's size approximates its
+    encoded CSV line.
+    """
+
+    if batch_rows < 1:
+        raise ValueError("batch_rows must be at least 1.")
+    if batch_bytes is not None and batch_bytes < 1:
+        raise ValueError("batch_bytes must be at least 1 when provided.")
+
+    with Path(path).open(newline="") as handle:
+        reader = csv.reader(handle)
+        names = next(reader, None)
+        if names is None:
+            return
+        pending: list[list[str]] = []
+        size = 0
+        for row in reader:
+            if not row:
+                continue
+            pending.append(row)
+            if batch_bytes is not None:
+                size += sum(map(len, row)) + len(names)
+            if len(pending) >= batch_rows or (batch_bytes is not None and size >= batch_bytes):
+                yield _transpose(names, pending)
+                pending = []
+                size = 0
+        if pending:
+            yield _transpose(names, pending)
+
+
+def _to_amount(value: object) -> float:
+    return float(value) if value not in (None, "", "None") else 0.0
+
+
+def transform_columns(batch: ColumnBatch, dedup: RowDeduplicator) -> ColumnBatch:
+    """Drop duplicates and coerce ``amount`` on a whole batch at once."""
+
+    mask = dedup.keep_mask(batch.columns)
+    if all(mask):
+        columns = dict(batch.columns)
+    else:
+        columns = {name: list(compress(series, mask)) for name, series in batch.columns.items()}
+    names = list(batch.names)
+    if "amount" in columns:
+        columns["amount"] = array("d", map(_to_amount, columns["amount"]))
+    else:
+        names.append("amount")
+        columns["amount"] = array("d", [0.0]) * len(next(iter(columns.values()), ()))
+    return ColumnBatch(names=names, columns=columns)
+
+
+def iter_transform_columns(
+    batches: Iterable[ColumnBatch], dedup: RowDeduplicator | None = None
+) -> Iterator[ColumnBatch]:
+    """Clean batches lazily, sharing dedup state across batch boundaries."""
+
+    dedup = dedup or RowDeduplicator()
+    for batch in batches:
+        cleaned = transform_columns(batch, dedup)
+        if len(cleaned):
+            yield cleaned
+
+
+__all__ = ["ColumnBatch", "iter_extract_columns", "iter_transform_columns", "transform_columns"]
@@ -0,0 +1,206 @@
+"""Fingerprint-based duplicate detection used by the ETL transform stage."""
+
+from __future__ import annotations
+
+import math
+import sqlite3
+from hashlib import blake2b
+from pathlib import Path
+from typing import Mapping, Sequence
+
+
+Row = Mapping[str, object]
+
+
+def _encode(columns: Sequence[str], values: Sequence[object]) -> bytes:
+    return "\x1e".join(f"{column}\x1f{value!r}" for column, value in zip(columns, values)).encode()
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter keyed by pre-computed fingerprints."""
+
+    def __init__(self, capacity: int = 1_000_000, error_rate: float = 0.01) -> None:
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1.")
+        if not 0 < error_rate < 1:
+            raise ValueError("error_rate must be between 0 and 1.")
+        nbits = math.ceil(-capacity * math.log(error_rate) / (math.log(2) ** 2))
+        self.nbits = max(nbits, 8)
+        self.nhashes = max(1, round(self.nbits / capacity * math.log(2)))
+        self._bits = bytearray((self.nbits + 7) // 8)
+
+    def _positions(self, digest: bytes) -> list[int]:
+        half = len(digest) // 2
+        h1 = int.from_bytes(digest[:half], "little")
+        h2 = int.from_bytes(digest[half:], "little") | 1
+        return [(h1 + i * h2) % self.nbits for i in range(self.nhashes)]
+
+    def add(self, digest: bytes) -> None:
+        for pos in self._positions(digest):
+            self._bits[pos >> 3] |= 1 << (pos & 7)
+
+    def __contains__(self, digest: bytes) -> bool:
+        return all(self._bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(digest))
+
+
+class RowDeduplicator:
+    """Drop repeated rows by storing fixed-size fingerprints instead of rows.
+
+    Rows are hashed with BLAKE2b over a canonical (sorted) column order, so
+    memory grows by ``digest_bits / 8`` bytes per distinct row rather than by a
+    full copy of it. ``spill_path`` moves the fingerprints into an on-disk
+    SQLite table, in which case a Bloom filter sized for ``expected_rows``
+    answers most lookups for new rows without touching disk. ``verify=True``
+    also keeps the canonical encoding so fingerprint collisions never drop a
+    distinct row.
+    """
+
+    def __init__(
+        self,
+        columns: Sequence[str] | None = None,
+        *,
+        digest_bits: int = 64,
+        verify: bool = False,
+        spill_path: str | Path | None = None,
+        bloom: bool | None = None,
+        expected_rows: int = 1_000_000,
+    ) -> None:
+        if digest_bits not in (64, 128):
+            raise ValueError("digest_bits must be 64 or 128.")
+        self._columns = tuple(columns) if columns is not None else None
+        self._digest_size = digest_bits // 8
+        self._verify = verify
+        self._order_cache: dict[tuple[str, ...], tuple[str, ...]] = {}
+        self._memory: dict[bytes, bytes | None] = {}
+        self._collisions: set[bytes] = set()
+        self._db: sqlite3.Connection | None = None
+        if spill_path is not None:
+            self._db = sqlite3.connect(str(spill_path))
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS fingerprints (digest BLOB PRIMARY KEY, canonical BLOB)"
+            )
+        use_bloom = bloom if bloom is not None else spill_path is not None
+        self._bloom = BloomFilter(expected_rows) if use_bloom else None
+        if self._bloom is not None and self._db is not None:
+            # A reopened spill file must seed the filter or known rows would look new.
+            for (digest,) in self._db.execute("SELECT digest FROM fingerprints"):
+                self._bloom.add(digest)
+        self.rows_in = 0
+        self.rows_dropped = 0
+
+    def _column_order(self, keys: Sequence[str]) -> tuple[str, ...]:
+        if self._columns is not None:
+            return self._columns
+        keys = tuple(keys)
+        order = self._order_cache.get(keys)
+        if order is None:
+            order = self._order_cache.setdefault(keys, tuple(sorted(keys)))
+        return order
+
+    def _canonical(self, row: Row) -> bytes:
+        columns = self._column_order(tuple(row))
+        return _encode(columns, [row.get(column) for column in columns])
+
+    def _lookup(self, digest: bytes) -> tuple[bool, bytes | None]:
+        if self._db is None:
+            if digest in self._memory:
+                return True, self._memory[digest]
+            return False, None
+        found = self._db.execute(
+            "SELECT canonical FROM fingerprints WHERE digest = ?", (digest,)
+        ).fetchone()
+        return (True, found[0]) if found else (False, None)
+
+    def _store(self, digest: bytes, canonical: bytes | None) -> None:
+        if self._db is None:
+            self._memory[digest] = canonical
+        else:
+            self._db.execute("INSERT INTO fingerprints VALUES (?, ?)", (digest, canonical))
+        if self._bloom is not None:
+            self._bloom.add(digest)
+
+    def settings(self) -> dict[str, object]:
+        """Return the arguments for an in-memory deduplicator that fingerprints rows identically."""
+
+        return {"columns": self._columns, "digest_bits": self._digest_size * 8, "verify": self._verify}
+
+    def is_duplicate(self, row: Row) -> bool:
+        """Return ``True`` when ``row`` was already seen, recording it otherwise."""
+
+        return self._check(self._canonical(row))
+
+    def fingerprint(self, row: Row) -> tuple[bytes, bytes]:
+        """Return ``(digest, canonical)`` for ``row`` without recording it."""
+
+        canonical = self._canonical(row)
+        return self._digest(canonical), canonical
+
+    def is_duplicate_digest(self, digest: bytes, canonical: bytes | None = None) -> bool:
+        """Like :meth:`is_duplicate` for a fingerprint computed elsewhere.
+
+        ``canonical`` is required for exact collision checks when the
+        deduplicator was created with ``verify=True``.
+        """
+
+        self.rows_in += 1
+        return self._record(digest, canonical)
+
+    def keep_mask(self, columns: Mapping[str, Sequence[object]]) -> list[bool]:
+        """Return a keep/drop mask for a column batch, row for row.
+
+        Produces the same decisions as calling :meth:`is_duplicate` on each
+        row of the batch in order.
+        """
+
+        order = self._column_order(tuple(columns))
+        nrows = len(next(iter(columns.values()), ()))
+        encoded = [
+            [f"{name}\x1f{value!r}" for value in columns.get(name, [None] * nrows)] for name in order
+        ]
+        check = self._check
+        return [not check("\x1e".join(parts).encode()) for parts in zip(*encoded)]
+
+    def _digest(self, canonical: bytes) -> bytes:
+        return blake2b(canonical, digest_size=self._digest_size).digest()
+
+    def _check(self, canonical: bytes) -> bool:
+        self.rows_in += 1
+        return self._record(self._digest(canonical), canonical)
+
+    def _record(self, digest: bytes, canonical: bytes | None) -> bool:
+        stored = canonical if self._verify else None
+
+        if self._bloom is not None and digest not in self._bloom:
+            self._store(digest, stored)
+            return False
+
+        found, existing = self._lookup(digest)
+        if not found:
+            self._store(digest, stored)
+            return False
+        if self._verify and canonical is not None and existing != canonical:
+            if canonical in self._collisions:
+                self.rows_dropped += 1
+                return True
+            self._collisions.add(canonical)
+            return False
+        self.rows_dropped += 1
+        return True
+
+    def close(self) -> None:
+        if self._db is not None:
+            self._db.commit()
+            self._db.close()
+            self._db = None
+
+    def __enter__(self) -> "RowDeduplicator":
+        return self
+
+    def __exit__(self, exc_type: object, *_: object) -> None:
+        if exc_type is not None and self._db is not None:
+            # Fingerprints of rows that never reached the target must not persist.
+            self._db.rollback()
+        self.close()
+
+
+__all__ = ["BloomFilter", "RowDeduplicator"]
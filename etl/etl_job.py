@@ -3,62 +3,369 @@
 from __future__ import annotations
 
 import csv
+import sys
+import time
+from dataclasses import dataclass, field
+from functools import partial
+from itertools import chain
 from pathlib import Path
-from typing import Iterable
+from typing import Dict, Iterable, Iterator, Sequence, Tuple, TypeVar
 
+from etl.columnar import iter_extract_columns, iter_transform_columns
+from etl.dedup import RowDeduplicator
+from monitoring.tracing import span, tracer
 from remediation.retry_handler import run_with_retries
-from snowflake.connector import FakeCursor, connect
+from snowflake.connector import FakeCursor, LoadStats, default_pool
 
 DATA_PATH = Path(__file__).resolve().parent / "sample_sales.csv"
+DEFAULT_CHUNK_ROWS = 10_000
 
 
 Record = dict[str, object]
+T = TypeVar("T")
 
+STAGES = ("extract", "transform", "load")
 
-def extract() -> list[Record]:
+
+@dataclass
+class PipelineResult:
+    """Structured outcome of one pipeline run.
+
+    ``stage_seconds`` holds the time spent in each of :data:`STAGES`
+    (exclusive of the stages feeding it, also when they are interleaved as
+    generators). ``peak_memory_bytes`` is the process's peak resident set
+    size since it started (not just during this run), or 0 where the
+    platform does not report it.
+    """
+
+    mode: str
+    rows_in: int = 0
+    rows_out: int = 0
+    rows_dropped: int = 0
+    bytes_read: int = 0
+    bytes_written: int = 0
+    duration_seconds: float = 0.0
+    peak_memory_bytes: int = 0
+    stage_seconds: Dict[str, float] = field(default_factory=dict)
+
+
+def _checked_record(row: dict, fieldnames: Sequence[str]) -> Record:
+    """Copy a ``csv.DictReader`` row, rejecting rows with more fields than the header.
+
+    Short rows are padded with ``None`` as usual; every pipeline mode, the
+    columnar one included, raises ``ValueError`` for long rows.
+    """
+
+    if None in row:
+        width = len(fieldnames)
+        raise ValueError(f"Row has {width + len(row[None])} fields but the header defines {width}.")
+    return dict(row)
+
+
+def extract(path: str | Path = DATA_PATH) -> list[Record]:
     """Load the raw CSV dataset used for the demo."""
 
-    with DATA_PATH.open() as handle:
+    with span("etl.extract", path=str(path)) as current, Path(path).open() as handle:
+        reader = csv.DictReader(handle)
+        rows = [_checked_record(row, reader.fieldnames) for row in reader]
+        current.set(rows=len(rows))
+    return rows
+
+
+def _record_size(row: Record) -> int:
+    """Approximate the encoded size of a CSV line holding ``row``."""
+
+    return sum(len(str(value)) for value in row.values()) + len(row)
+
+
+def iter_extract(
+    path: str | Path = DATA_PATH,
+    chunk_rows: int = DEFAULT_CHUNK_ROWS,
+    chunk_bytes: int | None = None,
+) -> Iterator[list[Record]]:
+    """Stream the CSV dataset as chunks bounded by row count and byte size."""
+
+    if chunk_rows < 1:
+        raise ValueError("chunk_rows must be at least 1.")
+    if chunk_bytes is not None and chunk_bytes < 1:
+        raise ValueError("chunk_bytes must be at least 1 when provided.")
+
+    with Path(path).open(newline="") as handle:
         reader = csv.DictReader(handle)
-        return [dict(row) for row in reader]
+        chunk: list[Record] = []
+        size = 0
+        for row in reader:
+            chunk.append(_checked_record(row, reader.fieldnames))
+            if chunk_bytes is not None:
+                size += _record_size(row)
+            if len(chunk) >= chunk_rows or (chunk_bytes is not None and size >= chunk_bytes):
+                yield chunk
+                chunk = []
+                size = 0
+        if chunk:
+            yield chunk
+
 
+def _fill_amount(row: Record) -> Record:
+    amount = row.get("amount")
+    row["amount"] = float(amount) if amount not in (None, "", "None") else 0.0
+    return row
 
-def transform(rows: Iterable[Record]) -> list[Record]:
-    """Clean the dataset by dropping duplicates and filling missing values."""
 
+def transform(rows: Iterable[Record], dedup: RowDeduplicator | None = None) -> list[Record]:
+    """Clean the dataset by dropping duplicates and filling missing values.
+
+    Pass a configured ``dedup`` to choose the fingerprint size, spill to disk
+    or verify collisions, and to read ``dedup.rows_dropped`` afterwards.
+    """
+
+    dedup = dedup or RowDeduplicator()
     cleaned: list[Record] = []
-    seen = set()
-    for row in rows:
-        key = tuple(sorted(row.items()))
-        if key in seen:
-            continue
-        seen.add(key)
-        amount = row.get("amount")
-        row["amount"] = float(amount) if amount not in (None, "", "None") else 0.0
-        cleaned.append(row)
+    with span("etl.transform") as current:
+        for row in rows:
+            if dedup.is_duplicate(row):
+                continue
+            cleaned.append(_fill_amount(row))
+        current.set(rows=len(cleaned))
     return cleaned
 
 
-def load(rows: Iterable[Record]) -> int:
-    """Write the records to a Snowflake-like destination."""
+def iter_transform(
+    chunks: Iterable[list[Record]], dedup: RowDeduplicator | None = None
+) -> Iterator[list[Record]]:
+    """Clean chunks lazily, de-duplicating across chunk boundaries."""
+
+    dedup = dedup or RowDeduplicator()
+    for chunk in chunks:
+        cleaned: list[Record] = []
+        for row in chunk:
+            if dedup.is_duplicate(row):
+                continue
+            cleaned.append(_fill_amount(row))
+        if cleaned:
+            yield cleaned
+
+
+def load(
+    rows: Iterable[Record],
+    overwrite: bool = True,
+    merge_keys: Sequence[str] | None = None,
+    chunk_rows: int | None = None,
+    stage_format: str | None = None,
+) -> int:
+    """Write the records to a Snowflake-like destination.
+
+    ``overwrite=False`` keeps the existing table and appends to it, while
+    ``merge_keys`` upserts rows on those columns. ``chunk_rows`` switches the
+    cursor to its multi-file bulk-load layout, and ``stage_format`` (which
+    implies it) picks a compressed or columnar stage file format. The
+    connection is borrowed from the shared :func:`default_pool`.
+    """
 
-    conn = connect()
-    cs: FakeCursor = conn.cursor()
-    cs.execute("CREATE OR REPLACE TABLE SALES (id int, product string, amount float)")
-    success, nchunks, nrows, _ = cs.write_records(rows, "SALES")
-    conn.close()
+    nrows, _ = _load(rows, overwrite, merge_keys, chunk_rows, stage_format)
+    return nrows
+
+
+def _load(
+    rows: Iterable[Record],
+    overwrite: bool = True,
+    merge_keys: Sequence[str] | None = None,
+    chunk_rows: int | None = None,
+    stage_format: str | None = None,
+) -> Tuple[int, LoadStats | None]:
+    if stage_format is not None and chunk_rows is None:
+        chunk_rows = DEFAULT_CHUNK_ROWS
+
+    with span("etl.load", stage_format=stage_format) as current, default_pool().connection() as conn:
+        cs: FakeCursor = conn.cursor()
+        if overwrite:
+            cs.execute("CREATE OR REPLACE TABLE SALES (id int, product string, amount float)")
+        else:
+            cs.execute("CREATE TABLE IF NOT EXISTS SALES (id int, product string, amount float)")
+        success, nchunks, nrows, _ = cs.write_records(
+            rows,
+            "SALES",
+            overwrite=overwrite,
+            chunk_rows=chunk_rows,
+            merge_keys=merge_keys,
+            stage_format=stage_format or "csv",
+        )
+        current.set(rows=nrows, chunks=nchunks)
+        # Read the stats before the connection goes back to the pool for reuse.
+        stats = cs.last_load
 
     if not success:
         raise RuntimeError("Loading data into Snowflake demo table failed")
 
-    return nrows
+    if stage_format is not None and stats is not None:
+        print(
+            f"📦 Staged {stats.files} {stage_format} file(s): {stats.bytes_written:,} bytes written, "
+            f"{stats.raw_bytes:,} raw ({stats.compression_ratio:.2f}x)"
+        )
+
+    return nrows, stats
+
+
+class _StageClock:
+    """Accumulate wall time spent pulling items out of each stage's iterator."""
+
+    def __init__(self) -> None:
+        self.inclusive: Dict[str, float] = dict.fromkeys(STAGES, 0.0)
+
+    def timed(self, stage: str, items: Iterable[T]) -> Iterator[T]:
+        iterator = iter(items)
+        while True:
+            start = time.perf_counter()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                self.inclusive[stage] += time.perf_counter() - start
+                return
+            self.inclusive[stage] += time.perf_counter() - start
+            yield item
+
+
+def _peak_memory_bytes() -> int:
+    try:
+        import resource
+    except ImportError:  # Not available on Windows.
+        return 0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS reports ru_maxrss in bytes; Linux and the BSDs report KiB.
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def run_pipeline(
+    mode: str = "batch",
+    *,
+    source: str | Path = DATA_PATH,
+    chunk_rows: int = DEFAULT_CHUNK_ROWS,
+    chunk_bytes: int | None = None,
+    stage_format: str | None = None,
+    dedup: RowDeduplicator | None = None,
+) -> PipelineResult:
+    """Run the ``batch``, ``streaming`` or ``columnar`` pipeline and report what it did.
+
+    Each stage's iterator is timed inclusively; since load pulls from
+    transform, which pulls from extract, the exclusive per-stage times are
+    the differences between neighbouring stages. Pass a configured ``dedup``
+    (e.g. with ``spill_path``) to bound fingerprint memory on large inputs.
+    """
+
+    with span("etl.pipeline", mode=mode) as current:
+        result = _run_stages(mode, source, chunk_rows, chunk_bytes, stage_format, dedup or RowDeduplicator())
+        current.set(rows_in=result.rows_in, rows_out=result.rows_out)
+    return result
+
+
+def _run_stages(
+    mode: str,
+    source: str | Path,
+    chunk_rows: int,
+    chunk_bytes: int | None,
+    stage_format: str | None,
+    dedup: RowDeduplicator,
+) -> PipelineResult:
+    clock = _StageClock()
+    started = time.perf_counter()
+    if mode == "batch":
+        records = extract(source)
+        clock.inclusive["extract"] = time.perf_counter() - started
+        rows: Iterable[Record] = transform(records, dedup)
+        clock.inclusive["transform"] = time.perf_counter() - started
+    elif mode == "streaming":
+        chunks = clock.timed("extract", iter_extract(source, chunk_rows, chunk_bytes))
+        rows = chain.from_iterable(clock.timed("transform", iter_transform(chunks, dedup)))
+    elif mode == "columnar":
+        batches = clock.timed("extract", iter_extract_columns(source, chunk_rows, chunk_bytes))
+        cleaned = clock.timed("transform", iter_transform_columns(batches, dedup))
+        rows = chain.from_iterable(batch.iter_records() for batch in cleaned)
+    else:
+        raise ValueError(f"Unknown pipeline mode '{mode}'.")
+
+    nrows, stats = _load(rows, stage_format=stage_format)
+    duration = time.perf_counter() - started
+    extract_s, transform_s = clock.inclusive["extract"], clock.inclusive["transform"]
+    if mode != "batch":
+        # Streamed stages interleave with load, so they are reported as accumulated time.
+        tracer.record("etl.extract", extract_s, streamed=True)
+        tracer.record("etl.transform", transform_s - extract_s, streamed=True)
+    return PipelineResult(
+        mode=mode,
+        rows_in=dedup.rows_in,
+        rows_out=nrows,
+        rows_dropped=dedup.rows_dropped,
+        bytes_read=Path(source).stat().st_size,
+        bytes_written=stats.bytes_written if stats is not None else 0,
+        duration_seconds=duration,
+        peak_memory_bytes=_peak_memory_bytes(),
+        stage_seconds={
+            "extract": extract_s,
+            "transform": max(0.0, transform_s - extract_s),
+            "load": max(0.0, duration - transform_s),
+        },
+    )
+
+
+def etl_pipeline(
+    mode: str = "batch",
+    *,
+    source: str | Path = DATA_PATH,
+    chunk_rows: int = DEFAULT_CHUNK_ROWS,
+    chunk_bytes: int | None = None,
+    workers: int | None = None,
+    state_dir: str | Path | None = None,
+    stage_format: str | None = None,
+    checkpoint_dir: str | Path | None = None,
+    dedup: RowDeduplicator | None = None,
+) -> int:
+    """Run the pipeline and return the number of rows loaded.
+
+    ``mode="batch"`` materialises each stage in memory. ``mode="streaming"``
+    connects the stages as generators over bounded chunks so that peak memory
+    depends on ``chunk_rows``/``chunk_bytes`` rather than on the input size.
+    ``mode="columnar"`` runs the transform over column batches bounded the
+    same way (see :mod:`etl.columnar`). ``mode="parallel"`` treats
+    ``source`` as a directory of partitioned CSVs processed by ``workers``
+    processes (see :mod:`etl.parallel`). ``mode="incremental"`` appends only
+    the rows added to ``source`` since the run recorded in ``state_dir`` (see
+    :mod:`etl.incremental`). ``mode="checkpointed"`` spills each extracted and
+    transformed chunk under ``checkpoint_dir`` so a retry resumes from the last
+    completed chunk (see :mod:`etl.checkpoint`). ``stage_format`` is passed
+    through to :func:`load`. ``dedup`` replaces the default in-memory
+    :class:`RowDeduplicator`, e.g. to spill fingerprints to disk; the
+    incremental mode always keeps its own spill under ``state_dir``.
+    """
+
+    if mode in ("batch", "streaming", "columnar"):
+        result = run_pipeline(
+            mode,
+            source=source,
+            chunk_rows=chunk_rows,
+            chunk_bytes=chunk_bytes,
+            stage_format=stage_format,
+            dedup=dedup,
+        )
+        return result.rows_out
+    if mode == "parallel":
+        # Imported lazily because the driver modules build on this one.
+        from etl.parallel import run_parallel_pipeline
+
+        return run_parallel_pipeline(source, workers, dedup=dedup, stage_format=stage_format)
+    if mode == "incremental":
+        from etl.incremental import DEFAULT_STATE_DIR, run_incremental_pipeline
 
+        result = run_incremental_pipeline(source, state_dir or DEFAULT_STATE_DIR, stage_format)
+        return result.rows_loaded
+    if mode == "checkpointed":
+        from etl.checkpoint import DEFAULT_CHECKPOINT_DIR, run_checkpointed_pipeline
 
-def etl_pipeline() -> int:
-    records = extract()
-    transformed = transform(records)
-    return load(transformed)
+        return run_checkpointed_pipeline(
+            source, checkpoint_dir or DEFAULT_CHECKPOINT_DIR, chunk_rows, stage_format, dedup
+        )
+    raise ValueError(f"Unknown pipeline mode '{mode}'.")
 
 
 if __name__ == "__main__":
-    run_with_retries(etl_pipeline, retries=3, delay=1)
+    # Checkpointed so a retry after a failed load does not extract again.
+    run_with_retries(partial(etl_pipeline, "checkpointed"), retries=3, delay=1)
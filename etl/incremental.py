@@ -0,0 +1,240 @@
+"""Watermark-based incremental ETL runs backed by a local state store.
+
+The state directory holds a JSON manifest that records, per source file, the
+byte offset processed so far, digests of the processed prefix, the file size
+seen and the highest ``id`` loaded. A run whose source only grew since the
+previous run resumes at the stored offset and merges the delta into the
+target on ``id``. Any other change (truncation, an edited prefix or an
+extended last line) triggers a full refresh. Row
+fingerprints are kept in a SQLite spill next to the manifest so duplicates of
+rows loaded by earlier runs are still dropped.
+"""
+
+from __future__ import annotations
+
+import csv
+import json
+import os
+from dataclasses import asdict, dataclass
+from hashlib import blake2b
+from itertools import chain, islice
+from pathlib import Path
+from typing import Iterable, Iterator
+
+from etl.dedup import RowDeduplicator
+from etl.etl_job import DATA_PATH, DEFAULT_CHUNK_ROWS, Record, iter_transform, load
+
+
+DEFAULT_STATE_DIR = Path(".etl_state")
+MERGE_KEYS = ("id",)
+_DIGEST_WINDOW = 64 * 1024
+
+
+@dataclass
+class SourceState:
+    """Progress recorded for a single source file."""
+
+    offset: int
+    head_digest: str
+    tail_digest: str
+    fieldnames: list[str]
+    high_water_id: int | None = None
+    size: int | None = None
+
+
+@dataclass
+class IncrementalResult:
+    rows_loaded: int
+    new_rows: int
+    changed_rows: int
+    full_refresh: bool
+
+
+class StateStore:
+    """JSON manifest of :class:`SourceState` entries keyed by source path."""
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+        self._sources: dict[str, SourceState] = {}
+        if self.path.exists():
+            payload = json.loads(self.path.read_text())
+            self._sources = {
+                key: SourceState(**value) for key, value in payload.get("sources", {}).items()
+            }
+
+    def get(self, source: Path) -> SourceState | None:
+        return self._sources.get(str(source))
+
+    def update(self, source: Path, state: SourceState) -> None:
+        self._sources[str(source)] = state
+
+    def save(self) -> None:
+        """Persist the manifest atomically so a crash never leaves it half-written."""
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        payload = {"sources": {key: asdict(state) for key, state in self._sources.items()}}
+        tmp_path = self.path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(payload, indent=2, sort_keys=True))
+        os.replace(tmp_path, self.path)
+
+
+def _window_digest(path: Path, start: int, end: int) -> str:
+    with path.open("rb") as handle:
+        handle.seek(start)
+        return blake2b(handle.read(end - start), digest_size=16).hexdigest()
+
+
+def _prefix_digests(path: Path, offset: int) -> tuple[str, str]:
+    head = _window_digest(path, 0, min(offset, _DIGEST_WINDOW))
+    tail = _window_digest(path, max(0, offset - _DIGEST_WINDOW), offset)
+    return head, tail
+
+
+def _can_resume(path: Path, state: SourceState) -> bool:
+    size = path.stat().st_size
+    if size < state.offset:
+        return False
+    if state.offset and size > state.offset:
+        with path.open("rb") as handle:
+            handle.seek(state.offset - 1)
+            before, after = handle.read(2)
+        # An unterminated last line that was loaded and has since been extended was loaded incomplete.
+        if before != ord("\n") and after not in b"\r\n":
+            return False
+    return _prefix_digests(path, state.offset) == (state.head_digest, state.tail_digest)
+
+
+class _DeltaReader:
+    """Parse CSV records starting at a byte offset while tracking progress.
+
+    A last line without a trailing newline may still be being written, so it
+    is left for the next run unless ``accept_tail`` is set, and ``offset``
+    only covers the lines that were read.
+    """
+
+    def __init__(
+        self, path: Path, offset: int, fieldnames: list[str] | None, accept_tail: bool = False
+    ) -> None:
+        self.path = path
+        self.offset = offset
+        self.fieldnames = fieldnames
+        self.accept_tail = accept_tail
+
+    def _lines(self, handle) -> Iterator[str]:
+        for raw in handle:
+            if not raw.endswith(b"\n") and not self.accept_tail:
+                return
+            self.offset += len(raw)
+            yield raw.decode()
+
+    def __iter__(self) -> Iterator[Record]:
+        with self.path.open("rb") as handle:
+            handle.seek(self.offset)
+            reader = csv.reader(self._lines(handle))
+            if self.fieldnames is None:
+                self.fieldnames = next(reader, None)
+            if self.fieldnames is None:
+                return
+            width = len(self.fieldnames)
+            for values in reader:
+                if not values:
+                    continue
+                if len(values) > width:
+                    raise ValueError(f"Row has {len(values)} fields but the header defines {width}.")
+                values = values + [None] * (width - len(values))
+                yield dict(zip(self.fieldnames, values))
+
+
+def _parse_id(value: object) -> int | None:
+    try:
+        return int(value)  # type: ignore[arg-type]
+    except (TypeError, ValueError):
+        return None
+
+
+def _chunks(rows: Iterable[Record], size: int) -> Iterator[list[Record]]:
+    iterator = iter(rows)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+def run_incremental_pipeline(
+    source: str | Path = DATA_PATH,
+    state_dir: str | Path = DEFAULT_STATE_DIR,
+    stage_format: str | None = None,
+) -> IncrementalResult:
+    """Load only the rows appended to ``source`` since the previous run.
+
+    Delta rows whose ``id`` is at or below the stored high-water mark replace
+    the matching target rows; the rest are inserted. A last line without a
+    trailing newline is loaded on a full refresh, or once the file size is
+    unchanged since the previous run.
+    """
+
+    source = Path(source).resolve()
+    state_dir = Path(state_dir)
+    state_dir.mkdir(parents=True, exist_ok=True)
+    store = StateStore(state_dir / "manifest.json")
+    previous = store.get(source)
+    resume = previous if previous is not None and _can_resume(source, previous) else None
+    full_refresh = resume is None
+    size = source.stat().st_size
+
+    spill_path = state_dir / f"{blake2b(str(source).encode(), digest_size=8).hexdigest()}.fingerprints.db"
+    if full_refresh and spill_path.exists():
+        spill_path.unlink()
+
+    # An empty stored header means the header line was incomplete last time.
+    reader = _DeltaReader(
+        source,
+        resume.offset if resume else 0,
+        (resume.fieldnames or None) if resume else None,
+        accept_tail=full_refresh or resume.size == size,  # type: ignore[union-attr]
+    )
+    previous_high_water = resume.high_water_id if resume else None
+    high_water = previous_high_water
+    counts = {"new": 0, "changed": 0}
+
+    def _classify(rows: Iterable[Record]) -> Iterator[Record]:
+        nonlocal high_water
+        for row in rows:
+            row_id = _parse_id(row.get("id"))
+            if previous_high_water is not None and row_id is not None and row_id <= previous_high_water:
+                counts["changed"] += 1
+            else:
+                counts["new"] += 1
+            if row_id is not None and (high_water is None or row_id > high_water):
+                high_water = row_id
+            yield row
+
+    with RowDeduplicator(spill_path=spill_path) as dedup:
+        chunks = iter_transform(_chunks(reader, DEFAULT_CHUNK_ROWS), dedup)
+        loaded = load(
+            _classify(chain.from_iterable(chunks)),
+            overwrite=full_refresh,
+            merge_keys=None if full_refresh else MERGE_KEYS,
+            stage_format=stage_format,
+        )
+
+    head, tail = _prefix_digests(source, reader.offset)
+    store.update(
+        source,
+        SourceState(
+            offset=reader.offset,
+            head_digest=head,
+            tail_digest=tail,
+            fieldnames=list(reader.fieldnames or []),
+            high_water_id=high_water,
+            size=size,
+        ),
+    )
+    store.save()
+    return IncrementalResult(
+        rows_loaded=loaded,
+        new_rows=counts["new"],
+        changed_rows=counts["changed"],
+        full_refresh=full_refresh,
+    )
+
+
+__all__ = ["IncrementalResult", "SourceState", "StateStore", "run_incremental_pipeline"]
@@ -0,0 +1,112 @@
+"""Process-pool driver for partitioned ETL inputs.
+
+Each worker extracts and transforms a group of partition files, de-duplicating
+locally and returning the cleaned rows with their raw-row fingerprints. The
+coordinator merges the results in partition order, drops rows already emitted
+by an earlier partition, and hands a single stream to ``load``.
+"""
+
+from __future__ import annotations
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Iterable, Iterator, Sequence
+
+from etl.dedup import RowDeduplicator
+from etl.etl_job import Record, _fill_amount, iter_extract, load
+
+
+PartitionResult = tuple[list[Record], list[tuple[bytes, bytes | None]], int, int]
+
+
+def discover_partitions(source: str | Path | Iterable[str | Path], pattern: str = "*.csv") -> list[Path]:
+    """Expand a file, a directory or a list of either into sorted partition paths."""
+
+    sources = [source] if isinstance(source, (str, Path)) else list(source)
+    paths: list[Path] = []
+    for item in sources:
+        item = Path(item)
+        paths.extend(sorted(item.glob(pattern)) if item.is_dir() else [item])
+    return sorted(set(paths))
+
+
+def _process_partition(paths: Sequence[Path], settings: dict[str, object]) -> PartitionResult:
+    dedup = RowDeduplicator(**settings)  # type: ignore[arg-type]
+    verify = bool(settings["verify"])
+    rows: list[Record] = []
+    fingerprints: list[tuple[bytes, bytes | None]] = []
+    for path in paths:
+        for chunk in iter_extract(path):
+            for row in chunk:
+                digest, canonical = dedup.fingerprint(row)
+                if dedup.is_duplicate_digest(digest, canonical):
+                    continue
+                rows.append(_fill_amount(row))
+                fingerprints.append((digest, canonical if verify else None))
+    return rows, fingerprints, dedup.rows_in, dedup.rows_dropped
+
+
+def iter_partitioned(
+    paths: Sequence[str | Path],
+    workers: int | None = None,
+    files_per_task: int = 1,
+    *,
+    digest_bits: int | None = None,
+    verify: bool | None = None,
+    dedup: RowDeduplicator | None = None,
+) -> Iterator[Record]:
+    """Yield cleaned, globally de-duplicated rows from ``paths`` in path order.
+
+    ``workers`` defaults to ``os.cpu_count()``; ``workers=1`` runs inline
+    without a process pool. ``dedup`` receives the merged statistics and its
+    columns, ``digest_bits`` and ``verify`` settings are used by every worker;
+    passing conflicting ``digest_bits`` or ``verify`` raises ``ValueError``.
+    """
+
+    if files_per_task < 1:
+        raise ValueError("files_per_task must be at least 1.")
+    ordered = [Path(path) for path in paths]
+    groups = [ordered[i : i + files_per_task] for i in range(0, len(ordered), files_per_task)]
+    if dedup is None:
+        dedup = RowDeduplicator(digest_bits=digest_bits or 64, verify=bool(verify))
+    settings = dedup.settings()
+    for name, value in (("digest_bits", digest_bits), ("verify", verify)):
+        if value is not None and value != settings[name]:
+            raise ValueError(f"{name}={value!r} conflicts with the deduplicator's {settings[name]!r}.")
+    workers = workers or os.cpu_count() or 1
+
+    def _merge(results: Iterable[PartitionResult]) -> Iterator[Record]:
+        for rows, fingerprints, rows_in, rows_dropped in results:
+            dedup.rows_in += rows_in - len(rows)
+            dedup.rows_dropped += rows_dropped
+            for row, (digest, canonical) in zip(rows, fingerprints):
+                if not dedup.is_duplicate_digest(digest, canonical):
+                    yield row
+
+    if workers == 1 or len(groups) <= 1:
+        yield from _merge(_process_partition(group, settings) for group in groups)
+        return
+
+    with ProcessPoolExecutor(max_workers=min(workers, len(groups))) as pool:
+        results = pool.map(_process_partition, groups, [settings] * len(groups))
+        yield from _merge(results)
+
+
+def run_parallel_pipeline(
+    source: str | Path | Iterable[str | Path],
+    workers: int | None = None,
+    files_per_task: int = 1,
+    dedup: RowDeduplicator | None = None,
+    stage_format: str | None = None,
+) -> int:
+    """Extract and transform every partition under ``source`` in parallel, then load once."""
+
+    paths = discover_partitions(source)
+    if not paths:
+        raise ValueError(f"No partition files found in {source}.")
+    rows = iter_partitioned(paths, workers, files_per_task, dedup=dedup)
+    return load(rows, stage_format=stage_format)
+
+
+__all__ = ["discover_partitions", "iter_partitioned", "run_parallel_pipeline"]
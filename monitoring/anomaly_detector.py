@@ -3,12 +3,22 @@
 from __future__ import annotations
 
 import csv
+import heapq
+import math
+from array import array
+from dataclasses import dataclass, field
 from pathlib import Path
-from statistics import mean, pstdev
+from typing import Dict, Iterator, List, Sequence, Tuple
 
 
 Record = dict[str, object]
 
+DEFAULT_THRESHOLD = 3.0
+DEFAULT_MAX_CANDIDATES = 10_000
+
+# Per-method default cut-offs: |z|, |modified z| (Iglewicz-Hoaglin) and the Tukey fence multiplier.
+METHOD_THRESHOLDS: Dict[str, float] = {"zscore": 3.0, "mad": 3.5, "iqr": 1.5}
+
 
 def _parse_float(value: str | None) -> float:
     if value in (None, "", "None"):
@@ -16,31 +26,239 @@ def _parse_float(value: str | None) -> float:
     return float(value)
 
 
-def detect_anomalies(csv_path: str | Path, value_column: str) -> list[Record]:
-    """Return suspicious rows detected via a basic z-score."""
+class RunningStats:
+    """Welford's online mean and population variance."""
 
-    path = Path(csv_path)
-    with path.open() as handle:
-        reader = csv.DictReader(handle)
-        rows = [dict(row) for row in reader]
+    __slots__ = ("count", "mean", "_m2")
 
-    if not rows or value_column not in rows[0]:
-        raise ValueError(f"Column '{value_column}' not found in {csv_path}.")
+    def __init__(self) -> None:
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+
+    def add(self, value: float) -> None:
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (value - self.mean)
+
+    @property
+    def pstdev(self) -> float:
+        return math.sqrt(self._m2 / self.count) if self.count else 0.0
+
+
+def _as_record(header: List[str], row: List[str]) -> Record:
+    # Mirror csv.DictReader for short and long rows.
+    record: Record = dict(zip(header, row))
+    if len(row) < len(header):
+        for name in header[len(row) :]:
+            record[name] = None
+    elif len(row) > len(header):
+        record[None] = row[len(header) :]  # type: ignore[index]
+    return record
+
+
+def _scan(path: Path, value_column: str) -> Iterator[Tuple[int, float, List[str], List[str]]]:
+    """Yield ``(row_number, value, row, header)`` without materialising the file."""
 
-    values = [_parse_float(row[value_column]) for row in rows]
-    avg = mean(values)
-    std = pstdev(values)
+    with path.open(newline="") as handle:
+        reader = csv.reader(handle)
+        header = next(reader, None)
+        if header is None or value_column not in header:
+            raise ValueError(f"Column '{value_column}' not found in {path}.")
+        position = header.index(value_column)
+        number = 0
+        for row in reader:
+            # Blank lines parse as [] and, like csv.DictReader, are not data rows.
+            if not row:
+                continue
+            yield number, _parse_float(row[position] if position < len(row) else None), row, header
+            number += 1
 
+
+def _two_pass(path: Path, value_column: str, threshold: float) -> list[Record]:
+    stats = RunningStats()
+    for _, value, _, _ in _scan(path, value_column):
+        stats.add(value)
+    if stats.count == 0:
+        raise ValueError(f"Column '{value_column}' not found in {path}.")
+    std = stats.pstdev
     if std == 0:
         return []
+    return [
+        _as_record(header, row)
+        for _, value, row, header in _scan(path, value_column)
+        if abs((value - stats.mean) / std) > threshold
+    ]
+
+
+def detect_anomalies(
+    csv_path: str | Path,
+    value_column: str,
+    *,
+    threshold: float = DEFAULT_THRESHOLD,
+    mode: str = "single_pass",
+    max_candidates: int = DEFAULT_MAX_CANDIDATES,
+) -> list[Record]:
+    """Return suspicious rows detected via a basic z-score.
+
+    Memory stays constant in the size of the file. ``single_pass`` keeps
+    running statistics plus the ``max_candidates`` highest and lowest rows;
+    any anomaly must be among those extremes, so one read usually suffices.
+    If a buffer is still full of anomalies at the end, or with
+    ``mode="two_pass"``, the file is read a second time instead. Rows are
+    returned in file order.
+    """
+
+    path = Path(csv_path)
+    if mode == "two_pass":
+        return _two_pass(path, value_column, threshold)
+    if mode != "single_pass":
+        raise ValueError(f"Unsupported mode '{mode}'. Use 'single_pass' or 'two_pass'.")
+    if max_candidates < 1:
+        raise ValueError("max_candidates must be at least 1.")
+
+    stats = RunningStats()
+    # Min-heaps of the largest values and of the negated smallest values.
+    highest: List[Tuple[float, int, List[str]]] = []
+    lowest: List[Tuple[float, int, List[str]]] = []
+    header: List[str] = []
+    for number, value, row, header in _scan(path, value_column):
+        stats.add(value)
+        for heap, key in ((highest, value), (lowest, -value)):
+            if len(heap) < max_candidates:
+                heapq.heappush(heap, (key, number, row))
+            elif key > heap[0][0]:
+                heapq.heapreplace(heap, (key, number, row))
+
+    if stats.count == 0:
+        raise ValueError(f"Column '{value_column}' not found in {csv_path}.")
+    std = stats.pstdev
+    if std == 0:
+        return []
+
+    def _is_anomaly(value: float) -> bool:
+        return abs((value - stats.mean) / std) > threshold
+
+    for heap, sign in ((highest, 1.0), (lowest, -1.0)):
+        if len(heap) == max_candidates and _is_anomaly(sign * heap[0][0]):
+            # Anomalies may have been evicted from the buffer; fall back to a re-read.
+            return _two_pass(path, value_column, threshold)
+
+    found = {
+        number: row
+        for heap, sign in ((highest, 1.0), (lowest, -1.0))
+        for key, number, row in heap
+        if _is_anomaly(sign * key)
+    }
+    return [_as_record(header, found[number]) for number in sorted(found)]
+
+
+@dataclass
+class ColumnAnomalies:
+    """Outliers found in one column, with the statistics used to find them.
+
+    ``rows`` are 0-based data row numbers in file order and ``scores`` hold
+    each flagged row's z-score, modified z-score or distance past the IQR
+    fence (in IQRs), depending on ``method``.
+    """
+
+    column: str
+    method: str
+    threshold: float
+    center: float
+    scale: float
+    rows: List[int] = field(default_factory=list)
+    scores: List[float] = field(default_factory=list)
+
+
+def read_columns(csv_path: str | Path, columns: Sequence[str]) -> Dict[str, array]:
+    """Parse ``columns`` from ``csv_path`` in one pass into ``array('d')`` columns."""
+
+    path = Path(csv_path)
+    with path.open(newline="") as handle:
+        reader = csv.reader(handle)
+        header = next(reader, None) or []
+        missing = [name for name in columns if name not in header]
+        if missing:
+            raise ValueError(f"Column '{missing[0]}' not found in {csv_path}.")
+        positions = [header.index(name) for name in columns]
+        parsed: List[array] = [array("d") for _ in columns]
+        for row in reader:
+            # Skip blank lines so they neither score as 0.0 nor shift row numbers.
+            if not row:
+                continue
+            width = len(row)
+            for position, values in zip(positions, parsed):
+                values.append(_parse_float(row[position] if position < width else None))
+    return dict(zip(columns, parsed))
+
+
+def _quantile(ordered: Sequence[float], q: float) -> float:
+    # Linear interpolation between closest ranks, as numpy.quantile does by default.
+    position = (len(ordered) - 1) * q
+    lower = math.floor(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+def _score_column(name: str, values: array, method: str, threshold: float) -> ColumnAnomalies:
+    if method == "zscore":
+        center = math.fsum(values) / len(values)
+        scale = math.sqrt(math.fsum((value - center) ** 2 for value in values) / len(values))
+        scores = [(value - center) / scale for value in values] if scale else []
+    elif method == "mad":
+        ordered = sorted(values)
+        center = _quantile(ordered, 0.5)
+        scale = _quantile(sorted(abs(value - center) for value in values), 0.5)
+        scores = [0.6745 * (value - center) / scale for value in values] if scale else []
+    else:
+        ordered = sorted(values)
+        low, high = _quantile(ordered, 0.25), _quantile(ordered, 0.75)
+        center, scale = _quantile(ordered, 0.5), high - low
+        # Signed distance beyond the quartiles, in IQRs; Tukey's fences sit at +/- threshold.
+        scores = [
+            (value - high) / scale if value > high else (value - low) / scale if value < low else 0.0
+            for value in values
+        ] if scale else []
+
+    result = ColumnAnomalies(name, method, threshold, center, scale)
+    for row, score in enumerate(scores):
+        if abs(score) > threshold:
+            result.rows.append(row)
+            result.scores.append(score)
+    return result
+
+
+def detect_column_anomalies(
+    csv_path: str | Path,
+    columns: Sequence[str],
+    *,
+    method: str = "zscore",
+    threshold: float | None = None,
+) -> Dict[str, ColumnAnomalies]:
+    """Score several numeric columns at once after a single parse of the file.
 
-    anomalies: list[Record] = []
-    for row, value in zip(rows, values):
-        z_score = (value - avg) / std
-        if abs(z_score) > 3:
-            anomalies.append(row)
+    ``method`` is ``zscore`` (mean/standard deviation), ``mad`` (median and
+    median absolute deviation, robust to the outliers being hunted) or
+    ``iqr`` (Tukey fences). ``threshold`` defaults to the method's value in
+    :data:`METHOD_THRESHOLDS`. Columns with zero spread report no anomalies.
+    """
 
-    return anomalies
+    if method not in METHOD_THRESHOLDS:
+        raise ValueError(f"Unsupported method '{method}'. Use one of: {', '.join(METHOD_THRESHOLDS)}.")
+    limit = METHOD_THRESHOLDS[method] if threshold is None else threshold
+    parsed = read_columns(csv_path, columns)
+    if not parsed or not len(next(iter(parsed.values()))):
+        raise ValueError(f"No data rows found in {csv_path}.")
+    return {name: _score_column(name, values, method, limit) for name, values in parsed.items()}
 
 
-__all__ = ["detect_anomalies"]
+__all__ = [
+    "ColumnAnomalies",
+    "METHOD_THRESHOLDS",
+    "RunningStats",
+    "detect_anomalies",
+    "detect_column_anomalies",
+    "read_columns",
+]
@@ -2,35 +2,78 @@
 
 from __future__ import annotations
 
-import subprocess
 import time
 
-from prometheus_client import Gauge, start_http_server
+from prometheus_client import Counter, Gauge, Histogram, start_http_server
+
+from etl.etl_job import STAGES, PipelineResult, run_pipeline
+from monitoring.tracing import Span, tracer
 
 ETL_SUCCESS = Gauge("etl_pipeline_success", "1=success,0=failure")
 ETL_DURATION = Gauge("etl_pipeline_duration_seconds", "ETL runtime in seconds")
 ETL_ROWS = Gauge("etl_pipeline_rows", "Rows processed")
 
+STAGE_DURATION = Histogram(
+    "etl_stage_duration_seconds",
+    "Time spent in each pipeline stage",
+    ["stage"],
+    buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5, 10, 30, 60, 300),
+)
+ROWS_IN = Counter("etl_rows_in_total", "Rows read from the source")
+ROWS_OUT = Counter("etl_rows_out_total", "Rows loaded into the destination")
+ROWS_DROPPED = Counter("etl_dedup_dropped_rows_total", "Rows dropped as duplicates")
+BYTES_READ = Counter("etl_bytes_read_total", "Bytes read from the source")
+BYTES_WRITTEN = Counter("etl_bytes_written_total", "Bytes written to the destination")
+# ru_maxrss never decreases, so this is the exporter process's peak since it
+# started, not the peak of the latest run.
+PROCESS_PEAK_RSS = Gauge(
+    "etl_process_peak_rss_bytes", "Peak resident set size of the exporter process since it started"
+)
+SPAN_DURATION = Histogram(
+    "etl_span_duration_seconds",
+    "Duration of traced spans (enable with ETL_TRACE or ETL_PROFILE)",
+    ["span"],
+    buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5, 10, 30, 60, 300),
+)
+
+
+def observe_span(span: Span) -> None:
+    SPAN_DURATION.labels(span=span.name).observe(span.duration)
+
+
+def record_result(result: PipelineResult) -> None:
+    """Publish one structured pipeline result."""
+
+    ETL_ROWS.set(result.rows_out)
+    ETL_DURATION.set(result.duration_seconds)
+    for stage in STAGES:
+        STAGE_DURATION.labels(stage=stage).observe(result.stage_seconds.get(stage, 0.0))
+    ROWS_IN.inc(result.rows_in)
+    ROWS_OUT.inc(result.rows_out)
+    ROWS_DROPPED.inc(result.rows_dropped)
+    BYTES_READ.inc(result.bytes_read)
+    BYTES_WRITTEN.inc(result.bytes_written)
+    PROCESS_PEAK_RSS.set(result.peak_memory_bytes)
+
 
-def run_and_collect() -> None:
-    """Execute the ETL pipeline on an interval and export metrics."""
+def run_and_collect(interval: float = 300, mode: str = "batch") -> None:
+    """Execute the ETL pipeline in-process on an interval and export metrics."""
 
     while True:
         start = time.time()
         try:
-            output = subprocess.check_output(["python", "etl/etl_job.py"], text=True)
+            result = run_pipeline(mode)
             ETL_SUCCESS.set(1)
-            for token in output.split():
-                if token.isdigit():
-                    ETL_ROWS.set(int(token))
-            print(output)
+            record_result(result)
+            print(f"✅ Loaded {result.rows_out} rows in {result.duration_seconds:.2f}s")
         except Exception as exc:  # pragma: no cover - interactive loop
             print(f"Failed to execute ETL pipeline: {exc}")
             ETL_SUCCESS.set(0)
-        ETL_DURATION.set(time.time() - start)
-        time.sleep(300)
+            ETL_DURATION.set(time.time() - start)
+        time.sleep(interval)
 
 
 if __name__ == "__main__":
+    tracer.add_listener(observe_span)
     start_http_server(8000)
     run_and_collect()
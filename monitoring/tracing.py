@@ -0,0 +1,228 @@
+"""Lightweight spans and opt-in profiling for the ETL pipeline.
+
+Instrumented code wraps its work in ``with span("extract", path=...)``.
+Tracing is off by default, and then :func:`span` returns a shared no-op
+context manager, so instrumentation costs one function call and a flag check.
+
+Environment variables (read once, at import time):
+
+``ETL_TRACE``
+    ``1`` records spans in memory. Any other non-empty value is a file path;
+    recorded spans are written there in Chrome trace-event JSON (viewable in
+    Perfetto or ``chrome://tracing``) when the process exits.
+``ETL_PROFILE``
+    Comma-separated ``cprofile`` and/or ``tracemalloc``; implies tracing.
+    One outermost span at a time is profiled. cProfile stats are dumped
+    to ``ETL_PROFILE_DIR`` (default ``.etl_profiles``) as ``<span>-<pid>-<n>.prof``,
+    and tracemalloc adds an ``alloc_peak_bytes`` attribute to the span.
+
+Listeners registered with :meth:`Tracer.add_listener` see every finished
+span; the Prometheus exporter uses one to feed a duration histogram.
+"""
+
+from __future__ import annotations
+
+import atexit
+import json
+import os
+import threading
+import time
+from collections import deque
+from itertools import count
+from pathlib import Path
+from typing import Any, Callable, Deque, Dict, Iterable, List
+
+
+class Span:
+    """One timed unit of work with free-form attributes."""
+
+    __slots__ = ("name", "attributes", "start", "duration", "depth", "thread_id")
+
+    def __init__(self, name: str, attributes: Dict[str, Any], depth: int) -> None:
+        self.name = name
+        self.attributes = attributes
+        self.depth = depth
+        self.thread_id = threading.get_ident()
+        self.start = time.time()
+        self.duration = 0.0
+
+    def set(self, **attributes: Any) -> None:
+        self.attributes.update(attributes)
+
+
+class _NoopSpan:
+    __slots__ = ()
+
+    def __enter__(self) -> "_NoopSpan":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        return None
+
+    def set(self, **attributes: Any) -> None:
+        return None
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+def _json_value(value: object) -> object:
+    return value if value is None or isinstance(value, (bool, int, float, str)) else repr(value)
+
+
+class _ActiveSpan:
+    __slots__ = ("_tracer", "_span", "_started", "_profiler", "_tracemalloc")
+
+    def __init__(self, tracer: "Tracer", span: Span) -> None:
+        self._tracer = tracer
+        self._span = span
+        self._profiler: Any = None
+        self._tracemalloc = False
+
+    def __enter__(self) -> Span:
+        tracer = self._tracer
+        tracer._local.depth = self._span.depth + 1
+        # Profilers are process-wide, so only one outermost span is profiled at a time.
+        if self._span.depth == 0 and tracer.profile and tracer._profiling.acquire(blocking=False):
+            if "cprofile" in tracer.profile:
+                import cProfile
+
+                self._profiler = cProfile.Profile()
+                self._profiler.enable()
+            if "tracemalloc" in tracer.profile:
+                import tracemalloc
+
+                if not tracemalloc.is_tracing():
+                    tracemalloc.start()
+                tracemalloc.reset_peak()
+                self._tracemalloc = True
+        self._started = time.perf_counter()
+        return self._span
+
+    def __exit__(self, *exc_info: object) -> None:
+        span = self._span
+        span.duration = time.perf_counter() - self._started
+        tracer = self._tracer
+        tracer._local.depth = span.depth
+        if exc_info[0] is not None:
+            span.attributes["error"] = repr(exc_info[1])
+        if self._profiler is not None:
+            self._profiler.disable()
+            tracer._dump_profile(span, self._profiler)
+        if self._tracemalloc:
+            import tracemalloc
+
+            span.attributes["alloc_peak_bytes"] = tracemalloc.get_traced_memory()[1]
+        if self._profiler is not None or self._tracemalloc:
+            tracer._profiling.release()
+        tracer._finish(span)
+
+
+class Tracer:
+    """Collects finished spans and fans them out to listeners and a trace file."""
+
+    def __init__(
+        self,
+        enabled: bool = False,
+        trace_path: str | Path | None = None,
+        profile: Iterable[str] = (),
+        profile_dir: str | Path = ".etl_profiles",
+        max_spans: int = 100_000,
+    ) -> None:
+        self.profile = frozenset(profile)
+        unknown = self.profile - {"cprofile", "tracemalloc"}
+        if unknown:
+            raise ValueError(f"Unsupported profiler(s): {', '.join(sorted(unknown))}. Use cprofile or tracemalloc.")
+        self.enabled = enabled or bool(self.profile) or trace_path is not None
+        self.trace_path = Path(trace_path) if trace_path is not None else None
+        self.profile_dir = Path(profile_dir)
+        self.spans: Deque[Span] = deque(maxlen=max_spans)
+        self._listeners: List[Callable[[Span], None]] = []
+        self._local = threading.local()
+        self._profile_ids = count()
+        self._lock = threading.Lock()
+        self._profiling = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "Tracer":
+        trace = os.environ.get("ETL_TRACE", "")
+        profile = [item.strip() for item in os.environ.get("ETL_PROFILE", "").split(",") if item.strip()]
+        tracer = cls(
+            enabled=bool(trace) and trace != "0",
+            trace_path=trace if trace not in ("", "0", "1") else None,
+            profile=profile,
+            profile_dir=os.environ.get("ETL_PROFILE_DIR", ".etl_profiles"),
+        )
+        if tracer.trace_path is not None:
+            atexit.register(tracer.write_trace)
+        return tracer
+
+    def span(self, name: str, **attributes: Any) -> _ActiveSpan | _NoopSpan:
+        """Return a context manager timing ``name``; a shared no-op when disabled."""
+
+        if not self.enabled:
+            return _NOOP_SPAN
+        return _ActiveSpan(self, Span(name, attributes, getattr(self._local, "depth", 0)))
+
+    def record(self, name: str, duration: float, **attributes: Any) -> None:
+        """Add an already-measured span, e.g. time accumulated across a generator's lifetime."""
+
+        if not self.enabled:
+            return
+        span = Span(name, attributes, getattr(self._local, "depth", 0))
+        span.start -= duration
+        span.duration = duration
+        self._finish(span)
+
+    def add_listener(self, listener: Callable[[Span], None]) -> None:
+        self._listeners.append(listener)
+
+    def clear(self) -> None:
+        self.spans.clear()
+
+    def _finish(self, span: Span) -> None:
+        self.spans.append(span)
+        for listener in self._listeners:
+            listener(span)
+
+    def _dump_profile(self, span: Span, profiler: Any) -> None:
+        self.profile_dir.mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            path = self.profile_dir / f"{span.name}-{os.getpid()}-{next(self._profile_ids)}.prof"
+        profiler.dump_stats(path)
+        span.attributes["profile"] = str(path)
+
+    def write_trace(self, path: str | Path | None = None) -> Path | None:
+        """Write recorded spans as Chrome trace events; returns the path written."""
+
+        target = Path(path) if path is not None else self.trace_path
+        if target is None:
+            return None
+        pid = os.getpid()
+        events = [
+            {
+                "name": span.name,
+                "ph": "X",
+                "ts": span.start * 1e6,
+                "dur": span.duration * 1e6,
+                "pid": pid,
+                "tid": span.thread_id,
+                "args": {key: _json_value(value) for key, value in span.attributes.items()},
+            }
+            for span in list(self.spans)
+        ]
+        target.parent.mkdir(parents=True, exist_ok=True)
+        target.write_text(json.dumps({"traceEvents": events}))
+        return target
+
+
+tracer = Tracer.from_env()
+
+
+def span(name: str, **attributes: Any) -> _ActiveSpan | _NoopSpan:
+    """Open a span on the process-wide :data:`tracer`."""
+
+    return tracer.span(name, **attributes)
+
+
+__all__ = ["Span", "Tracer", "span", "tracer"]
@@ -2,28 +2,346 @@
 
 from __future__ import annotations
 
+import random
+import threading
 import time
-from typing import Callable, TypeVar
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Tuple, Type, TypeVar
+
+from monitoring.tracing import tracer
 
 T = TypeVar("T")
 
+Exceptions = Tuple[Type[BaseException], ...]
 
-def run_with_retries(fn: Callable[[], T], retries: int = 3, delay: int = 30) -> T:
-    """Execute ``fn`` with retries, logging output to the console."""
 
-    last_error: Exception | None = None
+class RetryError(RuntimeError):
+    """Raised when a retryable operation still fails after the policy gives up."""
 
-    for attempt in range(1, retries + 1):
-        try:
-            result = fn()
-            print(f"✅ ETL succeeded, rows={result}")
+    def __init__(self, message: str, attempts: int) -> None:
+        super().__init__(message)
+        self.attempts = attempts
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised without calling the operation while the circuit breaker is open."""
+
+
+@dataclass
+class RetryStats:
+    """Counters shared by every call made through one :class:`RetryPolicy`."""
+
+    calls: int = 0
+    attempts: int = 0
+    successes: int = 0
+    failures: int = 0
+    retries: int = 0
+    waited_seconds: float = 0.0
+    budget_exhausted: int = 0
+    short_circuited: int = 0
+
+
+class RetryBudget:
+    """Token bucket that caps retries across jobs to a share of successful calls.
+
+    Every retry spends one token and every success earns ``refill_ratio``
+    tokens, up to ``max_tokens``. Under a correlated outage the bucket drains
+    and jobs fail fast instead of multiplying load on the struggling service.
+    """
+
+    def __init__(self, max_tokens: float = 10.0, refill_ratio: float = 0.2) -> None:
+        if max_tokens <= 0:
+            raise ValueError("max_tokens must be positive.")
+        self.max_tokens = max_tokens
+        self.refill_ratio = refill_ratio
+        self._tokens = max_tokens
+        self._lock = threading.Lock()
+
+    @property
+    def tokens(self) -> float:
+        return self._tokens
+
+    def try_spend(self) -> bool:
+        with self._lock:
+            if self._tokens < 1:
+                return False
+            self._tokens -= 1
+            return True
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._tokens = min(self.max_tokens, self._tokens + self.refill_ratio)
+
+
+class CircuitBreaker:
+    """Open after ``failure_threshold`` consecutive failed calls; probe again after ``reset_timeout``.
+
+    Once half-open, a single caller is admitted as the probe and every other
+    caller is rejected until that probe records a success or a failure.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        reset_timeout: float = 60.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if failure_threshold < 1:
+            raise ValueError("failure_threshold must be at least 1.")
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self._failures = 0
+        self._opened_at: float | None = None
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def _state(self) -> str:
+        if self._opened_at is None:
+            return "closed"
+        return "half-open" if self._clock() - self._opened_at >= self.reset_timeout else "open"
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._state()
+
+    def admit(self) -> str | None:
+        """Return the state the caller was admitted in, or ``None`` if it must not proceed."""
+
+        with self._lock:
+            state = self._state()
+            if state == "open" or (state == "half-open" and self._probing):
+                return None
+            if state == "half-open":
+                self._probing = True
+            return state
+
+    def allow(self) -> bool:
+        return self.admit() is not None
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._probing = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            self._probing = False
+            if self._failures >= self.failure_threshold or self._opened_at is not None:
+                # A failed half-open probe re-opens the circuit for another timeout.
+                self._opened_at = self._clock()
+
+
+class RetryPolicy:
+    """Exponential backoff with full jitter, a deadline and exception classification.
+
+    The wait before retry ``n`` is drawn uniformly from
+    ``[0, min(max_delay, base_delay * multiplier ** (n - 1))]`` (or is exactly
+    that cap with ``jitter=False``). Only exceptions matching ``retry_on`` and
+    not ``give_up_on`` are retried, and the policy never sleeps after the last
+    attempt or past ``deadline`` seconds from the first one. An optional shared
+    :class:`RetryBudget` and :class:`CircuitBreaker` coordinate many jobs; a
+    call admitted as the half-open probe is not retried, since its failure
+    re-opens the circuit. Every wait is recorded in :attr:`stats` and as a
+    ``retry.wait`` span around the sleep.
+    """
+
+    def __init__(
+        self,
+        max_attempts: int = 3,
+        base_delay: float = 1.0,
+        max_delay: float = 30.0,
+        multiplier: float = 2.0,
+        *,
+        jitter: bool = True,
+        deadline: float | None = None,
+        retry_on: Exceptions = (Exception,),
+        give_up_on: Exceptions = (),
+        budget: RetryBudget | None = None,
+        breaker: CircuitBreaker | None = None,
+        sleep: Callable[[float], None] = time.sleep,
+        clock: Callable[[], float] = time.monotonic,
+        rng: Callable[[], float] = random.random,
+    ) -> None:
+        if max_attempts < 1:
+            raise ValueError("max_attempts must be at least 1.")
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.multiplier = multiplier
+        self.jitter = jitter
+        self.deadline = deadline
+        self.retry_on = retry_on
+        self.give_up_on = give_up_on
+        self.budget = budget
+        self.breaker = breaker
+        self.stats = RetryStats()
+        self._sleep = sleep
+        self._clock = clock
+        self._rng = rng
+        self._lock = threading.Lock()
+
+    def backoff(self, retry: int) -> float:
+        """Return the wait before retry number ``retry`` (1-based)."""
+
+        cap = min(self.max_delay, self.base_delay * self.multiplier ** (retry - 1))
+        return cap * self._rng() if self.jitter else cap
+
+    def is_retryable(self, exc: BaseException) -> bool:
+        return isinstance(exc, self.retry_on) and not isinstance(exc, self.give_up_on)
+
+    def _count(self, **increments: float) -> None:
+        with self._lock:
+            for name, value in increments.items():
+                setattr(self.stats, name, getattr(self.stats, name) + value)
+
+    def _before_attempt(self) -> bool:
+        """Count the attempt; return whether it is the circuit breaker's half-open probe."""
+
+        admitted = None if self.breaker is None else self.breaker.admit()
+        if self.breaker is not None and admitted is None:
+            self._count(short_circuited=1)
+            raise CircuitOpenError("Circuit breaker is open; not attempting the call.")
+        self._count(attempts=1)
+        return admitted == "half-open"
+
+    def _on_success(self) -> None:
+        self._count(successes=1)
+        if self.budget is not None:
+            self.budget.record_success()
+        if self.breaker is not None:
+            self.breaker.record_success()
+
+    def _next_delay(self, attempt: int, exc: BaseException, started: float, probe: bool) -> float | None:
+        """Return how long to wait before retrying, or ``None`` to give up."""
+
+        def _give_up() -> None:
+            self._count(failures=1)
+            if self.breaker is not None:
+                self.breaker.record_failure()
+
+        if probe or not self.is_retryable(exc) or attempt >= self.max_attempts:
+            _give_up()
+            return None
+        delay = self.backoff(attempt)
+        if self.deadline is not None and self._clock() - started + delay > self.deadline:
+            _give_up()
+            return None
+        if self.budget is not None and not self.budget.try_spend():
+            self._count(budget_exhausted=1)
+            _give_up()
+            return None
+        self._count(retries=1, waited_seconds=delay)
+        return delay
+
+    def _abandon(self, probe: bool) -> None:
+        # A probe interrupted by e.g. KeyboardInterrupt or cancellation must not hold the circuit.
+        if probe and self.breaker is not None:
+            self.breaker.record_failure()
+
+    def _exhausted(self, attempt: int, exc: BaseException) -> RetryError:
+        return RetryError(f"Gave up after {attempt} attempt(s): {exc}", attempt)
+
+    def call(self, fn: Callable[..., T], *args: object, **kwargs: object) -> T:
+        """Call ``fn`` until it succeeds or the policy gives up.
+
+        Non-retryable exceptions propagate unchanged; exhausted retries raise
+        :class:`RetryError` chained to the last failure.
+        """
+
+        self._count(calls=1)
+        started = self._clock()
+        attempt = 0
+        while True:
+            probe = self._before_attempt()
+            attempt += 1
+            try:
+                result = fn(*args, **kwargs)
+            except Exception as exc:
+                delay = self._next_delay(attempt, exc, started, probe)
+                if delay is None:
+                    if not self.is_retryable(exc):
+                        raise
+                    raise self._exhausted(attempt, exc) from exc
+                with tracer.span("retry.wait", delay=delay, attempt=attempt, error=type(exc).__name__):
+                    self._sleep(delay)
+                continue
+            except BaseException:
+                self._abandon(probe)
+                raise
+            self._on_success()
+            return result
+
+    async def acall(self, fn: Callable[..., Awaitable[T]], *args: object, **kwargs: object) -> T:
+        """Async variant of :meth:`call`; waits with ``asyncio.sleep``."""
+
+        import asyncio
+
+        self._count(calls=1)
+        started = self._clock()
+        attempt = 0
+        while True:
+            probe = self._before_attempt()
+            attempt += 1
+            try:
+                result = await fn(*args, **kwargs)
+            except Exception as exc:
+                delay = self._next_delay(attempt, exc, started, probe)
+                if delay is None:
+                    if not self.is_retryable(exc):
+                        raise
+                    raise self._exhausted(attempt, exc) from exc
+                with tracer.span("retry.wait", delay=delay, attempt=attempt, error=type(exc).__name__):
+                    await asyncio.sleep(delay)
+                continue
+            except BaseException:
+                self._abandon(probe)
+                raise
+            self._on_success()
             return result
-        except Exception as exc:  # pragma: no cover - used for interactive demos
-            last_error = exc
-            print(f"⚠️ Attempt {attempt}/{retries} failed: {exc}")
-            time.sleep(delay)
 
-    raise RuntimeError("❌ ETL failed permanently") from last_error
+
+def run_with_retries(
+    fn: Callable[[], T],
+    retries: int = 3,
+    delay: int = 30,
+    policy: RetryPolicy | None = None,
+) -> T:
+    """Execute ``fn`` with retries, logging output to the console.
+
+    ``delay`` is the base of a jittered exponential backoff capped at four
+    times its value; pass ``policy`` for full control.
+    """
+
+    policy = policy or RetryPolicy(max_attempts=retries, base_delay=delay, max_delay=delay * 4)
+    attempts = 0
+
+    def _attempt() -> T:
+        nonlocal attempts
+        attempts += 1
+        try:
+            return fn()
+        except Exception as exc:
+            print(f"⚠️ Attempt {attempts}/{policy.max_attempts} failed: {exc}")
+            raise
+
+    try:
+        result = policy.call(_attempt)
+    except (RetryError, CircuitOpenError) as exc:
+        raise RuntimeError("❌ ETL failed permanently") from exc.__cause__ or exc
+    print(f"✅ ETL succeeded, rows={result}")
+    return result
 
 
-__all__ = ["run_with_retries"]
+__all__ = [
+    "CircuitBreaker",
+    "CircuitOpenError",
+    "RetryBudget",
+    "RetryError",
+    "RetryPolicy",
+    "RetryStats",
+    "run_with_retries",
+]
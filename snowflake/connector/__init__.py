@@ -2,49 +2,226 @@
 
 from __future__ import annotations
 
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
 from dataclasses import dataclass, field
+from itertools import chain, islice
 from pathlib import Path
-from typing import Iterable, List, Tuple
+from typing import Deque, Iterable, Iterator, List, Sequence, Tuple
 import csv
+import threading
+
+from monitoring.tracing import span
+
+from .pool import ConnectionPool, PoolStats
+from .staging import STAGE_FORMATS, LoadStats, read_stage_file, suffix_for, write_stage_file
+
+
+Row = dict[str, object]
+
+# Pooled cursors live for the whole process, so only recent commands are kept.
+MAX_EXECUTED_COMMANDS = 1000
+
+
+def _read_table(paths: Iterable[Path]) -> Iterator[Row]:
+    for path in paths:
+        yield from read_stage_file(path)
+
+
+def _merge_rows(existing: Iterable[Row], incoming: Iterable[Row], keys: Sequence[str]) -> List[Row]:
+    """Upsert ``incoming`` into ``existing`` by ``keys``; the last incoming row wins."""
+
+    merged: dict[tuple, Row] = {}
+    for row in chain(existing, incoming):
+        key = tuple(str(row.get(name)) for name in keys)
+        if key in merged:
+            merged[key] = {**merged[key], **row}
+        else:
+            merged[key] = row
+    return list(merged.values())
 
 
 @dataclass
 class FakeCursor:
-    """Minimal cursor that records commands and persists rows to disk."""
-
-    executed_commands: list[str] = field(default_factory=list)
+    """Minimal cursor that records commands and persists rows to disk.
+
+    Without ``chunk_rows`` each table is a single CSV file: ``output_table``
+    is written to ``output_path`` and any other table to a sibling file named
+    after it (``demo_snowflake_output_<table>.csv``). With ``chunk_rows`` the cursor models the ``write_pandas``
+    bulk-load path instead: each table lives in ``stage_dir/<table_name>`` as
+    numbered ``part-NNNNN`` files of at most ``chunk_rows`` rows, written by
+    ``parallel`` threads in ``stage_format`` (see :mod:`.staging`). The I/O
+    accounting of the most recent load is kept in ``last_load`` and the last
+    :data:`MAX_EXECUTED_COMMANDS` commands in ``executed_commands``.
+    """
+
+    executed_commands: Deque[str] = field(default_factory=lambda: deque(maxlen=MAX_EXECUTED_COMMANDS))
     output_path: Path = Path("demo_snowflake_output.csv")
+    stage_dir: Path = Path("demo_snowflake_stage")
+    last_load: LoadStats | None = None
+    output_table: str = "SALES"
 
     def execute(self, command: str) -> None:
         self.executed_commands.append(command)
 
-    def write_records(self, rows: Iterable[dict[str, object]], table_name: str) -> Tuple[bool, int, int, None]:
-        row_list: List[dict[str, object]] = list(rows)
-        if not row_list:
+    def table_path(self, table_name: str) -> Path:
+        """Return the single file backing ``table_name`` when loading without ``chunk_rows``."""
+
+        if table_name.upper() == self.output_table.upper():
+            return self.output_path
+        path = self.output_path
+        return path.with_name(f"{path.stem}_{table_name.lower()}{path.suffix}")
+
+    def table_files(self, table_name: str, chunked: bool) -> List[Path]:
+        """Return the files currently backing ``table_name``."""
+
+        if not chunked:
+            path = self.table_path(table_name)
+            return [path] if path.exists() else []
+        return sorted((self.stage_dir / table_name).glob("part-*"))
+
+    def write_records(
+        self,
+        rows: Iterable[Row],
+        table_name: str,
+        overwrite: bool = True,
+        *,
+        chunk_rows: int | None = None,
+        merge_keys: Sequence[str] | None = None,
+        parallel: int = 4,
+        stage_format: str = "csv",
+    ) -> Tuple[bool, int, int, None]:
+        """Load ``rows`` into ``table_name`` and return ``(success, nchunks, nrows, None)``.
+
+        ``overwrite=True`` replaces the table, ``overwrite=False`` appends to it
+        and ``merge_keys`` upserts rows matching on those columns. Rows are
+        streamed unless a merge has to combine them with the existing table.
+        """
+
+        with span("snowflake.write_records", table=table_name, stage_format=stage_format) as current:
+            result = self._write_records(
+                rows, table_name, overwrite, chunk_rows, merge_keys, parallel, stage_format
+            )
+            current.set(chunks=result[1], rows=result[2], bytes_written=self.last_load.bytes_written)
+        return result
+
+    def _write_records(
+        self,
+        rows: Iterable[Row],
+        table_name: str,
+        overwrite: bool,
+        chunk_rows: int | None,
+        merge_keys: Sequence[str] | None,
+        parallel: int,
+        stage_format: str,
+    ) -> Tuple[bool, int, int, None]:
+
+        if chunk_rows is not None and chunk_rows < 1:
+            raise ValueError("chunk_rows must be at least 1.")
+        suffix = suffix_for(stage_format)
+        chunked = chunk_rows is not None
+        if not chunked and stage_format != "csv":
+            raise ValueError("Compressed or columnar stage formats require chunk_rows.")
+        self.last_load = LoadStats()
+        existing = self.table_files(table_name, chunked)
+
+        iterator = iter(rows)
+        first = next(iterator, None)
+        if first is None:
+            if overwrite:
+                # Replacing a table with no rows leaves it empty.
+                for path in existing:
+                    path.unlink()
             return True, 0, 0, None
-
-        fieldnames = list(row_list[0].keys())
-        with self.output_path.open("w", newline="") as handle:
-            writer = csv.DictWriter(handle, fieldnames=fieldnames)
-            writer.writeheader()
-            writer.writerows(row_list)
-
-        return True, 1, len(row_list), None
+        fieldnames = list(first.keys())
+        nrows = 0
+
+        def _counted(source: Iterable[Row]) -> Iterator[Row]:
+            nonlocal nrows
+            for row in source:
+                nrows += 1
+                yield row
+
+        iterator = _counted(chain([first], iterator))
+        if merge_keys:
+            iterator = iter(_merge_rows(() if overwrite else _read_table(existing), iterator, merge_keys))
+            append = False
+        else:
+            append = not overwrite and bool(existing)
+
+        if not chunked:
+            with self.table_path(table_name).open("a" if append else "w", newline="") as handle:
+                start = handle.tell()
+                writer = csv.DictWriter(handle, fieldnames=fieldnames)
+                if not append:
+                    writer.writeheader()
+                writer.writerows(iterator)
+                size = handle.tell() - start
+            self.last_load = LoadStats(files=1, rows=nrows, raw_bytes=size, bytes_written=size)
+            return True, 1, nrows, None
+
+        table_dir = self.stage_dir / table_name
+        table_dir.mkdir(parents=True, exist_ok=True)
+        start = len(existing) if append else 0
+        if not append:
+            for path in existing:
+                path.unlink()
+
+        nchunks = 0
+        pending: list[Future] = []
+        with ThreadPoolExecutor(max_workers=max(1, parallel)) as pool:
+            while chunk := list(islice(iterator, chunk_rows)):
+                path = table_dir / f"part-{start + nchunks:05d}{suffix}"
+                pending.append(pool.submit(write_stage_file, path, chunk, fieldnames, stage_format))
+                nchunks += 1
+                if len(pending) >= 2 * max(1, parallel):
+                    self.last_load.add(pending.pop(0).result())
+            for future in pending:
+                self.last_load.add(future.result())
+        return True, nchunks, nrows, None
 
 
 @dataclass
 class FakeConnection:
     cursor_instance: FakeCursor = field(default_factory=FakeCursor)
+    closed: bool = False
 
     def cursor(self) -> FakeCursor:
         return self.cursor_instance
 
+    def is_closed(self) -> bool:
+        return self.closed
+
     def close(self) -> None:
-        pass
+        self.closed = True
 
 
 def connect(**_: object) -> FakeConnection:  # pragma: no cover - behaviour is trivial
     return FakeConnection()
 
 
-__all__ = ["FakeCursor", "FakeConnection", "connect"]
+_default_pool: ConnectionPool | None = None
+_default_pool_lock = threading.Lock()
+
+
+def default_pool() -> ConnectionPool:
+    """Return the process-wide pool of ``connect()`` connections, creating it on first use."""
+
+    global _default_pool
+    with _default_pool_lock:
+        if _default_pool is None:
+            _default_pool = ConnectionPool(connect)
+        return _default_pool
+
+
+__all__ = [
+    "ConnectionPool",
+    "FakeCursor",
+    "FakeConnection",
+    "LoadStats",
+    "MAX_EXECUTED_COMMANDS",
+    "PoolStats",
+    "STAGE_FORMATS",
+    "connect",
+    "default_pool",
+]
@@ -0,0 +1,187 @@
+"""Thread-safe connection pool for the ``snowflake.connector`` stand-in."""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Callable, Deque, Iterator, Tuple
+
+
+Connection = Any
+
+
+@dataclass(frozen=True)
+class PoolStats:
+    """Point-in-time counters describing how a pool has been used."""
+
+    acquisitions: int
+    hits: int
+    misses: int
+    timeouts: int
+    evictions: int
+    unhealthy: int
+    wait_seconds: float
+    size: int
+    idle: int
+
+    @property
+    def hit_rate(self) -> float:
+        return self.hits / self.acquisitions if self.acquisitions else 0.0
+
+    @property
+    def avg_wait_seconds(self) -> float:
+        return self.wait_seconds / self.acquisitions if self.acquisitions else 0.0
+
+
+def _is_open(connection: Connection) -> bool:
+    return not connection.is_closed()
+
+
+class ConnectionPool:
+    """Lend out connections created by ``factory`` and take them back for reuse.
+
+    The pool keeps between ``min_size`` and ``max_size`` connections open.
+    Idle connections are handed out most-recently-used first. They are checked
+    with ``health_check`` before reuse, and any beyond ``min_size`` are closed
+    once they have been idle for ``max_idle`` seconds. Callers block for up to
+    ``acquire_timeout`` seconds when every connection is in use.
+    """
+
+    def __init__(
+        self,
+        factory: Callable[[], Connection],
+        *,
+        min_size: int = 1,
+        max_size: int = 8,
+        max_idle: float = 300.0,
+        acquire_timeout: float = 30.0,
+        health_check: Callable[[Connection], bool] = _is_open,
+    ) -> None:
+        if min_size < 0 or max_size < 1 or min_size > max_size:
+            raise ValueError("Pool sizes must satisfy 0 <= min_size <= max_size and max_size >= 1.")
+        self._factory = factory
+        self._min_size = min_size
+        self._max_size = max_size
+        self._max_idle = max_idle
+        self._acquire_timeout = acquire_timeout
+        self._health_check = health_check
+        self._idle: Deque[Tuple[Connection, float]] = deque()
+        self._size = 0
+        self._closed = False
+        self._cond = threading.Condition()
+        self._counters = dict.fromkeys(
+            ("acquisitions", "hits", "misses", "timeouts", "evictions", "unhealthy"), 0
+        )
+        self._wait_seconds = 0.0
+        for _ in range(min_size):
+            self._idle.append((factory(), time.monotonic()))
+            self._size += 1
+
+    def _evict_idle(self, now: float) -> list[Connection]:
+        expired: list[Connection] = []
+        while self._idle and self._size > self._min_size and now - self._idle[0][1] > self._max_idle:
+            expired.append(self._idle.popleft()[0])
+            self._size -= 1
+            self._counters["evictions"] += 1
+        return expired
+
+    def acquire(self, timeout: float | None = None) -> Connection:
+        """Borrow a connection, creating one if the pool has room."""
+
+        timeout = self._acquire_timeout if timeout is None else timeout
+        start = time.monotonic()
+        deadline = start + timeout
+        to_close: list[Connection] = []
+        connection: Connection | None = None
+        create = False
+        try:
+            with self._cond:
+                while True:
+                    if self._closed:
+                        raise RuntimeError("Connection pool is closed.")
+                    to_close.extend(self._evict_idle(time.monotonic()))
+                    while self._idle:
+                        candidate, _ = self._idle.pop()
+                        if self._health_check(candidate):
+                            connection = candidate
+                            break
+                        to_close.append(candidate)
+                        self._size -= 1
+                        self._counters["unhealthy"] += 1
+                    if connection is not None:
+                        self._counters["hits"] += 1
+                        break
+                    if self._size < self._max_size:
+                        self._size += 1
+                        self._counters["misses"] += 1
+                        create = True
+                        break
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._counters["timeouts"] += 1
+                        raise TimeoutError(f"No connection became available within {timeout:.1f}s.")
+                    self._cond.wait(remaining)
+                self._counters["acquisitions"] += 1
+                self._wait_seconds += time.monotonic() - start
+        finally:
+            for stale in to_close:
+                stale.close()
+
+        if create:
+            try:
+                connection = self._factory()
+            except BaseException:
+                with self._cond:
+                    self._size -= 1
+                    self._cond.notify()
+                raise
+        return connection
+
+    def release(self, connection: Connection) -> None:
+        """Return ``connection`` to the pool, closing it if the pool is shut down."""
+
+        with self._cond:
+            if self._closed or connection.is_closed():
+                self._size -= 1
+                discard = True
+            else:
+                self._idle.append((connection, time.monotonic()))
+                discard = False
+            self._cond.notify()
+        if discard:
+            connection.close()
+
+    @contextmanager
+    def connection(self, timeout: float | None = None) -> Iterator[Connection]:
+        connection = self.acquire(timeout)
+        try:
+            yield connection
+        finally:
+            self.release(connection)
+
+    def stats(self) -> PoolStats:
+        with self._cond:
+            return PoolStats(
+                wait_seconds=self._wait_seconds,
+                size=self._size,
+                idle=len(self._idle),
+                **self._counters,
+            )
+
+    def close(self) -> None:
+        """Close idle connections; borrowed ones are closed when released."""
+
+        with self._cond:
+            self._closed = True
+            idle = [connection for connection, _ in self._idle]
+            self._idle.clear()
+            self._size -= len(idle)
+            self._cond.notify_all()
+        for connection in idle:
+            connection.close()
+
+
+__all__ = ["ConnectionPool", "PoolStats"]
@@ -0,0 +1,235 @@
+"""Stage file formats for the ``FakeCursor`` bulk-load path.
+
+Every format is written as a stream so a chunk never has to be encoded in
+memory twice. Supported formats:
+
+* ``csv`` – plain CSV, as before.
+* ``csv.gz`` – gzip-compressed CSV (standard library).
+* ``csv.zst`` – zstd-compressed CSV, requires the ``zstandard`` package.
+* ``columnar`` – a gzip-compressed, typed column layout: a JSON header line
+  followed by one block per column (``array`` bytes for ``float64``/``int64``,
+  length-prefixed UTF-8 for strings).
+* ``parquet`` – Apache Parquet, requires ``pyarrow``.
+"""
+
+from __future__ import annotations
+
+import csv
+import gzip
+import io
+import json
+import sys
+from array import array
+from dataclasses import dataclass
+from pathlib import Path
+from typing import BinaryIO, Iterator, List, Sequence
+
+
+Row = dict[str, object]
+
+STAGE_FORMATS = {
+    "csv": ".csv",
+    "csv.gz": ".csv.gz",
+    "csv.zst": ".csv.zst",
+    "columnar": ".col.gz",
+    "parquet": ".parquet",
+}
+_NULL_LENGTH = 0xFFFFFFFF
+
+
+@dataclass
+class LoadStats:
+    """I/O accounting for a single ``write_records`` call.
+
+    ``raw_bytes`` is the size the rows would take as plain CSV, so
+    ``compression_ratio`` expresses the saving over the uncompressed format.
+    """
+
+    files: int = 0
+    rows: int = 0
+    raw_bytes: int = 0
+    bytes_written: int = 0
+
+    @property
+    def compression_ratio(self) -> float:
+        return self.raw_bytes / self.bytes_written if self.bytes_written else 1.0
+
+    def add(self, other: "LoadStats") -> None:
+        self.files += other.files
+        self.rows += other.rows
+        self.raw_bytes += other.raw_bytes
+        self.bytes_written += other.bytes_written
+
+
+class _CountingWriter(io.RawIOBase):
+    """Binary sink that counts bytes before forwarding them (or dropping them)."""
+
+    def __init__(self, target: BinaryIO | None = None) -> None:
+        self.target = target
+        self.count = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:  # type: ignore[override]
+        self.count += len(data)
+        if self.target is not None:
+            self.target.write(data)
+        return len(data)
+
+
+def _require(module: str, stage_format: str):
+    try:
+        return __import__(module, fromlist=["_"])
+    except ImportError as exc:
+        raise ImportError(
+            f"Stage format '{stage_format}' requires the optional '{module.split('.')[0]}' package."
+        ) from exc
+
+
+def suffix_for(stage_format: str) -> str:
+    try:
+        return STAGE_FORMATS[stage_format]
+    except KeyError:
+        raise ValueError(
+            f"Unknown stage format '{stage_format}'. Expected one of {sorted(STAGE_FORMATS)}."
+        ) from None
+
+
+def format_for(path: Path) -> str:
+    for stage_format, suffix in STAGE_FORMATS.items():
+        if path.name.endswith(suffix):
+            return stage_format
+    raise ValueError(f"Unrecognised stage file {path}.")
+
+
+def _csv_size(rows: Sequence[Row], fieldnames: Sequence[str]) -> int:
+    sink = _CountingWriter()
+    text = io.TextIOWrapper(sink, newline="", write_through=True)
+    writer = csv.DictWriter(text, fieldnames=fieldnames)
+    writer.writeheader()
+    writer.writerows(rows)
+    text.detach()
+    return sink.count
+
+
+def _column_type(values: Sequence[object]) -> str:
+    if values and all(type(value) is float for value in values):
+        return "float64"
+    if values and all(type(value) is int for value in values):
+        return "int64"
+    return "str"
+
+
+def _write_columnar(handle: BinaryIO, rows: Sequence[Row], fieldnames: Sequence[str]) -> None:
+    columns = {name: [row.get(name) for row in rows] for name in fieldnames}
+    types = {name: _column_type(values) for name, values in columns.items()}
+    header = {
+        "byteorder": sys.byteorder,
+        "rows": len(rows),
+        "columns": [[name, types[name]] for name in fieldnames],
+    }
+    handle.write(json.dumps(header).encode() + b"\n")
+    for name in fieldnames:
+        values = columns[name]
+        if types[name] == "float64":
+            handle.write(array("d", values).tobytes())
+        elif types[name] == "int64":
+            handle.write(array("q", values).tobytes())
+        else:
+            encoded = [None if value is None else str(value).encode() for value in values]
+            lengths = array("I", (_NULL_LENGTH if item is None else len(item) for item in encoded))
+            handle.write(lengths.tobytes())
+            handle.write(b"".join(item for item in encoded if item is not None))
+
+
+def _read_columnar(handle: BinaryIO) -> Iterator[Row]:
+    header = json.loads(handle.readline())
+    nrows = header["rows"]
+    swap = header["byteorder"] != sys.byteorder
+    columns: List[List[object]] = []
+    for _name, kind in header["columns"]:
+        if kind in ("float64", "int64"):
+            values = array("d" if kind == "float64" else "q")
+            values.frombytes(handle.read(values.itemsize * nrows))
+            if swap:
+                values.byteswap()
+            columns.append(list(values))
+            continue
+        lengths = array("I")
+        lengths.frombytes(handle.read(lengths.itemsize * nrows))
+        if swap:
+            lengths.byteswap()
+        blob = handle.read(sum(length for length in lengths if length != _NULL_LENGTH))
+        strings: List[object] = []
+        position = 0
+        for length in lengths:
+            if length == _NULL_LENGTH:
+                strings.append(None)
+                continue
+            strings.append(blob[position : position + length].decode())
+            position += length
+        columns.append(strings)
+    names = [name for name, _kind in header["columns"]]
+    for values in zip(*columns):
+        yield dict(zip(names, values))
+
+
+def write_stage_file(
+    path: Path, rows: Sequence[Row], fieldnames: Sequence[str], stage_format: str
+) -> LoadStats:
+    """Write one chunk of ``rows`` to ``path`` in ``stage_format``."""
+
+    if stage_format == "parquet":
+        pq = _require("pyarrow.parquet", stage_format)
+        pa = _require("pyarrow", stage_format)
+        pq.write_table(pa.Table.from_pylist(list(rows)), str(path))
+        raw = _csv_size(rows, fieldnames)
+    else:
+        with path.open("wb") as raw_handle:
+            if stage_format == "csv":
+                stream: BinaryIO = raw_handle
+            elif stage_format == "csv.zst":
+                zstandard = _require("zstandard", stage_format)
+                stream = zstandard.ZstdCompressor().stream_writer(raw_handle, closefd=False)
+            else:
+                stream = gzip.GzipFile(fileobj=raw_handle, mode="wb")
+            counter = _CountingWriter(stream)
+            if stage_format == "columnar":
+                _write_columnar(counter, rows, fieldnames)  # type: ignore[arg-type]
+                raw = _csv_size(rows, fieldnames)
+            else:
+                text = io.TextIOWrapper(counter, newline="", write_through=True)
+                writer = csv.DictWriter(text, fieldnames=fieldnames)
+                writer.writeheader()
+                writer.writerows(rows)
+                text.detach()
+                raw = counter.count
+            if stream is not raw_handle:
+                stream.close()
+    return LoadStats(files=1, rows=len(rows), raw_bytes=raw, bytes_written=path.stat().st_size)
+
+
+def read_stage_file(path: Path) -> Iterator[Row]:
+    """Yield the rows stored in a stage file of any supported format."""
+
+    stage_format = format_for(path)
+    if stage_format == "parquet":
+        pq = _require("pyarrow.parquet", stage_format)
+        yield from pq.read_table(str(path)).to_pylist()
+        return
+    with path.open("rb") as raw_handle:
+        if stage_format == "csv":
+            stream: BinaryIO = raw_handle
+        elif stage_format == "csv.zst":
+            zstandard = _require("zstandard", stage_format)
+            stream = zstandard.ZstdDecompressor().stream_reader(raw_handle)
+        else:
+            stream = gzip.GzipFile(fileobj=raw_handle, mode="rb")
+        if stage_format == "columnar":
+            yield from _read_columnar(stream)
+        else:
+            yield from csv.DictReader(io.TextIOWrapper(stream, newline=""))
+
+
+__all__ = ["LoadStats", "STAGE_FORMATS", "read_stage_file", "write_stage_file"]
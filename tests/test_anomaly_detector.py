@@ -0,0 +1,88 @@
+import csv
+import random
+from statistics import mean, pstdev
+
+import pytest
+
+from monitoring.anomaly_detector import RunningStats, detect_anomalies, detect_column_anomalies, read_columns
+
+
+def _write_csv(path, values):
+    with path.open("w", newline="") as handle:
+        writer = csv.writer(handle)
+        writer.writerow(["id", "amount"])
+        for i, value in enumerate(values):
+            writer.writerow([i, value])
+    return path
+
+
+def _reference(values, threshold=3.0):
+    avg, std = mean(values), pstdev(values)
+    return [str(i) for i, value in enumerate(values) if std and abs((value - avg) / std) > threshold]
+
+
+def test_running_stats_matches_statistics_module():
+    values = [random.Random(7).gauss(100, 15) for _ in range(1000)]
+    stats = RunningStats()
+    for value in values:
+        stats.add(value)
+    assert stats.mean == pytest.approx(mean(values))
+    assert stats.pstdev == pytest.approx(pstdev(values))
+
+
+@pytest.mark.parametrize("mode, max_candidates", [("single_pass", 10_000), ("single_pass", 2), ("two_pass", 1)])
+def test_streaming_detection_matches_full_materialisation(tmp_path, mode, max_candidates):
+    rng = random.Random(42)
+    values = [round(rng.gauss(50, 5), 3) for _ in range(5000)]
+    for position, outlier in ((10, 500.0), (2500, -400.0), (4000, 300.0), (4999, 250.0)):
+        values[position] = outlier
+    path = _write_csv(tmp_path / "amounts.csv", values)
+
+    anomalies = detect_anomalies(path, "amount", mode=mode, max_candidates=max_candidates)
+    assert [row["id"] for row in anomalies] == _reference(values)
+    assert anomalies[0] == {"id": "10", "amount": "500.0"}
+
+
+def test_detect_anomalies_validates_input(tmp_path):
+    path = _write_csv(tmp_path / "flat.csv", [1.0, 1.0, 1.0])
+    assert detect_anomalies(path, "amount") == []
+    with pytest.raises(ValueError, match="Column 'missing' not found"):
+        detect_anomalies(path, "missing")
+    with pytest.raises(ValueError, match="Column 'amount' not found"):
+        detect_anomalies(_write_csv(tmp_path / "empty.csv", []), "amount")
+
+
+@pytest.mark.parametrize("mode", ["single_pass", "two_pass"])
+def test_detect_anomalies_skips_blank_lines(tmp_path, mode):
+    path = tmp_path / "blank.csv"
+    path.write_text("id,amount\n" + "".join(f"{i},{100 + i % 3}\n\n" for i in range(50)) + "50,900\n")
+    assert detect_anomalies(path, "amount", mode=mode) == [{"id": "50", "amount": "900"}]
+
+
+def test_read_columns_skips_blank_lines(tmp_path):
+    path = tmp_path / "blank.csv"
+    path.write_text("id,amount\n" + "".join(f"{i},{10 + i % 3}\n\n" for i in range(20)) + "\n20,9000\n")
+    amounts = read_columns(path, ["amount"])["amount"]
+    assert len(amounts) == 21 and 0.0 not in amounts
+    assert detect_column_anomalies(path, ["amount"], method="iqr")["amount"].rows == [20]
+
+
+def test_column_anomalies_score_many_columns_from_one_parse(tmp_path):
+    path = tmp_path / "sales.csv"
+    path.write_text("id,amount,qty\n" + "".join(f"{i},{100 + i % 5},{i % 3 + 1}\n" for i in range(200)) + "200,5000,2\n")
+
+    columns = read_columns(path, ["amount", "qty"])
+    assert columns["amount"].typecode == "d" and len(columns["qty"]) == 201
+
+    zscore = detect_column_anomalies(path, ["amount", "qty"])
+    assert zscore["amount"].rows == [200] and zscore["qty"].rows == []
+    mad = detect_column_anomalies(path, ["amount", "qty"], method="mad")
+    assert mad["amount"].center == 102.0 and mad["amount"].rows == [200]
+    iqr = detect_column_anomalies(path, ["amount"], method="iqr", threshold=100)
+    assert iqr["amount"].rows == [200] and iqr["amount"].scores[0] > 100
+    assert detect_column_anomalies(path, ["amount"], method="iqr", threshold=10_000)["amount"].rows == []
+
+    with pytest.raises(ValueError, match="Unsupported method"):
+        detect_column_anomalies(path, ["amount"], method="median")
+    with pytest.raises(ValueError, match="Column 'nope' not found"):
+        detect_column_anomalies(path, ["amount", "nope"])
@@ -0,0 +1,49 @@
+import csv
+
+from benchmarks.generators import make_resources, write_sales_csv
+from benchmarks import run as run_module
+from benchmarks.run import CASES, BenchmarkResult, find_regressions, main, measure, run_benchmarks
+
+
+def test_generators_are_deterministic(tmp_path):
+    first = write_sales_csv(tmp_path / "a.csv", 500, seed=3).read_text()
+    assert first == write_sales_csv(tmp_path / "b.csv", 500, seed=3).read_text()
+    with (tmp_path / "a.csv").open() as handle:
+        assert sum(1 for _ in csv.DictReader(handle)) == 500
+    resources = make_resources(30)
+    assert sorted(resources) == ["aws", "azure", "gcp"] and sum(map(len, resources.values())) == 30
+
+
+def test_run_benchmarks_and_flag_regressions(tmp_path, monkeypatch):
+    def _no_scratch(*args, **kwargs):
+        raise AssertionError("a temporary directory is not needed when workdir is given")
+
+    monkeypatch.setattr(run_module.tempfile, "TemporaryDirectory", _no_scratch)
+    results = run_benchmarks(
+        {"rows": 200, "resources": 30}, ["etl.transform", "cloudops.summarize_costs"], repeat=1, workdir=tmp_path
+    )
+    assert [r.name for r in results] == ["etl.transform", "cloudops.summarize_costs"]
+    assert all(r.throughput > 0 and r.peak_bytes > 0 for r in results)
+
+    current = BenchmarkResult("etl.transform", 100, 1.0, 100.0, 1_000)
+    baseline = {"etl.transform": {"throughput": 150.0, "peak_bytes": 500}}
+    messages = find_regressions([current], baseline, tolerance=0.2)
+    assert len(messages) == 2 and "throughput" in messages[0] and "peak memory" in messages[1]
+    assert find_regressions([current], baseline, tolerance=1.5) == []
+
+
+def test_transform_case_times_a_fresh_copy_of_the_rows(tmp_path):
+    transform, items, setup = CASES["etl.transform"]({"rows": 50, "resources": 0}, tmp_path)
+    seen = []
+    measure("etl.transform", lambda rows: seen.append(transform(rows)), items, repeat=2, setup=setup)
+    assert len(seen) == 3 and seen[0] == seen[2]
+    assert all(isinstance(row["amount"], str) for row in setup())
+
+
+def test_main_records_history_and_fails_on_regression(tmp_path):
+    history, baseline = tmp_path / "history.json", tmp_path / "baseline.json"
+    args = ["--scale", "smoke", "--only", "cloudops.summarize", "--repeat", "1", "--history", str(history)]
+    assert main(args + ["--baseline", str(baseline), "--update-baseline"]) == 0
+    baseline.write_text('{"smoke": {"cloudops.summarize_costs": {"throughput": 1e12, "peak_bytes": 0}}}')
+    assert main(args + ["--baseline", str(baseline)]) == 1
+    assert history.read_text().count('"scale": "smoke"') == 2
@@ -1,7 +1,28 @@
+import asyncio
+import json
+import subprocess
+import sys
+import threading
+import time
+from dataclasses import replace
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
 from cloudops.connectors.aws import AWSConnector
+from cloudops.connectors.base import CloudResource, ResourcePage
 from cloudops.connectors.azure import AzureConnector
+from cloudops.connectors.cache import CachingConnector, ConnectorCache
 from cloudops.connectors.gcp import GCPConnector
+from cloudops.connectors.paging import alist_resource_pages, list_resource_pages, prefetch
+from cloudops.connectors.registry import available_connectors, create_connectors, register_connector
+from cloudops.costs import CostCube
+from cloudops.history import SnapshotStore
+from cloudops.inventory import ResourceTable
+from cloudops.llm_advisor import LLMAdvisor
 from cloudops.platform import CloudOpsPlatform
+from cloudops.rules import RuleEngine, compile_rules
+from cloudops.snapshot import PostureSnapshot
 
 
 def test_collect_posture_snapshot_includes_all_resources():
@@ -21,3 +42,511 @@ def test_cost_summary_matches_snapshot():
     assert totals["azure"] == 3139.0
     assert totals["gcp"] == 2445.5
     assert totals["total"] == totals["aws"] + totals["azure"] + totals["gcp"]
+
+
+class _SlowConnector:
+    provider = "slow"
+
+    def __init__(self, delay):
+        self._delay = delay
+
+    def discover_resources(self):
+        time.sleep(self._delay)
+        return []
+
+    def collect_operational_metrics(self):
+        return {"error_rate": 0.0}
+
+    def describe_security_findings(self):
+        raise RuntimeError("API unavailable")
+
+
+def test_concurrent_snapshot_matches_serial():
+    platform = CloudOpsPlatform([AWSConnector(), AzureConnector(), GCPConnector()])
+    serial = platform.collect_posture_snapshot()
+    concurrent = platform.collect_posture_snapshot(concurrent=True, timeout=5)
+
+    assert concurrent.resources == serial.resources
+    assert concurrent.metrics == serial.metrics
+    assert concurrent.security_findings == serial.security_findings
+    assert concurrent.collection_errors == {}
+
+
+def test_concurrent_snapshot_keeps_partial_results_on_timeout_and_failure():
+    platform = CloudOpsPlatform([AWSConnector(), _SlowConnector(delay=1.0)])
+    start = time.monotonic()
+    snapshot = platform.collect_posture_snapshot(concurrent=True, timeout={"slow": 0.05})
+
+    assert time.monotonic() - start < 0.9
+    assert {resource.provider for resource in snapshot.resources} == {"aws"}
+    assert snapshot.metrics["slow"] == {"error_rate": 0.0}
+    assert snapshot.collection_errors["slow"] == [
+        "discover_resources timed out after 0.05s",
+        "describe_security_findings failed: API unavailable",
+    ]
+
+
+class _SecondAccountConnector(AWSConnector):
+    def __init__(self):
+        super().__init__()
+        self._resources = [replace(resource, name=f"{resource.name}-b") for resource in self._resources]
+
+
+def test_same_provider_connectors_are_collected_separately():
+    platform = CloudOpsPlatform([AWSConnector(), _SecondAccountConnector()])
+    expected = sorted(
+        [*AWSConnector().discover_resources(), *_SecondAccountConnector().discover_resources()],
+        key=lambda r: (r.provider, r.name),
+    )
+
+    serial = platform.collect_posture_snapshot()
+    concurrent = platform.collect_posture_snapshot(concurrent=True, timeout=5)
+
+    assert len(expected) == 4
+    assert serial.resources == expected
+    assert concurrent.resources == expected
+    assert concurrent.collection_errors == {}
+    for snapshot in (serial, concurrent):
+        assert set(snapshot.metrics) == set(snapshot.security_findings) == {"aws", "aws#2"}
+        spend = sum(metrics["spend_month_to_date"] for metrics in snapshot.metrics.values())
+        assert spend == platform.summarize_costs(snapshot)["aws"] == 8541.0
+
+
+def test_concurrent_timeouts_and_errors_are_keyed_by_connector():
+    platform = CloudOpsPlatform([_SlowConnector(delay=0.0), _SlowConnector(delay=1.0)])
+    snapshot = platform.collect_posture_snapshot(concurrent=True, timeout={"slow#2": 0.05, "slow": 5})
+
+    assert snapshot.metrics == {"slow": {"error_rate": 0.0}, "slow#2": {"error_rate": 0.0}}
+    assert snapshot.collection_errors["slow"] == ["describe_security_findings failed: API unavailable"]
+    assert snapshot.collection_errors["slow#2"][0] == "discover_resources timed out after 0.05s"
+
+
+class _CountingConnector(AWSConnector):
+    def __init__(self):
+        super().__init__()
+        self.calls = 0
+
+    def discover_resources(self):
+        self.calls += 1
+        return super().discover_resources()
+
+
+def test_cached_connectors_serve_repeated_cost_summaries():
+    now = [0.0]
+    connector = _CountingConnector()
+    cache = ConnectorCache(ttls={"discover_resources": 10}, clock=lambda: now[0])
+    platform = CloudOpsPlatform([connector], cache=cache)
+
+    first = platform.summarize_costs()
+    assert platform.summarize_costs() == first
+    assert connector.calls == 1
+
+    now[0] = 11.0
+    platform.summarize_costs()
+    assert connector.calls == 2
+
+    cache.invalidate(provider="aws")
+    platform.summarize_costs()
+    assert connector.calls == 3
+
+
+def test_cache_keeps_same_provider_connectors_apart():
+    cache = ConnectorCache()
+    first, second = AWSConnector(), _SecondAccountConnector()
+    platform = CloudOpsPlatform([first, second], cache=cache)
+
+    snapshot = platform.collect_posture_snapshot()
+    assert len(snapshot.resources) == 4
+    assert len(platform.collect_posture_snapshot().resources) == 4
+    assert cache.invalidate(namespace="aws#2") == 3
+
+
+def test_connector_cache_persists_and_evicts(tmp_path):
+    path = tmp_path / "cache.json"
+    cache = ConnectorCache(max_entries=2, persist_path=path)
+    cached = CachingConnector(AWSConnector(), cache)
+    resources = cached.discover_resources()
+    cached.collect_operational_metrics()
+    cached.describe_security_findings()
+    assert len(cache) == 2
+    assert not path.exists()
+    cache.flush()
+    assert ("aws", "aws", "discover_resources") not in ConnectorCache(persist_path=path)._entries
+
+    reloaded = ConnectorCache(persist_path=path)
+    reloaded.invalidate(method="describe_security_findings")
+    cache_hit = CachingConnector(AWSConnector(), reloaded).collect_operational_metrics()
+    assert cache_hit["error_rate"] == 0.004
+    assert reloaded.hits == 1
+    assert list(resources) == list(AWSConnector().discover_resources())
+
+
+class _MutableConnector(GCPConnector):
+    findings = ["Security Command Center: Public bucket detected in analytics-project"]
+
+    def describe_security_findings(self):
+        return list(self.findings)
+
+
+def test_refresh_snapshot_reports_only_changes():
+    connector = _MutableConnector()
+    platform = CloudOpsPlatform([AWSConnector(), connector])
+    baseline = platform.collect_posture_snapshot()
+
+    unchanged = platform.refresh_snapshot(baseline)
+    assert unchanged.is_empty
+    assert unchanged.snapshot.resources == baseline.resources
+
+    event_stream = connector._resources[1]
+    connector._resources[1] = replace(event_stream, cost_per_hour=1.0)
+    connector._resources.append(replace(event_stream, name="audit-log", cost_per_hour=0.1))
+    connector._resources.pop(0)
+    connector.findings = ["Security Command Center: Firewall rule allows 0.0.0.0/0"]
+
+    delta = platform.refresh_snapshot(baseline)
+    assert [resource.name for resource in delta.added] == ["audit-log"]
+    assert [resource.name for resource in delta.removed] == ["ml-platform"]
+    assert [after.cost_per_hour for _, after in delta.changed] == [1.0]
+    assert delta.findings_added == {"gcp": connector.findings}
+    assert delta.cost_delta["gcp"] == round(73.0 + 401.5 - 2117.0, 2)
+
+    rebuilt = platform.collect_posture_snapshot()
+    assert delta.snapshot.resources == rebuilt.resources
+    assert platform.summarize_costs(delta.snapshot) == platform.summarize_costs(rebuilt)
+    assert platform.refresh_snapshot(delta.snapshot).is_empty
+
+
+def test_refresh_snapshot_keeps_same_named_resources_from_same_provider_connectors():
+    first, second = _MutableConnector(), _MutableConnector()
+    platform = CloudOpsPlatform([first, second])
+    baseline = platform.collect_posture_snapshot()
+    assert len(baseline.resources) == 4
+    assert platform.refresh_snapshot(baseline).is_empty
+
+    second._resources[0] = replace(second._resources[0], cost_per_hour=1.0)
+    delta = platform.refresh_snapshot(baseline)
+    rebuilt = platform.collect_posture_snapshot()
+
+    assert len(delta.snapshot.resources) == len(rebuilt.resources) == 4
+    assert delta.snapshot.resources == rebuilt.resources
+    assert [(before.cost_per_hour, after.cost_per_hour) for before, after in delta.changed] == [(2.9, 1.0)]
+    assert not delta.added and not delta.removed
+    assert platform.refresh_snapshot(delta.snapshot).is_empty
+
+
+def test_resource_table_round_trips_and_groups_costs():
+    platform = CloudOpsPlatform([AWSConnector(), AzureConnector(), GCPConnector()])
+    snapshot = platform.collect_posture_snapshot()
+    table = snapshot.table()
+
+    assert table is snapshot.table()
+    assert ResourceTable.from_resources(table).to_resources() == snapshot.resources
+    assert list(table.cost_per_month()) == [r.cost_per_month() for r in snapshot.resources]
+    assert table.group_sum("provider") == {
+        provider: cost for provider, cost in platform.summarize_costs(snapshot).items() if provider != "total"
+    }
+    assert table.group_sum("tag:env") == {"prod": 8760.0, "staging": 766.5, "dev": 328.5}
+
+
+def test_snapshot_query_uses_tag_and_range_indexes():
+    platform = CloudOpsPlatform([AWSConnector(), AzureConnector(), GCPConnector()])
+    snapshot = platform.collect_posture_snapshot()
+
+    assert [r.name for r in snapshot.query(tags={"tier": "web"}, utilization=(None, 0.35))] == [
+        "support-functions"
+    ]
+    prod_web = snapshot.query(tags={"env": "prod", "tier": "web"}, utilization=(None, 0.5))
+    assert [r.name for r in prod_web] == ["orders-api"]
+    expensive = snapshot.query(cost_per_hour=(3.0, None))
+    assert [r.name for r in expensive] == ["finance-warehouse", "customer-insights"]
+    assert snapshot.query(provider="gcp", resource_type="gke_cluster")[0].name == "ml-platform"
+    assert snapshot.query(tags={"env": "qa"}) == []
+    assert snapshot.query() == snapshot.resources
+
+    # In-place edits, including to a resource's tags, take effect after invalidate().
+    table, versions = snapshot.table(), dict(snapshot.versions())
+    position = snapshot.resources.index(expensive[0])
+    snapshot.resources[position] = replace(expensive[0], cost_per_hour=0.5)
+    snapshot.invalidate()
+    assert [r.name for r in snapshot.query(cost_per_hour=(3.0, None))] == ["customer-insights"]
+    assert snapshot.table() is not table and snapshot.versions() != versions
+    assert snapshot.table() is snapshot.table()
+    snapshot.resources[position].tags["env"] = "qa"
+    snapshot.invalidate()
+    assert [r.name for r in snapshot.query(tags={"env": "qa"})] == [expensive[0].name]
+    snapshot.resources = sorted(snapshot.resources, key=lambda r: r.name, reverse=True)
+    assert snapshot.query() == snapshot.resources
+
+
+def test_cost_cube_rollups_slices_and_avoids_rounding_drift():
+    platform = CloudOpsPlatform([AWSConnector(), AzureConnector(), GCPConnector()])
+    cube = platform.cost_cube(dimensions=("provider", "resource_type", "tag:env"))
+
+    assert cube.rollup("tag:env") == {"prod": 8760.0, "staging": 766.5, "dev": 328.5}
+    assert cube.slice({"tag:env": "prod"}).rollup("provider") == {
+        "aws": 4270.5,
+        "azure": 2372.5,
+        "gcp": 2117.0,
+    }
+    assert cube.top(1, "provider", "tag:env") == [(("aws", "prod"), 4270.5)]
+    assert cube.total() == 9855.0
+
+    tiny = [
+        CloudResource("aws", f"lambda-{i}", "lambda", 0.00001, 0.5, {"env": "prod"}) for i in range(1000)
+    ]
+    drift_free = CostCube.build(ResourceTable.from_resources(tiny), ("provider",))
+    assert round(sum(resource.cost_per_month() for resource in tiny), 2) == 10.0
+    assert drift_free.total() == 7.3
+
+
+def test_advisor_rules_load_from_file_and_track_stats(tmp_path):
+    rules = {
+        "rules": [
+            {
+                "name": "idle_prod_web",
+                "scope": "resource",
+                "when": [
+                    {"field": "tags.env", "op": "==", "value": "prod"},
+                    {"field": "tags.tier", "op": "in", "value": ["web", "data"]},
+                    {"field": "cost_per_month", "op": ">=", "value": 1000},
+                ],
+                "message": "{count} prod web/data services cost over $1k: {names}.",
+            },
+            {
+                "name": "cpu_hot",
+                "scope": "provider",
+                "when": {"field": "avg_cpu_utilization", "op": ">", "value": 0.5},
+                "message": "{PROVIDER} CPU is at {avg_cpu_utilization:.0%}.",
+            },
+        ]
+    }
+    path = tmp_path / "rules.json"
+    path.write_text(json.dumps(rules))
+    advisor = LLMAdvisor.from_file(path)
+    platform = CloudOpsPlatform([AWSConnector(), AzureConnector(), GCPConnector()], advisor=advisor)
+
+    snapshot = platform.collect_posture_snapshot()
+
+    assert snapshot.advisor_recommendations == [
+        "2 prod web/data services cost over $1k: ml-platform, orders-api.",
+        "AWS CPU is at 54%.",
+    ]
+    stats = advisor.rule_stats
+    assert (stats["idle_prod_web"].evaluations, stats["idle_prod_web"].matches) == (6, 2)
+    assert (stats["cpu_hot"].evaluations, stats["cpu_hot"].matches) == (3, 1)
+
+
+def test_rule_engine_indexes_match_a_brute_force_scan():
+    resources = [
+        CloudResource(
+            ("aws", "gcp")[i % 2], f"svc-{i}", ("vm", "db", "cache")[i % 3], round(0.25 * (i % 9), 2),
+            (i % 10) / 10, {"env": ("prod", "dev")[i % 2]} if i % 5 else {},
+        )
+        for i in range(300)
+    ]
+    conditions = [
+        ("utilization", "<", 0.3), ("utilization", "<=", 0.3), ("cost_per_hour", ">", 1.0),
+        ("cost_per_month", ">=", 547.5), ("cost_per_hour", "==", 0.5), ("utilization", "!=", 0.5),
+        ("cost_per_hour", "in", [0.25, 2.0]), ("tags.env", "==", "prod"), ("tags.env", "!=", "prod"),
+        ("provider", "not in", ["aws"]), ("name", "in", ["svc-3", "svc-4"]),
+        ("utilization", ">", 0.5), ("cost_per_hour", "<", 1.0),
+    ]
+    not_db = {"field": "resource_type", "op": "!=", "value": "db"}
+    rules = [
+        {"name": f"r{n}", "when": [{"field": f, "op": op, "value": v}, not_db], "message": "{names}"}
+        for n, (f, op, v) in enumerate(conditions)
+    ]
+    engine = RuleEngine(rules)
+    messages = engine.evaluate(resources, {})
+
+    def _value(resource, field):
+        if field == "cost_per_month":
+            return resource.cost_per_month()
+        if field.startswith("tags."):
+            return resource.tags.get(field[len("tags.") :])
+        return getattr(resource, field)
+
+    expected = []
+    for rule, (field, op, value) in zip(engine.rules, conditions):
+        test = rule.conditions[0].test
+        names = sorted(r.name for r in resources if test(_value(r, field)) and r.resource_type != "db")
+        if names:
+            expected.append(", ".join(names))
+    assert messages == expected
+
+    with pytest.raises(ValueError, match="unknown resource field 'owner'"):
+        compile_rules([{"name": "bad", "when": {"field": "owner", "op": "==", "value": "x"}, "message": ""}])
+
+
+def test_snapshot_history_answers_daily_cost_trends_from_the_index(tmp_path):
+    platform = CloudOpsPlatform(connectors=[AWSConnector(), AzureConnector(), GCPConnector()])
+    snapshot = platform.collect_posture_snapshot()
+    costs = platform.summarize_costs(snapshot)
+    day0 = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+    store = SnapshotStore(tmp_path)
+    for offset in (2, 0, 1):
+        store.append(snapshot, at=day0 + timedelta(days=offset, hours=6))
+    store.append(snapshot, at=day0 + timedelta(days=1, hours=18))
+
+    reopened = SnapshotStore(tmp_path)
+    assert len(reopened) == 4
+    assert [entry.at.day for entry in reopened.scan()] == [1, 2, 2, 3]
+    assert len(reopened.scan(day0 + timedelta(days=1), day0 + timedelta(days=2))) == 2
+
+    daily = reopened.daily_cost_by_provider(day0, day0 + timedelta(days=2))
+    assert sorted(daily) == [(day0 + timedelta(days=offset)).date() for offset in (0, 1)]
+    for provider in ("aws", "azure", "gcp"):
+        assert daily[day0.date()][provider] == costs[provider]
+
+    entry, restored = next(reopened.iter_snapshots())
+    assert restored == snapshot
+
+    tiny = PostureSnapshot(
+        resources=[CloudResource("aws", f"lambda-{i}", "lambda", 0.00001, 0.5, {}) for i in range(1000)],
+        metrics={}, security_findings={}, advisor_recommendations=[],
+    )
+    rollup = store.append(tiny, at=day0 + timedelta(days=5)).providers["aws"]
+    assert rollup == {"monthly_cost": platform.summarize_costs(tiny)["aws"], "resources": 1000}
+    assert rollup["monthly_cost"] == 7.3
+
+
+def test_import_cloudops_is_lazy_and_within_budget():
+    script = (
+        "import sys, time\n"
+        "start = time.perf_counter()\n"
+        "import cloudops\n"
+        "elapsed = time.perf_counter() - start\n"
+        "loaded = sorted(m for m in sys.modules if m.startswith('cloudops.'))\n"
+        "print(elapsed, ','.join(loaded))\n"
+    )
+    output = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, check=True).stdout
+    elapsed, loaded = output.split()[0], output.split()[1:]
+    assert float(elapsed) < 0.25
+    assert loaded == []
+
+
+def test_connector_registry_loads_only_selected_connectors():
+    assert {"aws", "azure", "gcp"} <= set(available_connectors())
+    register_connector("static", lambda: AWSConnector())
+    (connector,) = create_connectors(["static"])
+    assert connector.provider == "aws"
+    with pytest.raises(ValueError, match="Unknown connector 'nope'"):
+        create_connectors(["nope"])
+
+
+class _PagedConnector:
+    provider = "paged"
+
+    def __init__(self, total: int) -> None:
+        self.total = total
+        self.requests = []
+
+    def list_resources_page(self, page_token=None, page_size=100):
+        self.requests.append(page_token)
+        start = int(page_token or 0)
+        stop = min(start + page_size, self.total)
+        resources = tuple(
+            CloudResource("paged", f"vm-{i}", "vm", 0.1, 0.5, {}) for i in range(start, stop)
+        )
+        return ResourcePage(resources, str(stop) if stop < self.total else None)
+
+    def discover_resources(self):
+        return [r for page in list_resource_pages(self, page_size=1000) for r in page.resources]
+
+    def collect_operational_metrics(self):
+        return {}
+
+    def describe_security_findings(self):
+        return []
+
+
+def test_resource_pages_resume_from_tokens_for_native_and_offset_paging():
+    paged = _PagedConnector(total=25)
+    pages = list(list_resource_pages(paged, page_size=10))
+    assert [len(page.resources) for page in pages] == [10, 10, 5]
+    assert [page.next_token for page in pages] == ["10", "20", None]
+    resumed = list(list_resource_pages(paged, page_size=10, page_token=pages[0].next_token))
+    assert resumed[0].resources[0].name == "vm-10"
+
+    aws = AWSConnector()
+    offset_pages = list(list_resource_pages(aws, page_size=2))
+    flattened = [r for page in offset_pages for r in page.resources]
+    assert flattened == list(aws.discover_resources())
+    tail = list(list_resource_pages(aws, page_size=2, page_token=offset_pages[0].next_token))
+    assert [r for page in tail for r in page.resources] == flattened[2:]
+
+    async def _collect():
+        return [page async for page in alist_resource_pages(paged, page_size=10)]
+
+    assert asyncio.run(_collect()) == pages
+
+
+def test_platform_streams_pages_with_bounded_prefetch():
+    paged = _PagedConnector(total=1000)
+    platform = CloudOpsPlatform(connectors=[paged, AWSConnector()])
+    stream = platform.iter_resource_pages(page_size=50, max_pending=2)
+    provider, first = next(stream)
+    assert provider == "paged" and len(first.resources) == 50
+    time.sleep(0.05)
+    # The producer may hold one page while blocked on the full queue.
+    assert len(paged.requests) <= 1 + 2 + 1
+    stream.close()
+
+    resumed = list(platform.iter_resource_pages(page_size=50, resume_tokens={"paged": "950"}))
+    assert [p for p, _ in resumed].count("paged") == 1
+    snapshot = platform.collect_posture_snapshot()
+    assert len(snapshot.resources) == 1000 + len(list(AWSConnector().discover_resources()))
+
+    def _boom():
+        yield 1
+        raise RuntimeError("page fetch failed")
+
+    with pytest.raises(RuntimeError, match="page fetch failed"):
+        list(prefetch(_boom()))
+
+
+def test_resource_pages_are_tagged_by_connector_and_cache_keeps_native_paging():
+    platform = CloudOpsPlatform([AWSConnector(), _SecondAccountConnector()])
+    assert platform.connector_ids == ["aws", "aws#2"]
+    pages = list(platform.iter_resource_pages(page_size=1))
+    assert [connector_id for connector_id, _ in pages] == ["aws", "aws", "aws#2", "aws#2"]
+
+    resumed = list(platform.iter_resource_pages(page_size=1, resume_tokens={"aws": None, "aws#2": "1"}))
+    assert [(connector_id, page.resources[0].name) for connector_id, page in resumed] == [
+        ("aws#2", "finance-warehouse-b")
+    ]
+
+    paged = _PagedConnector(total=30)
+    cached = CloudOpsPlatform([paged], cache=ConnectorCache())
+    list(cached.iter_resource_pages(page_size=10))
+    assert paged.requests == [None, "10", "20"]
+
+
+def test_serial_collection_pages_on_the_calling_thread():
+    threads = []
+
+    class _ThreadRecordingConnector(_PagedConnector):
+        def list_resources_page(self, page_token=None, page_size=100):
+            threads.append(threading.current_thread())
+            return super().list_resources_page(page_token, page_size)
+
+    platform = CloudOpsPlatform([_ThreadRecordingConnector(total=150)])
+    assert len(platform.collect_posture_snapshot().resources) == 150
+    assert threads == [threading.current_thread()] * 2
+
+
+def test_cache_serves_pages_of_a_paginated_connector():
+    now = [0.0]
+    paged = _PagedConnector(total=250)
+    cache = ConnectorCache(ttls={"list_resources_page": 10}, clock=lambda: now[0])
+    platform = CloudOpsPlatform([paged], cache=cache)
+
+    first = platform.summarize_costs()
+    assert [platform.summarize_costs() for _ in range(2)] == [first, first]
+    assert paged.requests == [None, "100", "200"]
+
+    now[0] = 11.0
+    platform.summarize_costs()
+    assert len(paged.requests) == 6
+    assert platform._connectors[0].invalidate("list_resources_page") == 3
@@ -0,0 +1,304 @@
+import csv
+
+import pytest
+
+from etl import dedup as dedup_module
+from etl import etl_job
+from etl.columnar import iter_extract_columns, iter_transform_columns
+from etl.dedup import RowDeduplicator
+from etl.incremental import StateStore, run_incremental_pipeline
+from etl.parallel import discover_partitions, iter_partitioned
+
+
+def _write_sales(path, rows):
+    with path.open("w", newline="") as handle:
+        writer = csv.writer(handle)
+        writer.writerow(["id", "product", "amount"])
+        writer.writerows(rows)
+
+
+def test_streaming_pipeline_matches_batch(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    batch_rows = etl_job.etl_pipeline()
+    streaming_rows = etl_job.etl_pipeline("streaming", chunk_rows=2)
+    columnar_rows = etl_job.etl_pipeline("columnar", chunk_rows=2)
+    assert streaming_rows == columnar_rows == batch_rows
+
+
+def test_iter_extract_respects_chunk_budgets(tmp_path):
+    source = tmp_path / "sales.csv"
+    _write_sales(source, [(i, "Widget", 1.5) for i in range(10)])
+
+    by_rows = list(etl_job.iter_extract(source, chunk_rows=3))
+    assert [len(chunk) for chunk in by_rows] == [3, 3, 3, 1]
+
+    by_bytes = list(etl_job.iter_extract(source, chunk_bytes=1))
+    assert [len(chunk) for chunk in by_bytes] == [1] * 10
+
+
+def test_iter_transform_dedups_across_chunks():
+    chunks = [
+        [{"id": "1", "amount": "2.0"}, {"id": "2", "amount": ""}],
+        [{"id": "1", "amount": "2.0"}],
+    ]
+    cleaned = [row for chunk in etl_job.iter_transform(chunks) for row in chunk]
+    assert cleaned == [{"id": "1", "amount": 2.0}, {"id": "2", "amount": 0.0}]
+
+
+def test_row_deduplicator_reports_drops_and_spills(tmp_path):
+    rows = [{"id": str(i % 5), "amount": "1.0"} for i in range(20)]
+    with RowDeduplicator(digest_bits=128, verify=True, spill_path=tmp_path / "fp.db") as dedup:
+        kept = etl_job.transform(rows, dedup)
+    assert len(kept) == 5
+    assert dedup.rows_in == 20
+    assert dedup.rows_dropped == 15
+
+
+def test_row_deduplicator_verify_keeps_colliding_rows(monkeypatch):
+    class _ConstantDigest:
+        def __init__(self, *_, **__):
+            pass
+
+        def digest(self):
+            return b"\0" * 8
+
+    monkeypatch.setattr(dedup_module, "blake2b", _ConstantDigest)
+    dedup = RowDeduplicator(verify=True)
+    assert dedup.is_duplicate({"id": "1"}) is False
+    assert dedup.is_duplicate({"id": "2"}) is False
+    assert dedup.is_duplicate({"id": "2"}) is True
+    assert dedup.rows_dropped == 1
+
+
+def test_columnar_transform_matches_row_wise(tmp_path):
+    source = tmp_path / "sales.csv"
+    _write_sales(source, [(1, "Widget", 1.5), (2, "Gadget", ""), (1, "Widget", 1.5), (3, "Gizmo", "None")])
+
+    row_wise = [row for chunk in etl_job.iter_transform(etl_job.iter_extract(source)) for row in chunk]
+    batches = iter_transform_columns(iter_extract_columns(source, batch_rows=3))
+    columnar = [row for batch in batches for row in batch.iter_records()]
+
+    assert columnar == row_wise
+    assert [type(row["amount"]) for row in columnar] == [float, float, float]
+
+
+def test_columnar_and_row_wise_paths_share_byte_bounds_and_reject_long_rows(tmp_path, monkeypatch):
+    source = tmp_path / "sales.csv"
+    _write_sales(source, [(i, "Widget", 1.5) for i in range(10)])
+    row_chunks = [len(chunk) for chunk in etl_job.iter_extract(source, chunk_rows=100, chunk_bytes=40)]
+    column_batches = [len(batch) for batch in iter_extract_columns(source, 100, batch_bytes=40)]
+    assert column_batches == row_chunks == [4, 4, 2]
+
+    with source.open("a", newline="") as handle:
+        csv.writer(handle).writerows([(11, "Gadget"), (12, "Gizmo", 2.0, "extra")])
+    monkeypatch.chdir(tmp_path)
+    for mode in ("batch", "streaming", "columnar"):
+        with pytest.raises(ValueError, match="Row has 4 fields but the header defines 3"):
+            etl_job.run_pipeline(mode, source=source)
+
+
+def test_parallel_pipeline_dedups_across_partitions(tmp_path, monkeypatch):
+    partitions = tmp_path / "landing"
+    partitions.mkdir()
+    _write_sales(partitions / "part-0.csv", [(1, "Widget", 1.5), (2, "Gadget", "")])
+    _write_sales(partitions / "part-1.csv", [(2, "Gadget", ""), (3, "Gizmo", 4.0)])
+    _write_sales(partitions / "part-2.csv", [(1, "Widget", 1.5), (3, "Gizmo", 4.0), (4, "Widget", 2)])
+
+    dedup = RowDeduplicator()
+    merged = list(iter_partitioned(discover_partitions(partitions), workers=2, dedup=dedup))
+
+    assert [row["id"] for row in merged] == ["1", "2", "3", "4"]
+    assert dedup.rows_in == 7
+    assert dedup.rows_dropped == 3
+
+    monkeypatch.chdir(tmp_path)
+    assert etl_job.etl_pipeline("parallel", source=partitions, workers=2) == 4
+
+
+def test_parallel_workers_use_the_callers_dedup_settings(tmp_path):
+    partitions = tmp_path / "landing"
+    partitions.mkdir()
+    _write_sales(partitions / "part-0.csv", [(1, "Widget", 1.5), (2, "Gadget", 2.0)])
+    _write_sales(partitions / "part-1.csv", [(1, "Widget v2", 1.5), (3, "Gizmo", 4.0)])
+    paths = discover_partitions(partitions)
+
+    for workers in (1, 2):
+        dedup = RowDeduplicator(columns=["id"], digest_bits=128, verify=True)
+        merged = list(iter_partitioned(paths, workers=workers, files_per_task=1, dedup=dedup))
+        assert [row["product"] for row in merged] == ["Widget", "Gadget", "Gizmo"]
+        assert dedup.rows_dropped == 1
+
+    with pytest.raises(ValueError, match="digest_bits"):
+        list(iter_partitioned(paths, digest_bits=128, dedup=RowDeduplicator()))
+
+
+def test_incremental_runs_only_load_appended_rows(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    source = tmp_path / "sales.csv"
+    state_dir = tmp_path / "state"
+    _write_sales(source, [(1, "Widget", 1.5), (2, "Gadget", "")])
+
+    first = run_incremental_pipeline(source, state_dir)
+    assert (first.rows_loaded, first.full_refresh) == (2, True)
+    assert run_incremental_pipeline(source, state_dir).rows_loaded == 0
+
+    with source.open("a", newline="") as handle:
+        csv.writer(handle).writerows([(2, "Gadget", ""), (2, "Gadget", 9.0), (3, "Gizmo", 4.0)])
+    delta = run_incremental_pipeline(source, state_dir)
+    assert (delta.rows_loaded, delta.new_rows, delta.changed_rows) == (2, 1, 1)
+    assert delta.full_refresh is False
+    assert StateStore(state_dir / "manifest.json").get(source.resolve()).high_water_id == 3
+
+    with (tmp_path / "demo_snowflake_output.csv").open() as handle:
+        target = {row["id"]: row["amount"] for row in csv.DictReader(handle)}
+    assert target == {"1": "1.5", "2": "9.0", "3": "4.0"}
+
+    with source.open("ab") as handle:
+        handle.write(b"4,Gizmo,5.0\n5,Wid")
+    partial = run_incremental_pipeline(source, state_dir)
+    assert (partial.rows_loaded, partial.new_rows) == (1, 1)
+    with source.open("ab") as handle:
+        handle.write(b"get,6.0\n")
+    completed = run_incremental_pipeline(source, state_dir)
+    assert (completed.rows_loaded, completed.new_rows, completed.full_refresh) == (1, 1, False)
+    with (tmp_path / "demo_snowflake_output.csv").open() as handle:
+        assert {row["id"]: row["product"] for row in csv.DictReader(handle)}["5"] == "Widget"
+
+    _write_sales(source, [(9, "Widget", 1.0)])
+    assert run_incremental_pipeline(source, state_dir).full_refresh is True
+
+
+def test_incremental_loads_a_last_line_without_newline(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    source = tmp_path / "sales.csv"
+    state_dir = tmp_path / "state"
+    source.write_bytes(b"id,product,amount\n1,W,1.0\n2,X,2.0")
+    batch = etl_job.run_pipeline("batch", source=source)
+
+    first = run_incremental_pipeline(source, state_dir)
+    assert (first.rows_loaded, first.full_refresh) == (batch.rows_out, True) == (2, True)
+    assert run_incremental_pipeline(source, state_dir).rows_loaded == 0
+
+    with source.open("ab") as handle:
+        handle.write(b"\n3,Y,3.0\n4,Z,4")
+    growing = run_incremental_pipeline(source, state_dir)
+    assert (growing.rows_loaded, growing.full_refresh) == (1, False)
+    settled = run_incremental_pipeline(source, state_dir)
+    assert (settled.rows_loaded, settled.new_rows, settled.full_refresh) == (1, 1, False)
+
+    # The accepted last line grew afterwards, so it was loaded incomplete.
+    with source.open("ab") as handle:
+        handle.write(b".5\n")
+    assert run_incremental_pipeline(source, state_dir).full_refresh is True
+    with (tmp_path / "demo_snowflake_output.csv").open() as handle:
+        assert {row["id"]: row["amount"] for row in csv.DictReader(handle)}["4"] == "4.5"
+
+
+def test_run_pipeline_reports_structured_stage_metrics(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    source = tmp_path / "sales.csv"
+    _write_sales(source, [(i % 4, "Widget", 1.5) for i in range(12)])
+
+    for mode in ("batch", "streaming", "columnar"):
+        result = etl_job.run_pipeline(mode, source=source, chunk_rows=5, stage_format="csv.gz")
+        assert (result.rows_in, result.rows_out, result.rows_dropped) == (12, 4, 8)
+        assert result.bytes_read == source.stat().st_size
+        assert result.bytes_written > 0
+        assert set(result.stage_seconds) == set(etl_job.STAGES)
+        assert sum(result.stage_seconds.values()) <= result.duration_seconds + 1e-6
+        assert result.peak_memory_bytes >= 0
+
+    for mode in ("batch", "streaming"):
+        with RowDeduplicator(spill_path=tmp_path / f"{mode}.db") as dedup:
+            assert etl_job.etl_pipeline(mode, source=source, chunk_rows=5, dedup=dedup) == 4
+            assert dedup.rows_dropped == 8
+        assert (tmp_path / f"{mode}.db").stat().st_size > 0
+
+
+def test_checkpointed_pipeline_resumes_failed_load_without_reextracting(tmp_path, monkeypatch):
+    from etl import checkpoint as checkpoint_module
+
+    monkeypatch.chdir(tmp_path)
+    source = tmp_path / "sales.csv"
+    _write_sales(source, [(i % 7, "Widget", "" if i == 3 else 2.5) for i in range(20)])
+    expected = etl_job.etl_pipeline("streaming", source=source, chunk_rows=4)
+
+    extracted = []
+    real_iter_chunks = checkpoint_module._iter_chunks
+    monkeypatch.setattr(
+        checkpoint_module, "_iter_chunks", lambda *a: (extracted.append(c) or c for c in real_iter_chunks(*a))
+    )
+    real_load = checkpoint_module.load
+
+    def _failing_load(rows, **kwargs):
+        raise ConnectionError("warehouse unavailable")
+
+    monkeypatch.setattr(checkpoint_module, "load", _failing_load)
+    with pytest.raises(ConnectionError):
+        etl_job.etl_pipeline("checkpointed", source=source, chunk_rows=4, checkpoint_dir=tmp_path / "ckpt")
+    assert len(extracted) == 5
+    (manifest,) = (tmp_path / "ckpt").glob("*/manifest.json")
+    assert '"complete": true' in manifest.read_text()
+
+    monkeypatch.setattr(checkpoint_module, "load", real_load)
+    rows = etl_job.etl_pipeline("checkpointed", source=source, chunk_rows=4, checkpoint_dir=tmp_path / "ckpt")
+    assert rows == expected == 8
+    assert len(extracted) == 5
+    assert not manifest.parent.exists()
+
+
+def test_checkpointed_transform_resumes_mid_stage_with_dedup_state(tmp_path, monkeypatch):
+    from etl.checkpoint import Checkpoint, input_fingerprint, run_checkpointed_pipeline
+
+    source = tmp_path / "sales.csv"
+    _write_sales(source, [(i % 3, "Widget", 1.0) for i in range(9)])
+    checkpoint = Checkpoint(tmp_path / "ckpt", input_fingerprint(source, 3))
+    for chunk in etl_job.iter_extract(source, 3):
+        checkpoint.spill("extract", chunk)
+    checkpoint.complete("extract")
+    dedup = RowDeduplicator()
+    checkpoint.spill("transform", etl_job.transform(next(checkpoint.read("extract")), dedup))
+
+    monkeypatch.chdir(tmp_path)
+    assert run_checkpointed_pipeline(source, tmp_path / "ckpt", chunk_rows=3) == 3
+
+
+def test_checkpointed_extract_seeks_past_spilled_chunks_and_prunes_stale_runs(tmp_path, monkeypatch):
+    from etl import checkpoint as checkpoint_module
+    from etl.checkpoint import Checkpoint, input_fingerprint, run_checkpointed_pipeline
+
+    monkeypatch.chdir(tmp_path)
+    source = tmp_path / "sales.csv"
+    _write_sales(source, [(i, "Widget", 1.0) for i in range(10)])
+    root = tmp_path / "ckpt"
+    stale = Checkpoint(root, "0" * 32, source)
+    stale.save()
+    unrelated = Checkpoint(root, "1" * 32, tmp_path / "other.csv")
+    unrelated.save()
+
+    checkpoint = Checkpoint(root, input_fingerprint(source, 4), source)
+    chunks = checkpoint_module._iter_chunks(source, 4, 0, None)
+    first, offset, fieldnames = next(chunks)
+    checkpoint.spill("extract", first, offset, fieldnames)
+    assert [row["id"] for row in first] == ["0", "1", "2", "3"]
+
+    offsets = []
+    real_iter_chunks = checkpoint_module._iter_chunks
+
+    def _recording_iter_chunks(path, rows, start, names):
+        offsets.append(start)
+        return real_iter_chunks(path, rows, start, names)
+
+    monkeypatch.setattr(checkpoint_module, "_iter_chunks", _recording_iter_chunks)
+    assert run_checkpointed_pipeline(source, root, chunk_rows=4) == 10
+    assert offsets == [offset]
+    assert not stale.path.exists() and unrelated.path.exists()
+
+
+def test_peak_memory_is_reported_in_bytes_on_every_platform(monkeypatch):
+    resource = pytest.importorskip("resource")
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    monkeypatch.setattr(etl_job.sys, "platform", "darwin")
+    assert etl_job._peak_memory_bytes() in (maxrss, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+    monkeypatch.setattr(etl_job.sys, "platform", "linux")
+    assert etl_job._peak_memory_bytes() >= maxrss * 1024
@@ -0,0 +1,74 @@
+import importlib
+import sys
+import types
+
+import pytest
+
+from etl.etl_job import STAGES, PipelineResult
+from monitoring.tracing import Tracer
+
+
+class _Metric:
+    def __init__(self, name, documentation, labelnames=(), **_):
+        self.name = name
+        self.labelnames = tuple(labelnames)
+        self.value = 0.0
+        self.observations = []
+        self.children = {}
+
+    def labels(self, **labels):
+        key = tuple(labels[name] for name in self.labelnames)
+        return self.children.setdefault(key, _Metric(self.name, ""))
+
+    def set(self, value):
+        self.value = value
+
+    def inc(self, amount=1):
+        self.value += amount
+
+    def observe(self, value):
+        self.observations.append(value)
+
+
+@pytest.fixture
+def exporter(monkeypatch):
+    client = types.ModuleType("prometheus_client")
+    client.Counter = client.Gauge = client.Histogram = _Metric
+    client.start_http_server = lambda port: None
+    monkeypatch.setitem(sys.modules, "prometheus_client", client)
+    monkeypatch.delitem(sys.modules, "monitoring.exporter", raising=False)
+    yield importlib.import_module("monitoring.exporter")
+    sys.modules.pop("monitoring.exporter", None)
+
+
+def test_record_result_observes_stages_and_increments_counters(exporter):
+    result = PipelineResult(
+        mode="batch",
+        rows_in=10,
+        rows_out=8,
+        rows_dropped=2,
+        bytes_read=1000,
+        bytes_written=600,
+        duration_seconds=1.5,
+        peak_memory_bytes=4096,
+        stage_seconds={"extract": 0.25, "transform": 0.5},
+    )
+    exporter.record_result(result)
+    exporter.record_result(result)
+
+    for stage in STAGES:
+        expected = result.stage_seconds.get(stage, 0.0)
+        assert exporter.STAGE_DURATION.labels(stage=stage).observations == [expected, expected]
+    assert (exporter.ROWS_IN.value, exporter.ROWS_OUT.value, exporter.ROWS_DROPPED.value) == (20, 16, 4)
+    assert (exporter.BYTES_READ.value, exporter.BYTES_WRITTEN.value) == (2000, 1200)
+    assert (exporter.ETL_ROWS.value, exporter.ETL_DURATION.value) == (8, 1.5)
+    assert exporter.PROCESS_PEAK_RSS.name == "etl_process_peak_rss_bytes"
+    assert exporter.PROCESS_PEAK_RSS.value == 4096
+
+
+def test_traced_spans_are_exported_as_histograms(exporter):
+    tracer = Tracer(enabled=True)
+    tracer.add_listener(exporter.observe_span)
+    tracer.record("load", 0.5)
+    tracer.record("load", 0.25)
+    assert exporter.SPAN_DURATION.labels(span="load").observations == [0.5, 0.25]
@@ -0,0 +1,142 @@
+import asyncio
+import time
+
+import pytest
+
+from monitoring.tracing import Tracer
+from remediation import retry_handler
+from remediation.retry_handler import (
+    CircuitBreaker,
+    CircuitOpenError,
+    RetryBudget,
+    RetryError,
+    RetryPolicy,
+    run_with_retries,
+)
+
+
+class _Flaky:
+    def __init__(self, failures, exc=ConnectionError):
+        self.failures = failures
+        self.exc = exc
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise self.exc(f"failure {self.calls}")
+        return 42
+
+
+def test_backoff_is_exponential_capped_and_skips_final_sleep():
+    sleeps = []
+    policy = RetryPolicy(max_attempts=4, base_delay=1, max_delay=3, jitter=False, sleep=sleeps.append)
+    with pytest.raises(RetryError) as info:
+        policy.call(_Flaky(10))
+    assert sleeps == [1, 2, 3]
+    assert info.value.attempts == 4 and isinstance(info.value.__cause__, ConnectionError)
+    assert (policy.stats.attempts, policy.stats.retries, policy.stats.failures) == (4, 3, 1)
+    assert policy.stats.waited_seconds == 6
+
+    jittered = RetryPolicy(base_delay=4, rng=lambda: 0.25)
+    assert jittered.backoff(2) == 2.0
+
+
+def test_classification_and_deadline_stop_retries_early():
+    sleeps = []
+    policy = RetryPolicy(max_attempts=5, give_up_on=(ValueError,), sleep=sleeps.append)
+    with pytest.raises(ValueError) as raised:
+        policy.call(_Flaky(3, exc=ValueError))
+    assert sleeps == []
+    assert raised.value.__cause__ is None
+
+    async def _invalid():
+        raise ValueError("bad input")
+
+    with pytest.raises(ValueError) as raised:
+        asyncio.run(policy.acall(_invalid))
+    assert raised.value.__cause__ is None
+
+    now = [0.0]
+    deadline = RetryPolicy(
+        max_attempts=10, base_delay=2, jitter=False, deadline=5,
+        sleep=lambda d: now.__setitem__(0, now[0] + d), clock=lambda: now[0],
+    )
+    with pytest.raises(RetryError) as info:
+        deadline.call(_Flaky(10))
+    assert info.value.attempts == 2 and now[0] == 2
+
+
+def test_shared_budget_and_circuit_breaker_fail_fast():
+    budget = RetryBudget(max_tokens=2, refill_ratio=0.5)
+    policy = RetryPolicy(max_attempts=5, jitter=False, budget=budget, sleep=lambda d: None)
+    assert policy.call(_Flaky(2)) == 42
+    assert budget.tokens == 0.5
+    with pytest.raises(RetryError):
+        policy.call(_Flaky(1))
+    assert policy.stats.budget_exhausted == 1
+
+    now = [0.0]
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=10, clock=lambda: now[0])
+    policy = RetryPolicy(max_attempts=1, breaker=breaker)
+    for _ in range(2):
+        with pytest.raises(RetryError):
+            policy.call(_Flaky(1))
+    with pytest.raises(CircuitOpenError):
+        policy.call(_Flaky(0))
+    now[0] = 10
+    assert breaker.state == "half-open"
+    assert policy.call(_Flaky(0)) == 42 and breaker.state == "closed"
+
+
+def test_half_open_breaker_admits_a_single_probe():
+    now = [0.0]
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10, clock=lambda: now[0])
+    policy = RetryPolicy(max_attempts=3, breaker=breaker, sleep=lambda d: None)
+    with pytest.raises(RetryError):
+        policy.call(_Flaky(5))
+    now[0] = 10
+
+    def _probe():
+        # Concurrent callers are rejected while the probe is in flight.
+        with pytest.raises(CircuitOpenError):
+            policy.call(_Flaky(0))
+        raise ConnectionError("still down")
+
+    with pytest.raises(RetryError) as info:
+        policy.call(_probe)
+    assert info.value.attempts == 1 and breaker.state == "open"
+
+    now[0] = 20
+    assert breaker.admit() == "half-open" and not breaker.allow()
+    breaker.record_success()
+    assert breaker.state == "closed" and breaker.allow()
+
+
+def test_retry_wait_span_covers_the_sleep(monkeypatch):
+    tracer = Tracer(enabled=True)
+    monkeypatch.setattr(retry_handler, "tracer", tracer)
+    policy = RetryPolicy(max_attempts=2, base_delay=0.02, jitter=False, sleep=time.sleep)
+    started = time.time()
+    assert policy.call(_Flaky(1)) == 42
+    (wait,) = [span for span in tracer.spans if span.name == "retry.wait"]
+    assert wait.start >= started and wait.duration >= 0.02
+    assert wait.attributes == {"delay": 0.02, "attempt": 1, "error": "ConnectionError"}
+
+
+def test_async_variant_and_run_with_retries(capsys):
+    async def _flaky_async(state={"calls": 0}):
+        state["calls"] += 1
+        if state["calls"] < 3:
+            raise TimeoutError("slow")
+        return "ok"
+
+    policy = RetryPolicy(max_attempts=3, base_delay=0.001)
+    assert asyncio.run(policy.acall(_flaky_async)) == "ok"
+    assert policy.stats.retries == 2
+
+    assert run_with_retries(_Flaky(1), retries=2, delay=0) == 42
+    with pytest.raises(RuntimeError, match="failed permanently") as info:
+        run_with_retries(_Flaky(5), retries=2, delay=0)
+    assert isinstance(info.value.__cause__, ConnectionError)
+    assert "Attempt 2/2 failed" in capsys.readouterr().out
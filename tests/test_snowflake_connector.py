@@ -0,0 +1,176 @@
+import csv
+import threading
+
+import pytest
+
+from snowflake.connector import MAX_EXECUTED_COMMANDS, ConnectionPool, FakeConnection, FakeCursor
+from snowflake.connector.staging import read_stage_file
+
+
+def _table_rows(cursor, table_name, chunked=True):
+    rows = []
+    for path in cursor.table_files(table_name, chunked=chunked):
+        with path.open() as handle:
+            rows.extend(csv.DictReader(handle))
+    return rows
+
+
+def test_chunked_write_honours_table_and_append(tmp_path):
+    cursor = FakeCursor(stage_dir=tmp_path / "stage")
+    rows = [{"id": i, "amount": i * 1.5} for i in range(10)]
+
+    assert cursor.write_records(rows, "SALES", chunk_rows=4, parallel=2) == (True, 3, 10, None)
+    assert cursor.write_records(rows[:2], "SALES", overwrite=False, chunk_rows=4) == (True, 1, 2, None)
+    assert cursor.write_records(rows[:1], "RETURNS", chunk_rows=4) == (True, 1, 1, None)
+
+    assert [path.name for path in cursor.table_files("SALES", chunked=True)] == [
+        "part-00000.csv",
+        "part-00001.csv",
+        "part-00002.csv",
+        "part-00003.csv",
+    ]
+    assert len(_table_rows(cursor, "SALES")) == 12
+    assert len(_table_rows(cursor, "RETURNS")) == 1
+
+
+def test_overwrite_with_no_rows_empties_the_table(tmp_path):
+    cursor = FakeCursor(output_path=tmp_path / "out.csv", stage_dir=tmp_path / "stage")
+    rows = [{"id": i, "amount": i * 1.5} for i in range(5)]
+    cursor.write_records(rows, "SALES", chunk_rows=2)
+    cursor.write_records(rows, "SALES")
+
+    assert cursor.write_records([], "SALES", overwrite=False, chunk_rows=2) == (True, 0, 0, None)
+    assert len(_table_rows(cursor, "SALES")) == 5
+    assert cursor.write_records([], "SALES", chunk_rows=2) == (True, 0, 0, None)
+    assert cursor.table_files("SALES", chunked=True) == []
+    assert cursor.write_records([], "SALES") == (True, 0, 0, None)
+    assert cursor.table_files("SALES", chunked=False) == []
+
+
+def test_single_file_loads_keep_tables_apart(tmp_path):
+    cursor = FakeCursor(output_path=tmp_path / "out.csv", stage_dir=tmp_path / "stage")
+    cursor.write_records([{"id": i, "amount": 1.0} for i in range(3)], "SALES")
+    cursor.write_records([{"id": 9, "reason": "damaged"}], "RETURNS")
+    cursor.write_records([{"id": 10, "reason": "late"}], "RETURNS", overwrite=False)
+
+    assert cursor.table_files("SALES", chunked=False) == [tmp_path / "out.csv"]
+    assert cursor.table_files("RETURNS", chunked=False) == [tmp_path / "out_returns.csv"]
+    assert len(_table_rows(cursor, "SALES", chunked=False)) == 3
+    assert [row["reason"] for row in _table_rows(cursor, "RETURNS", chunked=False)] == ["damaged", "late"]
+
+
+def test_cursor_keeps_only_recent_commands():
+    cursor = FakeCursor()
+    for i in range(MAX_EXECUTED_COMMANDS + 5):
+        cursor.execute(f"SELECT {i}")
+    assert len(cursor.executed_commands) == MAX_EXECUTED_COMMANDS
+    assert cursor.executed_commands[-1] == f"SELECT {MAX_EXECUTED_COMMANDS + 4}"
+
+
+def test_merge_upserts_on_keys(tmp_path):
+    cursor = FakeCursor(stage_dir=tmp_path / "stage")
+    cursor.write_records([{"id": 1, "amount": 1.0}, {"id": 2, "amount": 2.0}], "SALES", chunk_rows=1)
+
+    result = cursor.write_records(
+        [{"id": 2, "amount": 20.0}, {"id": 3, "amount": 3.0}],
+        "SALES",
+        overwrite=False,
+        chunk_rows=2,
+        merge_keys=["id"],
+    )
+
+    assert result == (True, 2, 2, None)
+    assert [(row["id"], row["amount"]) for row in _table_rows(cursor, "SALES")] == [
+        ("1", "1.0"),
+        ("2", "20.0"),
+        ("3", "3.0"),
+    ]
+
+
+def test_compressed_stage_formats_round_trip(tmp_path):
+    rows = [{"id": i, "product": "Widget" if i % 2 else None, "amount": i * 0.5} for i in range(200)]
+    for stage_format in ("csv.gz", "columnar"):
+        cursor = FakeCursor(stage_dir=tmp_path / stage_format)
+        cursor.write_records(rows, "SALES", chunk_rows=64, stage_format=stage_format)
+
+        stats = cursor.last_load
+        assert (stats.files, stats.rows) == (4, 200)
+        assert stats.compression_ratio > 1
+
+        loaded = [row for path in cursor.table_files("SALES", chunked=True) for row in read_stage_file(path)]
+        assert len(loaded) == 200
+        if stage_format == "columnar":
+            assert loaded == rows
+
+
+def test_pool_reuses_connections_and_reports_hits():
+    pool = ConnectionPool(FakeConnection, min_size=0, max_size=2)
+    with pool.connection() as first:
+        pass
+    with pool.connection() as second:
+        assert second is first
+
+    stats = pool.stats()
+    assert (stats.acquisitions, stats.hits, stats.misses) == (2, 1, 1)
+    assert stats.hit_rate == 0.5
+
+
+def test_pool_discards_unhealthy_and_times_out_when_exhausted():
+    pool = ConnectionPool(FakeConnection, min_size=1, max_size=1, max_idle=0.0)
+    connection = pool.acquire()
+    with pytest.raises(TimeoutError):
+        pool.acquire(timeout=0.01)
+
+    connection.close()
+    pool.release(connection)
+    replacement = pool.acquire()
+    assert replacement is not connection
+    assert pool.stats().timeouts == 1
+    pool.release(replacement)
+    pool.close()
+    assert replacement.is_closed()
+
+
+def test_pool_replaces_idle_connections_that_fail_the_health_check():
+    broken = []
+    pool = ConnectionPool(
+        FakeConnection,
+        min_size=0,
+        max_size=2,
+        health_check=lambda conn: all(conn is not unhealthy for unhealthy in broken),
+    )
+    with pool.connection() as first, pool.connection() as second:
+        pass
+    # ``first`` was released last, so it is the first idle connection tried.
+    broken.append(first)
+
+    replacement = pool.acquire()
+    assert replacement is second
+    assert first.is_closed() and not second.is_closed()
+    stats = pool.stats()
+    assert (stats.unhealthy, stats.hits, stats.size, stats.idle) == (1, 1, 1, 0)
+
+    broken.append(second)
+    pool.release(second)
+    fresh = pool.acquire()
+    assert fresh is not second and second.is_closed()
+    assert (pool.stats().unhealthy, pool.stats().misses) == (2, 3)
+
+
+def test_pool_is_thread_safe():
+    pool = ConnectionPool(FakeConnection, min_size=0, max_size=3)
+    borrowed = []
+
+    def _borrow():
+        for _ in range(50):
+            with pool.connection() as connection:
+                borrowed.append(connection)
+
+    threads = [threading.Thread(target=_borrow) for _ in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len({id(connection) for connection in borrowed}) <= 3
+    assert pool.stats().acquisitions == 300
@@ -0,0 +1,63 @@
+import json
+
+import pytest
+
+from etl import etl_job
+from monitoring import tracing
+from monitoring.tracing import Tracer
+
+
+def test_disabled_tracer_returns_shared_noop_span():
+    tracer = Tracer()
+    with tracer.span("anything", rows=1) as current:
+        current.set(more=2)
+    assert tracer.span("a") is tracer.span("b")
+    assert len(tracer.spans) == 0
+
+
+def test_spans_nest_record_errors_and_export_chrome_trace(tmp_path):
+    tracer = Tracer(enabled=True)
+    seen = []
+    tracer.add_listener(seen.append)
+    with tracer.span("outer", mode="batch"):
+        with tracer.span("inner") as inner:
+            inner.set(rows=3)
+        with pytest.raises(RuntimeError):
+            with tracer.span("failing"):
+                raise RuntimeError("boom")
+    tracer.record("streamed", 0.5, streamed=True)
+
+    assert [(s.name, s.depth) for s in seen] == [("inner", 1), ("failing", 1), ("outer", 0), ("streamed", 0)]
+    assert seen[1].attributes["error"] == "RuntimeError('boom')"
+    events = json.loads(tracer.write_trace(tmp_path / "trace.json").read_text())["traceEvents"]
+    assert events[0]["args"] == {"rows": 3} and events[3]["dur"] == 0.5e6
+
+
+def test_profiling_dumps_cprofile_stats_and_allocation_peak(tmp_path):
+    tracer = Tracer(profile=["cprofile", "tracemalloc"], profile_dir=tmp_path)
+    with tracer.span("work") as current:
+        with tracer.span("nested"):
+            blob = [bytes(1000) for _ in range(100)]
+        del blob
+    assert current.attributes["alloc_peak_bytes"] > 100_000
+    assert (tmp_path / current.attributes["profile"].split("/")[-1]).exists()
+    assert "profile" not in tracer.spans[0].attributes
+    with pytest.raises(ValueError, match="Unsupported profiler"):
+        Tracer(profile=["perf"])
+
+
+def test_pipeline_emits_stage_and_write_spans(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    tracer = Tracer(enabled=True)
+    monkeypatch.setattr(tracing, "tracer", tracer)
+    monkeypatch.setattr(etl_job, "tracer", tracer)
+
+    etl_job.run_pipeline("batch")
+    assert [s.name for s in tracer.spans] == [
+        "etl.extract", "etl.transform", "snowflake.write_records", "etl.load", "etl.pipeline"
+    ]
+    tracer.clear()
+    etl_job.run_pipeline("streaming", chunk_rows=2)
+    names = [s.name for s in tracer.spans]
+    assert names[-3:] == ["etl.extract", "etl.transform", "etl.pipeline"]
+    assert all(s.attributes.get("streamed") for s in tracer.spans if s.name == "etl.extract")